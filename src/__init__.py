@@ -4,9 +4,9 @@ from .config import *
 
 # Audio module exports
 from .audio.io import AudioStream, RingBuffer, find_suitable_device, load_audio_file, save_audio_file
-from .audio.vad import VAD, VADState, preprocess_audio
+from .audio.vad import VAD, VADState, compute_rms, preprocess_audio
 from .audio.features import (
-    extract_mfcc, extract_mfcc_delta, extract_stats_features,
+    compute_power_spectrogram, mel_power, extract_mfcc, extract_mfcc_delta, extract_stats_features,
     extract_mel_template, mel_distance, extract_lpc_features, extract_formants
 )
 from .audio.recognizers import TemplateMatcher, MultiMethodMatcher, dtw_distance, dtw_distance_normalized
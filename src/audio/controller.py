@@ -199,17 +199,12 @@ class VoiceController:
         import numpy as np
 
         samples_needed = int(config.SAMPLE_RATE * duration_ms / 1000)
-        collected = []
 
         # 清空緩衝
         self._audio_stream.get_chunk()
 
-        while len(collected) < samples_needed:
-            chunk = self._audio_stream.get_chunk(timeout=0.1)
-            if len(chunk) > 0:
-                collected.extend(chunk)
-
-        audio = np.array(collected[:samples_needed], dtype=np.int16)
+        # 直接填入預先配置的 int16 緩衝（不經 Python list）
+        audio = self._audio_stream.read_into(np.empty(samples_needed, dtype=np.int16), timeout=0.1)
         segment_len = len(audio) // num_samples
 
         for i in range(num_samples):
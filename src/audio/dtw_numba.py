@@ -0,0 +1,179 @@
+"""Numba DTW kernels (Euclidean frame cost, optional Sakoe-Chiba band).
+
+Kept in their own module so the compiled kernels are cached (cache=True)
+independently of the matcher code in recognizers.py.
+"""
+
+import numpy as np
+
+try:
+    from numba import get_num_threads, get_thread_id, njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Reassociation/contraction let LLVM vectorize the frame-cost sum. The
+# no-NaN/no-Inf flags of full fastmath are left out: the recurrence is
+# initialised with inf and relies on comparisons against it.
+_DTW_FASTMATH = {'reassoc', 'contract', 'nsz', 'arcp'}
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True, fastmath=_DTW_FASTMATH)
+    def _dtw_core(x, y, prev_d, cur_d, prev_len, cur_len):
+        """
+        Exact DTW with Euclidean frame cost, normalized by optimal path length.
+
+        Two rolling rows keep memory O(len(y)); the caller provides them
+        (each at least len(y) + 1 long) so batch callers can reuse one
+        workspace. Ties are broken in the same order as fastdtw:
+        (i-1, j), (i, j-1), (i-1, j-1). Runs without the GIL so the audio
+        callback thread keeps running during matching.
+        """
+        n = x.shape[0]
+        m = y.shape[0]
+        if n == 0 or m == 0:
+            return np.inf
+        n_feat = x.shape[1]
+
+        prev_d[:m + 1] = np.inf
+        prev_len[:m + 1] = 0
+        prev_d[0] = 0.0
+
+        for i in range(1, n + 1):
+            cur_d[0] = np.inf
+            for j in range(1, m + 1):
+                acc = 0.0
+                for k in range(n_feat):
+                    diff = x[i - 1, k] - y[j - 1, k]
+                    acc += diff * diff
+
+                best = prev_d[j]
+                best_len = prev_len[j]
+                if cur_d[j - 1] < best:
+                    best = cur_d[j - 1]
+                    best_len = cur_len[j - 1]
+                if prev_d[j - 1] < best:
+                    best = prev_d[j - 1]
+                    best_len = prev_len[j - 1]
+
+                cur_d[j] = best + np.sqrt(acc)
+                cur_len[j] = best_len + 1
+            prev_d, cur_d = cur_d, prev_d
+            prev_len, cur_len = cur_len, prev_len
+
+        return prev_d[m] / prev_len[m]
+
+    @njit(cache=True, nogil=True, fastmath=_DTW_FASTMATH)
+    def _dtw_core_banded(x, y, prev_d, cur_d, prev_len, cur_len, radius):
+        """
+        _dtw_core restricted to a Sakoe-Chiba band of `radius` frames around
+        the (1, 1) -> (n, m) diagonal, widened to the diagonal's slope so the
+        band stays connected (and to the whole row for a one-frame query,
+        whose only path is that row). Kept separate so the exact kernel's
+        inner loop keeps constant bounds.
+
+        Band bounds only move right from row to row, so both rows are set to
+        inf once up front; afterwards each row only resets the cells next to
+        its band (j_lo - 1, j_hi + 1), which keeps a row O(band) instead of
+        O(m).
+        """
+        n = x.shape[0]
+        m = y.shape[0]
+        if n == 0 or m == 0:
+            return np.inf
+        n_feat = x.shape[1]
+
+        prev_d[:m + 1] = np.inf
+        cur_d[:m + 1] = np.inf
+        prev_len[:m + 1] = 0
+        cur_len[:m + 1] = 0
+        prev_d[0] = 0.0
+
+        if n > 1:
+            slope = (m - 1) / (n - 1)
+            band = max(radius, int(np.ceil(slope)))
+        else:
+            slope = 0.0
+            band = max(radius, m - 1)
+
+        for i in range(1, n + 1):
+            center = int(round((i - 1) * slope)) + 1
+            j_lo = max(1, center - band)
+            j_hi = min(m, center + band)
+            cur_d[j_lo - 1] = np.inf
+            cur_len[j_lo - 1] = 0
+            if j_hi < m:
+                cur_d[j_hi + 1] = np.inf
+                cur_len[j_hi + 1] = 0
+            for j in range(j_lo, j_hi + 1):
+                acc = 0.0
+                for k in range(n_feat):
+                    diff = x[i - 1, k] - y[j - 1, k]
+                    acc += diff * diff
+
+                best = prev_d[j]
+                best_len = prev_len[j]
+                if cur_d[j - 1] < best:
+                    best = cur_d[j - 1]
+                    best_len = cur_len[j - 1]
+                if prev_d[j - 1] < best:
+                    best = prev_d[j - 1]
+                    best_len = prev_len[j - 1]
+
+                cur_d[j] = best + np.sqrt(acc)
+                cur_len[j] = best_len + 1
+            prev_d, cur_d = cur_d, prev_d
+            prev_len, cur_len = cur_len, prev_len
+
+        if prev_len[m] == 0:
+            return np.inf  # end cell outside the band (not reachable with the widening above)
+        return prev_d[m] / prev_len[m]
+
+    @njit(cache=True, nogil=True)
+    def _dtw_pair(x, y, prev_d, cur_d, prev_len, cur_len, radius):
+        """Exact DTW when radius < 0, otherwise the banded variant."""
+        if radius < 0:
+            return _dtw_core(x, y, prev_d, cur_d, prev_len, cur_len)
+        return _dtw_core_banded(x, y, prev_d, cur_d, prev_len, cur_len, radius)
+
+    @njit(cache=True, nogil=True)
+    def _dtw_normalized_kernel(x, y, radius):
+        """Normalized DTW between two (n_frames, n_features) sequences (radius < 0 = exact)."""
+        m = y.shape[0]
+        work_d = np.empty((2, m + 1))
+        work_len = np.empty((2, m + 1), dtype=np.int64)
+        return _dtw_pair(x, y, work_d[0], work_d[1], work_len[0], work_len[1], radius)
+
+    @njit(cache=True, nogil=True, parallel=True)
+    def _dtw_batch_kernel(query, templates, lengths, work_d, work_len, radius):
+        """Normalized DTW from `query` to each padded template, parallel over templates.
+
+        work_d / work_len are (M, 2, T_max + 1) row buffers, one slot per template;
+        radius < 0 means exact DTW.
+        """
+        n_templates = templates.shape[0]
+        out = np.empty(n_templates)
+        for t in prange(n_templates):
+            out[t] = _dtw_pair(query, templates[t, :lengths[t]],
+                               work_d[t, 0], work_d[t, 1], work_len[t, 0], work_len[t, 1], radius)
+        return out
+
+    @njit(cache=True, nogil=True, parallel=True)
+    def _dtw_batch_kernel_int8(query, templates_q, scales, lengths, work_d, work_len, radius):
+        """Batch DTW against int8 templates.
+
+        Each template is dequantized into a per-thread float32 scratch buffer
+        right before its DTW, so only one buffer per thread is allocated.
+        """
+        n_templates, t_max, n_feat = templates_q.shape
+        scratch = np.empty((get_num_threads(), t_max, n_feat), dtype=np.float32)
+        out = np.empty(n_templates)
+        for t in prange(n_templates):
+            n = lengths[t]
+            tpl = scratch[get_thread_id(), :n]
+            for i in range(n):
+                for k in range(n_feat):
+                    tpl[i, k] = templates_q[t, i, k] * scales[t, k]
+            out[t] = _dtw_pair(query, tpl,
+                               work_d[t, 0], work_d[t, 1], work_len[t, 0], work_len[t, 1], radius)
+        return out
@@ -1,5 +1,7 @@
 """Feature extraction module - MFCC, Stats, Mel-template, LPC."""
 
+from functools import lru_cache
+
 import numpy as np
 import librosa
 from scipy.ndimage import zoom
@@ -9,32 +11,82 @@ from .. import config
 
 
 # =============================================================================
-# MFCC Features
+# Shared Spectrogram
 # =============================================================================
 
-def extract_mfcc(audio: np.ndarray, include_delta: bool = True, first_delta_only: bool = False) -> np.ndarray:
+def compute_power_spectrogram(audio: np.ndarray) -> np.ndarray:
     """
-    Extract MFCC features from audio.
+    Compute the power spectrogram |STFT|^2 shared by the MFCC, mel-template
+    and RASTA-PLP extractors.
+
+    All three use the same STFT (config.N_FFT / config.HOP_LENGTH), so callers
+    that need several of them can compute it once and pass it as `S`.
 
     Args:
-        audio: Audio samples (float32, normalized)
-        include_delta: Whether to include delta and delta-delta
-        first_delta_only: If True, returns ONLY the 1st order delta (13 dims). Overrides include_delta.
+        audio: Audio samples
 
     Returns:
-        MFCC features array (n_frames, n_features)
+        Power spectrogram (1 + N_FFT // 2, n_frames)
     """
     if audio.dtype != np.float32:
         audio = audio.astype(np.float32)
         if np.max(np.abs(audio)) > 1.0:
             audio = audio / 32768.0
 
-    mfcc = librosa.feature.mfcc(
+    S = np.abs(librosa.stft(
         y=audio,
-        sr=config.SAMPLE_RATE,
-        n_mfcc=config.N_MFCC,
         n_fft=config.N_FFT,
         hop_length=config.HOP_LENGTH
+    ))
+    S *= S  # square in place: no second spectrogram-sized temporary
+    return S
+
+
+@lru_cache(maxsize=None)
+def _mel_basis(n_fft: int, n_mels: int, fmin: float, fmax: float) -> np.ndarray:
+    """Mel filterbank for config.SAMPLE_RATE, built once per parameter set."""
+    basis = librosa.filters.mel(sr=config.SAMPLE_RATE, n_fft=n_fft, n_mels=n_mels, fmin=fmin, fmax=fmax)
+    basis.flags.writeable = False
+    return basis
+
+
+def mel_power(S: np.ndarray, n_mels: int = 128, fmin: float = 0.0, fmax: float = None) -> np.ndarray:
+    """
+    Mel power spectrogram from a power spectrogram.
+
+    Same result as librosa.feature.melspectrogram(S=S, ...), but the filterbank
+    (which costs more to build than to apply) is cached instead of rebuilt on
+    every call.
+    """
+    n_fft = 2 * (S.shape[-2] - 1)
+    return np.einsum("...ft,mf->...mt", S, _mel_basis(n_fft, n_mels, fmin, fmax), optimize=True)
+
+
+# =============================================================================
+# MFCC Features
+# =============================================================================
+
+def extract_mfcc(audio: np.ndarray, include_delta: bool = True, first_delta_only: bool = False,
+                 S: np.ndarray = None) -> np.ndarray:
+    """
+    Extract MFCC features from audio.
+
+    Args:
+        audio: Audio samples (float32, normalized)
+        include_delta: Whether to include delta and delta-delta
+        first_delta_only: If True, returns ONLY the 1st order delta (13 dims). Overrides include_delta.
+        S: Optional precomputed power spectrogram (see compute_power_spectrogram)
+
+    Returns:
+        MFCC features array (n_frames, n_features)
+    """
+    if S is None:
+        S = compute_power_spectrogram(audio)
+
+    mel = mel_power(S)
+    mfcc = librosa.feature.mfcc(
+        S=librosa.power_to_db(mel),
+        n_mfcc=config.N_MFCC
     )
 
     if include_delta or first_delta_only:
@@ -72,7 +124,7 @@ def extract_mfcc_delta(audio: np.ndarray) -> np.ndarray:
 # RASTA-PLP (Approximation) Features
 # =============================================================================
 
-def extract_rasta_plp(audio: np.ndarray, n_coeffs: int = 13) -> np.ndarray:
+def extract_rasta_plp(audio: np.ndarray, n_coeffs: int = 13, S: np.ndarray = None) -> np.ndarray:
     """
     Extract RASTA-PLP features (Approximation).
     
@@ -82,25 +134,17 @@ def extract_rasta_plp(audio: np.ndarray, n_coeffs: int = 13) -> np.ndarray:
     Args:
         audio: Audio samples
         n_coeffs: Number of cepstral coefficients
+        S: Optional precomputed power spectrogram (see compute_power_spectrogram)
 
     Returns:
         RASTA-PLP features (n_frames, n_coeffs)
     """
-    if audio.dtype != np.float32:
-        audio = audio.astype(np.float32)
-        if np.max(np.abs(audio)) > 1.0:
-            audio = audio / 32768.0
+    if S is None:
+        S = compute_power_spectrogram(audio)
 
     # 1. Compute Log Mel-Spectrogram
     # We use power spectrum (power=2.0) as per PLP, but standard mel filterbank
-    mel_spec = librosa.feature.melspectrogram(
-        y=audio,
-        sr=config.SAMPLE_RATE,
-        n_mels=config.N_MELS,
-        n_fft=config.N_FFT,
-        hop_length=config.HOP_LENGTH,
-        power=2.0
-    )
+    mel_spec = mel_power(S, n_mels=config.N_MELS)
     
     # Logarithm (with offset to avoid log(0))
     # PLP usually uses log(power + epsilon)
@@ -203,13 +247,14 @@ def extract_stats_features(audio: np.ndarray, n_segments: int = None) -> np.ndar
 # Mel-spectrogram Template Features
 # =============================================================================
 
-def extract_mel_template(audio: np.ndarray, fixed_frames: int = None) -> np.ndarray:
+def extract_mel_template(audio: np.ndarray, fixed_frames: int = None, S: np.ndarray = None) -> np.ndarray:
     """
     Extract mel-spectrogram and resize to fixed dimensions.
 
     Args:
         audio: Audio samples
         fixed_frames: Target number of frames (default from config)
+        S: Optional precomputed power spectrogram (see compute_power_spectrogram)
 
     Returns:
         Mel-spectrogram template (n_mels, fixed_frames)
@@ -217,20 +262,10 @@ def extract_mel_template(audio: np.ndarray, fixed_frames: int = None) -> np.ndar
     if fixed_frames is None:
         fixed_frames = config.TEMPLATE_FIXED_FRAMES
 
-    if audio.dtype != np.float32:
-        audio = audio.astype(np.float32)
-        if np.max(np.abs(audio)) > 1.0:
-            audio = audio / 32768.0
+    if S is None:
+        S = compute_power_spectrogram(audio)
 
-    mel = librosa.feature.melspectrogram(
-        y=audio,
-        sr=config.SAMPLE_RATE,
-        n_mels=config.N_MELS,
-        n_fft=config.N_FFT,
-        hop_length=config.HOP_LENGTH,
-        fmin=config.FMIN,
-        fmax=config.FMAX
-    )
+    mel = mel_power(S, n_mels=config.N_MELS, fmin=config.FMIN, fmax=config.FMAX)
 
     mel = np.log1p(mel)
 
@@ -277,11 +312,13 @@ def lpc_to_lpcc(a: np.ndarray, order: int, cep_order: int) -> np.ndarray:
     Convert LPC coefficients to LPC Cepstral Coefficients (LPCC).
     
     Args:
-        a: LPC coefficients [1, a1, a2, ...]
+        a: LPC coefficients [1, a1, a2, ...]; (..., order + 1) converts
+           every leading index (e.g. all frames) at once
         order: LPC order
         cep_order: Output cepstral order
     """
-    c = np.zeros(cep_order)
+    a = np.asarray(a)
+    c = np.zeros(a.shape[:-1] + (cep_order,))
     # a array includes a0=1 at index 0
     
     for n in range(1, cep_order + 1):
@@ -292,13 +329,13 @@ def lpc_to_lpcc(a: np.ndarray, order: int, cep_order: int) -> np.ndarray:
         
         for k in range(1, n):
             if k <= order:
-                sum_term += (n - k) * a[k] * c[n - k - 1]
+                sum_term = sum_term + (n - k) * a[..., k] * c[..., n - k - 1]
         
-        current_a = a[n] if n <= order else 0.0
-        c[n-1] = -current_a - (1.0 / n) * sum_term
+        current_a = a[..., n] if n <= order else 0.0
+        c[..., n-1] = -current_a - (1.0 / n) * sum_term
     
     # Clip to prevent numerical explosion
-    c = np.clip(c, -50.0, 50.0)
+    np.clip(c, -50.0, 50.0, out=c)
         
     return c
 
@@ -337,19 +374,11 @@ def extract_lpc_features(audio: np.ndarray, order: int = None) -> np.ndarray:
     window = np.hamming(frame_length)
     frames = frames * window[:, np.newaxis]
     
-    # 5. Compute LPC and LPCC for each frame
-    # librosa.lpc only accepts 1D input in older versions, 
-    # but let's iterate. The number of frames is ~100-200, so a simple loop is fine
-    # if the inner LPC calc is fast (which librosa.lpc is).
-    
-    n_frames = frames.shape[1]
-    lpcc_frames = np.zeros((n_frames, order), dtype=np.float32)
-    
-    for i in range(n_frames):
-        frame = frames[:, i]
-        # librosa.lpc returns [1, a1, a2, ... ap]
-        a = librosa.lpc(frame, order=order)
-        lpcc_frames[i] = lpc_to_lpcc(a, order, order)
+    # 5. Compute LPC and LPCC for all frames at once: librosa.lpc runs its
+    # (numba) Burg recursion over every frame in one call, and lpc_to_lpcc
+    # vectorizes across frames. a: (order + 1, n_frames), each [1, a1, ... ap]
+    a = librosa.lpc(frames, order=order, axis=0)
+    lpcc_frames = lpc_to_lpcc(a.T, order, order).astype(np.float32)
 
     return lpcc_frames
 
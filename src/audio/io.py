@@ -2,7 +2,7 @@
 
 import queue
 import threading
-from collections import deque
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple, Callable, Dict, Iterable
 
@@ -11,7 +11,18 @@ import sounddevice as sd
 from scipy.signal import resample_poly
 
 from .. import config
-from .vad import trim_silence
+from .vad import compute_rms, trim_silence
+
+
+@lru_cache(maxsize=1)
+def _device_snapshot() -> Tuple[tuple, tuple]:
+    """Return (devices, host_apis) from sounddevice's PortAudio context.
+
+    sounddevice initialises PortAudio once per process and PortAudio only
+    re-enumerates devices on re-initialisation, so the lists are stable and
+    can be shared by find_suitable_device() and AudioStream.start().
+    """
+    return tuple(sd.query_devices()), tuple(sd.query_hostapis())
 
 
 def find_suitable_device(sample_rate=16000, verbose=False, preferred_device_index: Optional[int] = None) -> Optional[Tuple[int, int]]:
@@ -45,8 +56,8 @@ def find_suitable_device(sample_rate=16000, verbose=False, preferred_device_inde
                 print(f"    Failed at {rate} Hz: {e}")
             return False
 
-    # Get all devices
-    devices = sd.query_devices()
+    # Get all devices (and host APIs) from the shared snapshot
+    devices, host_apis = _device_snapshot()
     
     # 1. Try preferred device if specified
     if preferred_device_index is not None:
@@ -81,7 +92,6 @@ def find_suitable_device(sample_rate=16000, verbose=False, preferred_device_inde
         print("\nScanning for WASAPI devices (preferred)...")
     
     wasapi_candidates = []
-    host_apis = sd.query_hostapis()
     wasapi_api_index = -1
     for i, api in enumerate(host_apis):
         if 'WASAPI' in api['name']:
@@ -151,31 +161,62 @@ def find_suitable_device(sample_rate=16000, verbose=False, preferred_device_inde
 
 
 class RingBuffer:
-    """Thread-safe ring buffer for audio samples."""
+    """Thread-safe ring buffer for audio samples.
+
+    Backed by a preallocated int16 array: append() is at most two slice
+    copies, so the audio callback never loops over samples in Python.
+    """
 
     def __init__(self, max_duration_ms: int = 500):
         max_samples = int(config.SAMPLE_RATE * max_duration_ms / 1000)
-        self._buffer = deque(maxlen=max_samples)
+        self._buffer = np.zeros(max_samples, dtype=np.int16)
+        self._write = 0  # next write position
+        self._count = 0  # valid samples (<= capacity)
         self._lock = threading.Lock()
 
     def append(self, samples: np.ndarray):
+        capacity = len(self._buffer)
+        n = len(samples)
+        if capacity == 0 or n == 0:
+            return
         with self._lock:
-            for s in samples:
-                self._buffer.append(s)
+            if n >= capacity:
+                self._buffer[:] = samples[n - capacity:]
+                self._write = 0
+            else:
+                end = self._write + n
+                if end <= capacity:
+                    self._buffer[self._write:end] = samples
+                else:
+                    split = capacity - self._write
+                    self._buffer[self._write:] = samples[:split]
+                    self._buffer[:end - capacity] = samples[split:]
+                self._write = end % capacity
+            self._count = min(self._count + n, capacity)
+
+    def _last(self, n: int) -> np.ndarray:
+        """Copy of the newest `n` samples in time order (caller holds the lock)."""
+        n = min(n, self._count)
+        if n <= 0:
+            return np.empty(0, dtype=np.int16)
+        start = self._write - n
+        if start >= 0:
+            return self._buffer[start:self._write].copy()
+        return np.concatenate((self._buffer[start:], self._buffer[:self._write]))
 
     def get_all(self) -> np.ndarray:
         with self._lock:
-            return np.array(list(self._buffer), dtype=np.int16)
+            return self._last(self._count)
 
     def get_last_ms(self, ms: int) -> np.ndarray:
         n_samples = int(config.SAMPLE_RATE * ms / 1000)
         with self._lock:
-            data = list(self._buffer)
-            return np.array(data[-n_samples:] if len(data) >= n_samples else data, dtype=np.int16)
+            return self._last(n_samples)
 
     def clear(self):
         with self._lock:
-            self._buffer.clear()
+            self._write = 0
+            self._count = 0
 
 
 class AudioStream:
@@ -184,8 +225,11 @@ class AudioStream:
     def __init__(self, device_index=None, input_rate=None, target_rate=None):
         self._stream = None
         self._ring_buffer = RingBuffer()
-        # Limit queue to ~8 seconds of audio (500 chunks * 16ms) to prevent infinite lag
-        self._output_queue = queue.Queue(maxsize=500)
+        # Bounded queue (config.AUDIO_QUEUE_MAX_MS of audio) to prevent infinite lag
+        chunk_ms = config.CHUNK_SIZE * 1000 / config.SAMPLE_RATE
+        self._output_queue = queue.Queue(maxsize=max(1, int(config.AUDIO_QUEUE_MAX_MS / chunk_ms)))
+        self._overruns = 0  # chunks dropped because the consumer fell behind
+        self._in_overrun = False  # warn once per overrun burst
         self._running = False
         self._background_rms = None
         self._device_index = device_index
@@ -214,27 +258,31 @@ class AudioStream:
         if status:
             print(f"[Audio Warning] {status}")
             
-        # indata is (frames, channels)
-        # Select first channel if multiple
-        if indata.shape[1] > 1:
-            samples = indata[:, 0]
+        # indata is (frames, channels) and reused by PortAudio after the
+        # callback returns, so take exactly one copy of the first channel
+        # (resampling already produces a new array)
+        samples = indata[:, 0]
+        if self._needs_resample:
+            samples = self._resample_to_target(samples)
         else:
-            samples = indata.flatten()
-        
-        # Resample if needed
-        samples = self._resample_to_target(samples)
+            samples = samples.copy()
         
         self._ring_buffer.append(samples)
         
         # Put in queue (drop oldest if full)
         try:
-            self._output_queue.put_nowait(samples.copy())
+            self._output_queue.put_nowait(samples)
+            self._in_overrun = False
         except queue.Full:
+            self._overruns += 1
+            if not self._in_overrun:
+                self._in_overrun = True
+                print("[Audio Warning] Consumer fell behind; dropping oldest audio chunks")
             try:
                 # Remove oldest item
                 self._output_queue.get_nowait()
                 # Try putting again
-                self._output_queue.put_nowait(samples.copy())
+                self._output_queue.put_nowait(samples)
             except (queue.Empty, queue.Full):
                 pass # Should be rare race condition, ignore
 
@@ -246,9 +294,9 @@ class AudioStream:
         extra_settings = None
         try:
             if self._device_index is not None:
-                dev_info = sd.query_devices(self._device_index)
-                host_api_idx = dev_info['hostapi']
-                host_api_info = sd.query_hostapis(host_api_idx)
+                devices, host_apis = _device_snapshot()
+                dev_info = devices[self._device_index]
+                host_api_info = host_apis[dev_info['hostapi']]
                 if 'WASAPI' in host_api_info['name']:
                     # Explicitly request shared mode
                     extra_settings = sd.WasapiSettings(exclusive=False)
@@ -273,7 +321,7 @@ class AudioStream:
             # Fallback 1: Native channels (for WASAPI strictness)
             try:
                 if self._device_index is not None:
-                    dev_info = sd.query_devices(self._device_index)
+                    dev_info = _device_snapshot()[0][self._device_index]
                     native_channels = dev_info['max_input_channels']
                     if native_channels > 1:
                         print(f"Trying with native {native_channels} channels...")
@@ -297,17 +345,18 @@ class AudioStream:
             try:
                 print("Attempting final fallback: MME driver...")
                 # Find MME API index
+                devices, host_apis = _device_snapshot()
                 mme_idx = -1
-                for i, api in enumerate(sd.query_hostapis()):
+                for i, api in enumerate(host_apis):
                     if 'MME' in api['name']:
                         mme_idx = i
                         break
                 
                 if mme_idx >= 0 and self._device_index is not None:
                      # Try to find the same device name under MME
-                    current_name = sd.query_devices(self._device_index)['name']
+                    current_name = devices[self._device_index]['name']
                     mme_dev_idx = -1
-                    for i, d in enumerate(sd.query_devices()):
+                    for i, d in enumerate(devices):
                         if d['hostapi'] == mme_idx and d['name'] in current_name: # Partial match name
                              mme_dev_idx = i
                              break
@@ -339,13 +388,53 @@ class AudioStream:
             self._stream.stop()
             self._stream.close()
 
-    def get_chunk(self, timeout: float = 0.1) -> np.ndarray:
-        """Get next audio chunk from queue."""
+    def get_chunk(self, timeout: Optional[float] = 0.1) -> np.ndarray:
+        """
+        Get next audio chunk from queue.
+
+        The call sleeps on the queue until the audio callback delivers a chunk,
+        so consumers should pass a long timeout (or None to block indefinitely)
+        instead of busy-polling with a tiny one.
+        """
         try:
-            return self._output_queue.get(timeout=timeout)
+            return self._output_queue.get(block=True, timeout=timeout)
         except queue.Empty:
             return np.array([], dtype=np.int16)
 
+    def read_into(self, buf: np.ndarray, timeout: Optional[float] = 0.5) -> np.ndarray:
+        """
+        Fill `buf` with the next len(buf) samples from the queue.
+
+        Blocks until the buffer is full; chunks are copied straight into it
+        and the tail of the last chunk that does not fit is dropped.
+
+        Returns:
+            buf
+        """
+        n_needed = len(buf)
+        pos = 0
+        while pos < n_needed:
+            chunk = self.get_chunk(timeout=timeout)
+            n = min(len(chunk), n_needed - pos)
+            if n:
+                buf[pos:pos + n] = chunk[:n]
+                pos += n
+        return buf
+
+    def discard_pending(self) -> int:
+        """Drop all queued chunks (e.g. audio captured while the consumer was paused).
+
+        Returns:
+            Number of chunks discarded.
+        """
+        dropped = 0
+        while True:
+            try:
+                self._output_queue.get_nowait()
+            except queue.Empty:
+                return dropped
+            dropped += 1
+
     def get_pre_roll(self, ms: int) -> np.ndarray:
         """Get pre-roll samples from ring buffer."""
         return self._ring_buffer.get_last_ms(ms)
@@ -353,20 +442,18 @@ class AudioStream:
     def measure_background(self, duration_ms: int = 1500) -> float:
         """Measure background RMS for VAD calibration."""
         samples_needed = int(self._target_rate * duration_ms / 1000)
-        collected = []
-
-        while len(collected) < samples_needed:
-            chunk = self.get_chunk(timeout=0.5)
-            if len(chunk) > 0:
-                collected.extend(chunk)
-
-        audio = np.array(collected[:samples_needed], dtype=np.float32)
-        if len(audio) == 0:
+        if samples_needed == 0:
             return 50.0 # Fallback
-            
-        self._background_rms = np.sqrt(np.mean(audio ** 2))
+
+        audio = self.read_into(np.empty(samples_needed, dtype=np.int16))
+        self._background_rms = compute_rms(audio)
         return self._background_rms
 
+    @property
+    def overruns(self) -> int:
+        """Number of chunks dropped so far because the queue was full."""
+        return self._overruns
+
     @property
     def background_rms(self) -> float:
         return self._background_rms if self._background_rms else 100.0
@@ -376,6 +463,9 @@ def load_audio_file(filepath: str) -> np.ndarray:
     """Load audio file and convert to 16kHz mono."""
     import librosa
     y, sr = librosa.load(filepath, sr=config.SAMPLE_RATE, mono=True)
+    # NaN/Inf 轉 int16 會變成任意值，在這裡擋下 (呼叫端因此不必再檢查)
+    if not np.isfinite(y).all():
+        raise ValueError(f"Audio contains NaN or Inf values: {filepath}")
     # Convert to int16
     y = (y * 32767).astype(np.int16)
     return y
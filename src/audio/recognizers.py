@@ -1,7 +1,12 @@
 """Template matching recognizers with DTW."""
 
+import hashlib
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 from fastdtw import fastdtw
 from scipy.spatial.distance import euclidean
@@ -9,7 +14,10 @@ from scipy.ndimage import zoom
 
 from .. import config
 from .vad import preprocess_audio
-from .features import extract_mfcc, extract_stats_features, extract_mel_template, extract_lpc_features, extract_rasta_plp, mel_distance, estimate_snr
+from .features import compute_power_spectrogram, extract_mfcc, extract_stats_features, extract_mel_template, extract_lpc_features, extract_rasta_plp, mel_distance, estimate_snr
+from .dtw_numba import NUMBA_AVAILABLE
+if NUMBA_AVAILABLE:
+    from .dtw_numba import _dtw_batch_kernel, _dtw_batch_kernel_int8, _dtw_normalized_kernel
 
 
 # =============================================================================
@@ -39,9 +47,14 @@ def dtw_distance_normalized(seq1: np.ndarray, seq2: np.ndarray, radius: int = 5)
     """
     Compute length-normalized DTW distance.
 
+    Uses the compiled DTW kernel when numba is available, otherwise fastdtw.
+    The compiled kernel applies config.DTW_BAND_RADIUS (exact DTW when None),
+    like TemplateMatcher's batched distances, so pairwise and batched
+    distances for the same pair agree.
+
     Args:
         seq1, seq2: Feature sequences
-        radius: Sakoe-Chiba band radius
+        radius: fastdtw search radius (fastdtw fallback only)
 
     Returns:
         Normalized DTW distance
@@ -49,11 +62,100 @@ def dtw_distance_normalized(seq1: np.ndarray, seq2: np.ndarray, radius: int = 5)
     if len(seq1) == 0 or len(seq2) == 0:
         return float('inf')
 
+    if NUMBA_AVAILABLE:
+        return float(_dtw_normalized_kernel(
+            np.asarray(seq1, dtype=np.float32).reshape(len(seq1), -1),
+            np.asarray(seq2, dtype=np.float32).reshape(len(seq2), -1),
+            _band_radius()
+        ))
+
     distance, path = fastdtw(seq1, seq2, radius=radius, dist=euclidean)
     path_length = len(path)
     return distance / path_length if path_length > 0 else float('inf')
 
 
+def _band_radius() -> int:
+    """config.DTW_BAND_RADIUS as the numba kernels' radius argument (-1 = exact DTW)."""
+    return -1 if config.DTW_BAND_RADIUS is None else int(config.DTW_BAND_RADIUS)
+
+
+def _pack_sequences(seqs: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack variable-length (n_frames, n_features) sequences into a zero-padded
+    (M, T_max, F) float32 array plus their lengths."""
+    lengths = np.array([len(seq) for seq in seqs], dtype=np.int64)
+    n_feat = seqs[0].reshape(len(seqs[0]), -1).shape[1]
+    padded = np.zeros((len(seqs), max(int(lengths.max()), 1), n_feat), dtype=np.float32)
+    for i, seq in enumerate(seqs):
+        padded[i, :len(seq)] = seq.reshape(len(seq), -1)
+    return padded, lengths
+
+
+def _quantize_int8(padded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize padded (M, T, F) templates to int8 with one scale per template
+    and feature dimension (MFCC coefficients differ widely in range)."""
+    scales = np.abs(padded).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(padded / scales[:, None, :]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def _as_template(features: np.ndarray) -> np.ndarray:
+    """Template features as stored: C-contiguous float32 (the dtype the packed
+    kernel inputs use), so packing is a plain copy."""
+    return np.ascontiguousarray(features, dtype=np.float32)
+
+
+def _stacked(cache: Dict[str, tuple], key: str, seqs: List[np.ndarray], build) -> tuple:
+    """
+    (list(seqs), *build(seqs)) cached under `key`.
+
+    Rebuilt only when the sequence objects change (callers may edit the
+    template lists directly, so identity is checked).
+    """
+    cached = cache.get(key)
+    if cached is None or len(cached[0]) != len(seqs) or any(a is not b for a, b in zip(cached[0], seqs)):
+        cached = (list(seqs),) + build(seqs)
+        cache[key] = cached
+    return cached
+
+
+def _stack_rows(seqs: List[np.ndarray]) -> Tuple[np.ndarray]:
+    """Fixed-size templates flattened into one contiguous (M, D) float32 matrix."""
+    return (np.stack([np.asarray(seq, dtype=np.float32).ravel() for seq in seqs]),)
+
+
+def _stack_rows_with_norms(seqs: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """_stack_rows() plus each row's L2 norm (for cosine distance)."""
+    (matrix,) = _stack_rows(seqs)
+    return matrix, np.sqrt(np.einsum('ij,ij->i', matrix, matrix))
+
+
+def _remove_named_templates(templates: Dict[str, List[np.ndarray]], template_names: Dict[str, List[str]],
+                            filename: str) -> List[Tuple[str, int, str, np.ndarray]]:
+    """
+    Remove every template named `filename`; returns [(command, index, name, features), ...]
+    in insertion order for _restore_named_templates(). Emptied commands keep their
+    (empty) entry so the command order is unchanged.
+    """
+    removed = []
+    for command, names in template_names.items():
+        for i, name in enumerate(names):
+            if name == filename:
+                removed.append((command, i, name, templates[command][i]))
+    for command, i, _, _ in reversed(removed):
+        del templates[command][i]
+        del template_names[command][i]
+    return removed
+
+
+def _restore_named_templates(templates: Dict[str, List[np.ndarray]], template_names: Dict[str, List[str]],
+                             removed: List[Tuple[str, int, str, np.ndarray]]):
+    """Put templates returned by _remove_named_templates() back at their original positions."""
+    for command, i, name, features in removed:
+        templates.setdefault(command, []).insert(i, features)
+        template_names.setdefault(command, []).insert(i, name)
+
+
 # =============================================================================
 # Template Matcher
 # =============================================================================
@@ -61,6 +163,9 @@ def dtw_distance_normalized(seq1: np.ndarray, seq2: np.ndarray, radius: int = 5)
 class TemplateMatcher:
     """Base template matcher for a single method."""
 
+    __slots__ = ('method', 'mfcc_first_delta_only', 'templates', 'template_names',
+                 'noise_templates', '_packed', 'threshold')
+
     def __init__(self, method: str = 'mfcc_dtw', threshold: float = None, mfcc_first_delta_only: bool = False):
         """
         Args:
@@ -73,6 +178,8 @@ class TemplateMatcher:
         self.templates: Dict[str, List[np.ndarray]] = {}
         self.template_names: Dict[str, List[str]] = {}  # Track template filenames
         self.noise_templates: List[np.ndarray] = []  # Noise templates for rejection
+        # Padded copies for the batch DTW kernel, keyed by 'templates' / 'noise'
+        self._packed: Dict[str, tuple] = {}
 
         if threshold is None:
             threshold_map = {
@@ -88,8 +195,10 @@ class TemplateMatcher:
 
     def _extract_features(self, audio: np.ndarray) -> np.ndarray:
         """Extract features based on method."""
-        processed = preprocess_audio(audio)
+        return self._processed_features(preprocess_audio(audio))
 
+    def _processed_features(self, processed: np.ndarray) -> np.ndarray:
+        """_extract_features() for audio that already went through preprocess_audio()."""
         if self.method == 'mfcc_dtw':
             return extract_mfcc(processed, first_delta_only=self.mfcc_first_delta_only)
         elif self.method == 'stats':
@@ -111,19 +220,30 @@ class TemplateMatcher:
         else:
             raise ValueError(f"Unknown method: {self.method}")
 
-    def add_template(self, command: str, audio: np.ndarray, filename: str = None):
-        """Add a template for a command."""
-        features = self._extract_features(audio)
+    def add_template(self, command: str, audio: np.ndarray, filename: str = None, features: np.ndarray = None):
+        """Add a template for a command (`features`: precomputed, skips extraction)."""
+        if features is None:
+            features = self._extract_features(audio)
+        features = _as_template(features)
         if command not in self.templates:
             self.templates[command] = []
             self.template_names[command] = []
         self.templates[command].append(features)
         self.template_names[command].append(filename or "unknown")
 
-    def add_noise_template(self, audio: np.ndarray):
+    def remove_template(self, filename: str) -> List[Tuple[str, int, str, np.ndarray]]:
+        """Remove the templates added as `filename`; pass the result to restore_templates()."""
+        return _remove_named_templates(self.templates, self.template_names, filename)
+
+    def restore_templates(self, removed: List[Tuple[str, int, str, np.ndarray]]):
+        """Re-insert templates returned by remove_template() at their original positions."""
+        _restore_named_templates(self.templates, self.template_names, removed)
+
+    def add_noise_template(self, audio: np.ndarray, features: np.ndarray = None):
         """Add a noise template for rejection."""
-        features = self._extract_features(audio)
-        self.noise_templates.append(features)
+        if features is None:
+            features = self._extract_features(audio)
+        self.noise_templates.append(_as_template(features))
 
     def _compute_distance(self, feat1: np.ndarray, feat2: np.ndarray) -> float:
         """Compute distance between features."""
@@ -137,6 +257,54 @@ class TemplateMatcher:
         else:
             return np.sqrt(np.sum((feat1 - feat2) ** 2))
 
+    def _distances(self, features: np.ndarray, seqs: List[np.ndarray], key: str) -> List[float]:
+        """
+        Distances from `features` to every sequence in `seqs`.
+
+        DTW methods run through the parallel numba batch kernel when available;
+        MEL compares the query against one stacked (M, D) template matrix.
+        The padded / stacked copy is rebuilt only when the sequence objects
+        change (see _stacked()).
+        """
+        if not seqs:
+            return []
+        if self.method == 'mel':
+            return self._cosine_distances(features, seqs, key)
+        if not (NUMBA_AVAILABLE and self.method in ('mfcc_dtw', 'rasta_plp', 'raw_dtw', 'lpc')) or len(features) == 0:
+            return [self._compute_distance(features, seq) for seq in seqs]
+
+        quantize = self.method in config.INT8_TEMPLATE_METHODS
+
+        def build(seqs):
+            padded, lengths = _pack_sequences(seqs)
+            # DTW row buffers, allocated once per packing and reused by every call
+            # (so one matcher must not run recognize() from two threads at once)
+            work_shape = (len(seqs), 2, padded.shape[1] + 1)
+            work = (np.empty(work_shape), np.empty(work_shape, dtype=np.int64))
+            return (_quantize_int8(padded) if quantize else padded), lengths, work
+
+        # Separate slot per storage type, so toggling INT8_TEMPLATE_METHODS
+        # never reuses a packing of the other kind (e.g. from a pickled cache)
+        cached = _stacked(self._packed, key + ':int8' if quantize else key, seqs, build)
+        query = np.asarray(features, dtype=np.float32).reshape(len(features), -1)
+        work_d, work_len = cached[3]
+        radius = _band_radius()
+        if quantize:
+            templates_q, scales = cached[1]
+            return _dtw_batch_kernel_int8(query, templates_q, scales, cached[2], work_d, work_len, radius).tolist()
+        return _dtw_batch_kernel(query, cached[1], cached[2], work_d, work_len, radius).tolist()
+
+    def _cosine_distances(self, features: np.ndarray, seqs: List[np.ndarray], key: str) -> List[float]:
+        """mel_distance(features, seq, metric='cosine') for every seq, as one matrix-vector product."""
+        _, matrix, norms = _stacked(self._packed, key, seqs, _stack_rows_with_norms)
+        query = np.asarray(features, dtype=np.float32).ravel()
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return [1.0] * len(seqs)
+        dists = 1.0 - (matrix @ query) / (norms * query_norm)
+        dists[norms == 0] = 1.0
+        return list(dists)
+
     def recognize(self, audio: np.ndarray, features: np.ndarray = None) -> Tuple[str, float, str, List[Tuple[str, str, float]], float]:
         """
         Recognize command from audio.
@@ -161,10 +329,16 @@ class TemplateMatcher:
         best_template = ''
         all_distances = []
 
+        dists = self._distances(
+            features, [t for templates in self.templates.values() for t in templates], 'templates'
+        )
+        idx = 0
         for command, templates in self.templates.items():
-            for i, template in enumerate(templates):
-                dist = self._compute_distance(features, template)
-                tpl_name = self.template_names[command][i]
+            names = self.template_names[command]
+            for i in range(len(templates)):
+                dist = dists[idx]
+                idx += 1
+                tpl_name = names[i]
                 all_distances.append((command, tpl_name, dist))
                 if dist < best_distance:
                     best_distance = dist
@@ -174,10 +348,7 @@ class TemplateMatcher:
         # Compute noise distance
         noise_distance = float('inf')
         if self.noise_templates:
-            for noise_feat in self.noise_templates:
-                dist = self._compute_distance(features, noise_feat)
-                if dist < noise_distance:
-                    noise_distance = dist
+            noise_distance = min(self._distances(features, self.noise_templates, 'noise'))
 
         # Sort by distance
         all_distances.sort(key=lambda x: x[2])
@@ -209,6 +380,9 @@ class FastLPCMatcher:
     - Use Euclidean distance (~2.5μs vs 32ms for DTW)
     """
 
+    __slots__ = ('fixed_frames', 'templates', 'template_names', 'noise_templates',
+                 '_packed', 'threshold', 'method')
+
     def __init__(self, fixed_frames: int = 30, threshold: float = None):
         """
         Args:
@@ -219,12 +393,17 @@ class FastLPCMatcher:
         self.templates: Dict[str, List[np.ndarray]] = {}
         self.template_names: Dict[str, List[str]] = {}
         self.noise_templates: List[np.ndarray] = []
+        # Stacked (M, D) copies of the templates, keyed by 'templates' / 'noise'
+        self._packed: Dict[str, tuple] = {}
         self.threshold = threshold or 100.0
         self.method = 'lpc'  # For compatibility
 
     def _extract_features(self, audio: np.ndarray) -> np.ndarray:
         """Extract fixed-size LPC features."""
-        processed = preprocess_audio(audio)
+        return self._processed_features(preprocess_audio(audio))
+
+    def _processed_features(self, processed: np.ndarray) -> np.ndarray:
+        """_extract_features() for audio that already went through preprocess_audio()."""
         lpc = extract_lpc_features(processed)
 
         # Resize to fixed size if needed
@@ -235,20 +414,39 @@ class FastLPCMatcher:
         # Flatten to 1D for fast Euclidean distance
         return lpc.flatten().astype(np.float32)
 
-    def add_template(self, command: str, audio: np.ndarray, filename: str = None):
-        """Add a template for a command."""
-        features = self._extract_features(audio)
+    def add_template(self, command: str, audio: np.ndarray, filename: str = None, features: np.ndarray = None):
+        """Add a template for a command (`features`: precomputed, skips extraction)."""
+        if features is None:
+            features = self._extract_features(audio)
         if command not in self.templates:
             self.templates[command] = []
             self.template_names[command] = []
         self.templates[command].append(features)
         self.template_names[command].append(filename or "unknown")
 
-    def add_noise_template(self, audio: np.ndarray):
+    def remove_template(self, filename: str) -> List[Tuple[str, int, str, np.ndarray]]:
+        """Remove the templates added as `filename`; pass the result to restore_templates()."""
+        return _remove_named_templates(self.templates, self.template_names, filename)
+
+    def restore_templates(self, removed: List[Tuple[str, int, str, np.ndarray]]):
+        """Re-insert templates returned by remove_template() at their original positions."""
+        _restore_named_templates(self.templates, self.template_names, removed)
+
+    def add_noise_template(self, audio: np.ndarray, features: np.ndarray = None):
         """Add a noise template for rejection."""
-        features = self._extract_features(audio)
+        if features is None:
+            features = self._extract_features(audio)
         self.noise_templates.append(features)
 
+    def _distances(self, features: np.ndarray, seqs: List[np.ndarray], key: str) -> List[float]:
+        """Euclidean distances from `features` to every flattened template in `seqs`."""
+        if not seqs:
+            return []
+        _, matrix = _stacked(self._packed, key, seqs, _stack_rows)
+        diff = matrix - features
+        diff *= diff
+        return list(np.sqrt(diff.sum(axis=1)))
+
     def recognize(self, audio: np.ndarray, features: np.ndarray = None) -> Tuple[str, float, str, List[Tuple[str, str, float]], float]:
         """
         Recognize command from audio.
@@ -271,12 +469,17 @@ class FastLPCMatcher:
         best_template = ''
         all_distances = []
 
-        # Compare with all command templates
+        # Compare with all command templates (one vectorized pass over the stacked matrix)
+        dists = self._distances(
+            features, [t for templates in self.templates.values() for t in templates], 'templates'
+        )
+        idx = 0
         for command, templates in self.templates.items():
-            for i, template in enumerate(templates):
-                # Fast Euclidean distance
-                dist = np.sqrt(np.sum((features - template) ** 2))
-                tpl_name = self.template_names[command][i]
+            names = self.template_names[command]
+            for i in range(len(templates)):
+                dist = dists[idx]
+                idx += 1
+                tpl_name = names[i]
                 all_distances.append((command, tpl_name, dist))
                 if dist < best_distance:
                     best_distance = dist
@@ -286,10 +489,7 @@ class FastLPCMatcher:
         # Compute noise distance
         noise_distance = float('inf')
         if self.noise_templates:
-            for noise_feat in self.noise_templates:
-                dist = np.sqrt(np.sum((features - noise_feat) ** 2))
-                if dist < noise_distance:
-                    noise_distance = dist
+            noise_distance = min(self._distances(features, self.noise_templates, 'noise'))
 
         # Sort by distance
         all_distances.sort(key=lambda x: x[2])
@@ -308,9 +508,20 @@ class FastLPCMatcher:
 # Multi-Method Matcher
 # =============================================================================
 
+# Methods whose query features derive from the shared power spectrogram
+_STFT_METHODS = ('mfcc_dtw', 'mel', 'rasta_plp')
+
+@lru_cache(maxsize=1)
+def _method_executor() -> ThreadPoolExecutor:
+    """Shared pool extracting MultiMethodMatcher features concurrently (created on first use)."""
+    return ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix='matcher')
+
+
 class MultiMethodMatcher:
     """Ensemble matcher using multiple methods."""
 
+    __slots__ = ('mfcc_first_delta_only', 'matchers')
+
     def __init__(self, methods: List[str] = None, mfcc_first_delta_only: bool = False):
         """
         Args:
@@ -329,15 +540,102 @@ class MultiMethodMatcher:
             else:
                 self.matchers[m] = TemplateMatcher(method=m, mfcc_first_delta_only=self.mfcc_first_delta_only)
 
-    def add_template(self, command: str, audio: np.ndarray, filename: str = None):
-        """Add template to all matchers."""
+    def _processed_features(self, processed: np.ndarray) -> Dict[str, np.ndarray]:
+        """Per-method features of preprocessed audio (one STFT for MFCC / MEL / RASTA-PLP)."""
+        S = None
+        if any(m in _STFT_METHODS for m in self.matchers):
+            S = compute_power_spectrogram(processed)
+        features = {}
+        for method, matcher in self.matchers.items():
+            feats = self._query_features(method, processed, S)
+            features[method] = matcher._processed_features(processed) if feats is None else feats
+        return features
+
+    def template_features(self, audio: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Per-method template features for `audio`.
+
+        Pass the result to add_template(features=...) to register the same
+        audio in several matchers (e.g. leave-one-out evaluation) without
+        extracting it again.
+        """
+        return self._processed_features(preprocess_audio(audio))
+
+    def add_template(self, command: str, audio: np.ndarray, filename: str = None,
+                     features: Dict[str, np.ndarray] = None):
+        """
+        Add template to all matchers (one preprocess, one shared STFT for
+        MFCC / MEL / RASTA-PLP).
+
+        `features`: precomputed per-method features from template_features().
+        """
+        if features is None:
+            features = self.template_features(audio)
+        for method, matcher in self.matchers.items():
+            matcher.add_template(command, audio, filename, features=features.get(method))
+
+    def remove_template(self, filename: str) -> Dict[str, list]:
+        """
+        Remove the templates added as `filename` from all matchers.
+
+        Together with restore_templates() this lets one matcher serve every
+        leave-one-out split (hold a template out, evaluate, put it back)
+        instead of rebuilding a matcher per held-out file.
+        """
+        return {method: matcher.remove_template(filename) for method, matcher in self.matchers.items()}
+
+    def restore_templates(self, removed: Dict[str, list]):
+        """Undo remove_template(): templates return to their original positions."""
+        for method, entries in removed.items():
+            self.matchers[method].restore_templates(entries)
+
+    def template_count(self) -> int:
+        """Number of command templates (per matcher)."""
         for matcher in self.matchers.values():
-            matcher.add_template(command, audio, filename)
+            return sum(len(templates) for templates in matcher.templates.values())
+        return 0
 
     def add_noise_template(self, audio: np.ndarray):
         """Add noise template to all matchers."""
-        for matcher in self.matchers.values():
-            matcher.add_noise_template(audio)
+        features = self.template_features(audio)
+        for method, matcher in self.matchers.items():
+            matcher.add_noise_template(audio, features=features[method])
+
+    def add_noise_templates_batch(self, segments: List[np.ndarray]):
+        """
+        Add several noise templates at once.
+
+        Equal-length segments (as produced by noise calibration) share one
+        batched STFT for the MFCC / MEL / RASTA-PLP features; the result is
+        the same as calling add_noise_template() for each segment.
+        """
+        processed = [preprocess_audio(audio) for audio in segments]
+        spectra = [None] * len(segments)
+        if any(m in _STFT_METHODS for m in self.matchers):
+            by_len: Dict[int, List[int]] = {}
+            for i, proc in enumerate(processed):
+                by_len.setdefault(len(proc), []).append(i)
+            for idx in by_len.values():
+                S = compute_power_spectrogram(np.stack([processed[i] for i in idx]))
+                for k, i in enumerate(idx):
+                    spectra[i] = S[k]
+
+        for method, matcher in self.matchers.items():
+            for audio, proc, S in zip(segments, processed, spectra):
+                feats = self._query_features(method, proc, S)
+                if feats is None:
+                    feats = matcher._processed_features(proc)
+                matcher.add_noise_template(audio, features=feats)
+
+    def warmup(self):
+        """
+        Run one throwaway recognition so one-time setup (numba JIT compilation
+        or cache load, mel filterbanks, packed templates) happens now instead
+        of on the first real segment.
+        """
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(config.SAMPLE_RATE // 2) * 1000).astype(np.int16)
+        self.recognize(audio, mode='all')
 
     def get_noise_template_count(self) -> int:
         """Get number of noise templates."""
@@ -346,20 +644,125 @@ class MultiMethodMatcher:
             return len(matcher.noise_templates)
         return 0
 
-    def recognize(self, audio: np.ndarray, mode: str = 'best', adaptive: bool = False, methods: List[str] = None, known_snr: float = None) -> Dict:
+    def _query_features(self, method: str, processed_audio: np.ndarray, S: np.ndarray = None):
+        """Query features for `method`, or None to let the matcher extract its own."""
+        if method == 'mfcc_dtw':
+            return extract_mfcc(processed_audio, first_delta_only=self.mfcc_first_delta_only, S=S)
+        if method == 'mel':
+            return extract_mel_template(processed_audio, S=S)
+        if method == 'rasta_plp':
+            return extract_rasta_plp(processed_audio, S=S)
+        return None
+
+    def _method_features(self, method: str, processed_audio: np.ndarray,
+                         S: np.ndarray) -> Optional[np.ndarray]:
+        """Query features for `method`."""
+        if method == 'stats':
+            return None
+        feats = self._query_features(method, processed_audio, S)
+        if feats is None:
+            feats = self.matchers[method]._processed_features(processed_audio)
+        return feats
+
+    def _run_method(self, method: str, audio: np.ndarray, feats: Optional[np.ndarray]) -> Dict:
+        """Match precomputed features for one method and return its result dict."""
+        # Skip stats execution
+        if method == 'stats':
+            return {
+                'command': 'NONE',
+                'distance': float('inf'),
+                'best_template': '',
+                'all_distances': [],
+                'noise_distance': float('inf')
+            }
+
+        cmd, dist, best_tpl, all_dists, noise_dist = self.matchers[method].recognize(audio, features=feats)
+
+        return {
+            'command': cmd,
+            'distance': dist,
+            'best_template': best_tpl,
+            'all_distances': all_dists,
+            'noise_distance': noise_dist
+        }
+
+    def _vote_confidence(self, method: str, result: Dict) -> float:
+        """Ensemble vote confidence of one method's result."""
+        cmd = result['command']
+        if cmd == 'NOISE':
+            return 1.0  # High confidence if it explicitly matches noise template
+        if cmd == 'NONE':
+            return 0.0  # distance > threshold
+        # For simplicity, if cmd is valid, conf = 1 - dist/thresh
+        threshold = getattr(self.matchers.get(method), 'threshold', 1.0)
+        return max(0, 1 - (result['distance'] / threshold))
+
+    def recognize(self, audio: np.ndarray, mode: str = 'best', adaptive: bool = False, methods: List[str] = None,
+                  known_snr: float = None, early_reject: bool = False) -> Dict:
         """
         Recognize using all methods.
 
         Args:
             audio: Audio samples
             mode: 'best' returns only best result, 'all' returns all results
+                plus the max-confidence single-method decision
+                ('best_command', 'best_confidence', 'best_method').
+                'cascade' returns the same fields as 'all' but evaluates
+                methods in descending ensemble weight and stops once the
+                methods not yet run could no longer overturn the leading
+                vote, so 'command' is the one 'all' would return;
+                all_results (and the single-method 'best_*' fields and the
+                normalized confidence) then only cover the methods actually
+                evaluated.
             adaptive: Whether to use SNR-adaptive weighting
             methods: Optional subset of matcher names to evaluate (default: all)
             known_snr: Optional known SNR to use instead of estimating it
+            early_reject: Run mfcc_dtw first and, if it matches a noise
+                template, return NOISE without evaluating the other methods
+                (all_results then only holds mfcc_dtw)
+
+        Unless cascade / early_reject need the methods in order, feature
+        extraction for the methods runs concurrently on a shared thread pool
+        (config.PARALLEL_METHODS, multi-core hosts only). Template matching
+        stays on the calling thread: the DTW kernels are already parallel
+        over templates.
 
         Returns:
             Dict with recognition results
         """
+        return self._recognize(audio, preprocess_audio(audio), None, mode, adaptive, methods,
+                               known_snr, early_reject)
+
+    def recognize_batch(self, audios: List[np.ndarray], mode: str = 'best', adaptive: bool = False,
+                        methods: List[str] = None, early_reject: bool = False) -> List[Dict]:
+        """
+        recognize() for several clips; returns one result dict per clip.
+
+        Clips whose preprocessed lengths match share one batched STFT for the
+        MFCC / MEL / RASTA-PLP features (as in add_noise_templates_batch);
+        results are the same as calling recognize() on each clip.
+        """
+        processed = [preprocess_audio(audio) for audio in audios]
+        spectra = [None] * len(audios)
+        active = methods or list(self.matchers.keys())
+        if mode == 'mfcc_dtw' or any(m in _STFT_METHODS and m in self.matchers for m in active):
+            by_len: Dict[int, List[int]] = {}
+            for i, proc in enumerate(processed):
+                by_len.setdefault(len(proc), []).append(i)
+            for idx in by_len.values():
+                if len(idx) < 2:
+                    continue
+                S = compute_power_spectrogram(np.stack([processed[i] for i in idx]))
+                for k, i in enumerate(idx):
+                    spectra[i] = S[k]
+
+        return [self._recognize(audio, proc, S, mode, adaptive, methods, None, early_reject)
+                for audio, proc, S in zip(audios, processed, spectra)]
+
+    def _recognize(self, audio: np.ndarray, processed_audio: np.ndarray, S: Optional[np.ndarray], mode: str,
+                   adaptive: bool, methods: Optional[List[str]], known_snr: Optional[float],
+                   early_reject: bool) -> Dict:
+        """recognize() on already preprocessed audio (`S`: its power spectrogram, or None)."""
         # Limit active methods if requested
         active_methods = methods or list(self.matchers.keys())
         active_methods = [m for m in active_methods if m in self.matchers]
@@ -371,60 +774,6 @@ class MultiMethodMatcher:
             active_methods = ['mfcc_dtw']
             mode = 'best'
 
-        # 1. Preprocess audio ONCE
-        processed_audio = preprocess_audio(audio)
-        
-        # 2. Extract features ONCE for each needed type
-        feature_cache = {}
-        
-        # We know we need MFCC, MEL, LPC. Stats is disabled.
-        # But to be safe with the 'methods' list, we check.
-        
-        if 'mfcc_dtw' in active_methods:
-            feature_cache['mfcc_dtw'] = extract_mfcc(processed_audio, first_delta_only=self.mfcc_first_delta_only)
-
-        if 'mel' in active_methods:
-            feature_cache['mel'] = extract_mel_template(processed_audio)
-
-        if 'rasta_plp' in active_methods:
-            feature_cache['rasta_plp'] = extract_rasta_plp(processed_audio)
-
-        # For LPC with FastLPCMatcher, let it handle feature extraction internally
-        # (it needs to resize and flatten, which is specific to FastLPCMatcher)
-        # So we don't pre-cache LPC features
-            
-        # Skip 'stats' feature extraction entirely (saving time)
-        
-        results = {}
-        for method in active_methods:
-            matcher = self.matchers.get(method)
-            if matcher is None:
-                continue
-            # Skip stats execution
-            if method == 'stats':
-                results[method] = {
-                    'command': 'NONE',
-                    'distance': float('inf'),
-                    'best_template': '',
-                    'all_distances': [],
-                    'noise_distance': float('inf')
-                }
-                continue
-                
-            # Use pre-computed features (except for LPC which handles its own)
-            feats = feature_cache.get(method)
-            # For LPC (FastLPCMatcher), pass None to let it extract internally
-            if method == 'lpc':
-                feats = None
-            cmd, dist, best_tpl, all_dists, noise_dist = matcher.recognize(audio, features=feats)
-            results[method] = {
-                'command': cmd,
-                'distance': dist,
-                'best_template': best_tpl,
-                'all_distances': all_dists,
-                'noise_distance': noise_dist
-            }
-
         # Adaptive Weighting Logic
         snr = 50.0  # Default to clean
         if adaptive:
@@ -442,25 +791,77 @@ class MultiMethodMatcher:
                 'lpc': 0.5        # Decreased: Fragile in high noise
             }
 
+        cascade = mode == 'cascade'
+        ensemble_order = active_methods
+        if cascade:
+            # Heaviest votes first, so the leading vote settles early
+            active_methods = sorted(active_methods, key=lambda m: -weights.get(m, 1.0))
+        early_reject = early_reject and 'mfcc_dtw' in active_methods
+        if early_reject:
+            active_methods = ['mfcc_dtw'] + [m for m in active_methods if m != 'mfcc_dtw']
+
+        # Extract features ONCE for each needed type, on first use.
+        # MFCC / MEL / RASTA-PLP share one STFT; compute it once (unless the
+        # caller already did). LPC (FastLPCMatcher) and raw_dtw extract their
+        # own features, but from the same preprocessed audio.
+        results = {}
+        active_methods = [m for m in active_methods if m in self.matchers]
+        if (config.PARALLEL_METHODS and not (cascade or early_reject)
+                and len(active_methods) > 1 and (os.cpu_count() or 1) > 1):
+            if S is None and any(m in _STFT_METHODS for m in active_methods):
+                S = compute_power_spectrogram(processed_audio)
+            pool = _method_executor()
+            futures = [(m, pool.submit(self._method_features, m, processed_audio, S)) for m in active_methods]
+            for method, future in futures:
+                results[method] = self._run_method(method, audio, future.result())
+        else:
+            # 'cascade': running weighted votes (scored as in the ensemble
+            # below) and the most the methods not yet run could still add
+            votes = {}
+            remaining_weight = sum(weights.get(m, 1.0) for m in active_methods)
+            for method in active_methods:
+                if S is None and method in _STFT_METHODS:
+                    S = compute_power_spectrogram(processed_audio)
+                result = self._run_method(method, audio, self._method_features(method, processed_audio, S))
+                results[method] = result
+
+                cmd = result['command']
+                if early_reject and cmd == 'NOISE':
+                    break
+                if cascade:
+                    weight = weights.get(method, 1.0)
+                    remaining_weight -= weight
+                    votes[cmd] = votes.get(cmd, 0.0) + weight * self._vote_confidence(method, result)
+                    ranked = sorted(votes.values(), reverse=True)
+                    runner_up = ranked[1] if len(ranked) > 1 else 0.0
+                    # Confidence is at most 1, so the rest can add at most remaining_weight
+                    if ranked[0] - runner_up > remaining_weight:
+                        break
+            if cascade:
+                # Score in the usual method order (same tie-breaking as 'all')
+                results = {m: results[m] for m in ensemble_order if m in results}
+
         command_scores = {}
         total_weight = 0.0
 
+        # Max-confidence single-method decision, tracked in the same pass
+        single_command = 'NONE'
+        single_confidence = 0.0
+        single_method = None
+        noise_votes = 0
+
         for method, result in results.items():
             cmd = result['command']
             weight = weights.get(method, 1.0)
-            
-            # Confidence calculation
-            threshold = getattr(self.matchers.get(method), 'threshold', 1.0)
-            # If distance > threshold (NONE), confidence is 0
-            # If NOISE, confidence is based on how much closer it is to noise than command?
-            # For simplicity, if cmd is valid, conf = 1 - dist/thresh
-            
-            if cmd not in ('NONE', 'NOISE'):
-                conf = max(0, 1 - (result['distance'] / threshold))
-            elif cmd == 'NOISE':
-                conf = 1.0 # High confidence if it explicitly matches noise template
-            else:
-                conf = 0.0
+            conf = self._vote_confidence(method, result)
+            result['confidence'] = conf
+
+            if cmd == 'NOISE':
+                noise_votes += 1
+            elif cmd != 'NONE' and conf > single_confidence:
+                single_confidence = conf
+                single_command = cmd
+                single_method = method
 
             # Accumulate scores
             # We treat 'NOISE' and 'NONE' as distinct votes
@@ -506,7 +907,13 @@ class MultiMethodMatcher:
             'snr': snr # Debug info
         }
 
-        if mode == 'all':
+        if mode in ('all', 'cascade'):
+            # If majority say NOISE, override the max-confidence decision
+            if noise_votes > len(results) // 2:
+                single_command = 'NOISE'
+            response['best_command'] = single_command
+            response['best_confidence'] = single_confidence
+            response['best_method'] = single_method
             return response
         
         if mode == 'best':
@@ -529,13 +936,17 @@ class MultiMethodMatcher:
         # 1. Standard extraction
         processed_audio = preprocess_audio(audio)
         feature_cache = {}
-        
+
+        S = None
+        if any(m in self.matchers for m in ('mfcc_dtw', 'mel', 'rasta_plp')):
+            S = compute_power_spectrogram(processed_audio)
+
         if 'mfcc_dtw' in self.matchers:
-            feature_cache['mfcc_dtw'] = extract_mfcc(processed_audio, first_delta_only=self.mfcc_first_delta_only)
+            feature_cache['mfcc_dtw'] = extract_mfcc(processed_audio, first_delta_only=self.mfcc_first_delta_only, S=S)
         if 'mel' in self.matchers:
-            feature_cache['mel'] = extract_mel_template(processed_audio)
+            feature_cache['mel'] = extract_mel_template(processed_audio, S=S)
         if 'rasta_plp' in self.matchers:
-            feature_cache['rasta_plp'] = extract_rasta_plp(processed_audio)
+            feature_cache['rasta_plp'] = extract_rasta_plp(processed_audio, S=S)
 
         # 2. Get individual results
         results = {}
@@ -543,7 +954,8 @@ class MultiMethodMatcher:
             if method == 'stats': continue
             
             feats = feature_cache.get(method)
-            if method == 'lpc': feats = None
+            if feats is None:
+                feats = matcher._processed_features(processed_audio)
             
             cmd, dist, best_tpl, all_dists, noise_dist = matcher.recognize(audio, features=feats)
             results[method] = {
@@ -620,6 +1032,57 @@ class MultiMethodMatcher:
             command_mapping=config.COMMAND_MAPPING,
         )
 
+    def save(self, path) -> None:
+        """Pickle the matcher (templates and extracted features) to `path`."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> Optional['MultiMethodMatcher']:
+        """Load a matcher saved with save(); None if missing or unreadable."""
+        try:
+            with open(path, 'rb') as f:
+                matcher = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError):
+            return None
+        return matcher if isinstance(matcher, cls) else None
+
+
+# =============================================================================
+# Matcher Cache
+# =============================================================================
+
+MATCHER_CACHE_DIR = Path.home() / ".cache" / "bio-voice"
+# Bump when the pickled matcher layout changes so stale cache files are ignored
+MATCHER_CACHE_FORMAT = 3
+
+
+def matcher_cache_path(template_files: Iterable, methods: List[str],
+                       mfcc_first_delta_only: bool = False) -> Path:
+    """
+    Cache file for a matcher built from `template_files`.
+
+    The key covers each file's path, mtime and size, the matcher settings and
+    all scalar and tuple config constants, so editing a template or a
+    feature/threshold setting selects a fresh cache entry.
+    """
+    files = []
+    for p in template_files:
+        st = os.stat(p)
+        files.append((str(p), st.st_mtime_ns, st.st_size))
+    settings = sorted(
+        (k, v) for k, v in vars(config).items()
+        if k.isupper() and isinstance(v, (int, float, str, bool, tuple))
+    )
+    key_src = repr((MATCHER_CACHE_FORMAT, sorted(files), list(methods), mfcc_first_delta_only, settings))
+    key = hashlib.sha1(key_src.encode('utf-8')).hexdigest()
+    return MATCHER_CACHE_DIR / f"matcher-{key}.pkl"
+
+
 def get_adaptive_weights(snr_db: float) -> Dict[str, float]:
     """
     Get weights based on SNR.
@@ -12,13 +12,27 @@ class VADState(Enum):
     PROCESSING = 2
 
 
+def compute_rms(samples: np.ndarray) -> float:
+    """
+    RMS of PCM samples without allocating a float copy of the buffer.
+
+    einsum casts to float64 chunk by chunk inside its buffered loop and sums
+    the products in float64: for int16 input every product and partial sum
+    is an exact integer below 2**53, so this matches an int64 accumulation
+    for any realistic buffer length.
+    """
+    n = len(samples)
+    if n == 0:
+        return 0.0
+    return float(np.sqrt(np.einsum('i,i->', samples, samples, dtype=np.float64, casting='same_kind') / n))
+
+
 class VAD:
     """Energy-based Voice Activity Detection with dynamic thresholding."""
 
     def __init__(self, background_rms: float = 100.0):
         self.state = VADState.SILENCE
         self.background_rms = background_rms
-        self._speech_buffer = []
         self._silence_frames = 0
         self._speech_frames = 0
         self._adaptation_rate = 0.05  # Slow adaptation rate (was 0.01, increased for responsiveness)
@@ -28,6 +42,12 @@ class VAD:
         self._max_speech_frames = int(config.VAD_MAX_SPEECH_MS * config.SAMPLE_RATE / 1000 / config.CHUNK_SIZE)
         self._silence_frames_threshold = int(config.VAD_SILENCE_MS * config.SAMPLE_RATE / 1000 / config.CHUNK_SIZE)
 
+        # Preallocated segment buffer: speech chunks are copied in place and the
+        # completed segment is returned as a view (valid until the next recording).
+        # Headroom covers resampled chunks that run slightly over CHUNK_SIZE.
+        self._seg_buf = np.empty((self._max_speech_frames + 2) * config.CHUNK_SIZE * 2, dtype=np.int16)
+        self._seg_len = 0
+
     def set_background(self, rms: float):
         """Update background RMS."""
         self.background_rms = max(rms, 50.0)  # minimum floor
@@ -40,9 +60,7 @@ class VAD:
 
     def _compute_energy(self, samples: np.ndarray) -> float:
         """Compute RMS energy of samples."""
-        if len(samples) == 0:
-            return 0.0
-        return np.sqrt(np.mean(samples.astype(np.float32) ** 2))
+        return compute_rms(samples)
 
     def _compute_zcr(self, samples: np.ndarray) -> float:
         """Compute zero crossing rate."""
@@ -53,10 +71,23 @@ class VAD:
         crossings = np.sum(np.abs(np.diff(signs)) > 0)
         return crossings / len(samples)
 
+    def _append_speech(self, chunk: np.ndarray):
+        """Copy chunk into the preallocated segment buffer (growing it if needed)."""
+        end = self._seg_len + len(chunk)
+        if end > len(self._seg_buf) or chunk.dtype != self._seg_buf.dtype:
+            grown = np.empty(max(end, 2 * len(self._seg_buf)), dtype=chunk.dtype)
+            grown[:self._seg_len] = self._seg_buf[:self._seg_len]
+            self._seg_buf = grown
+        self._seg_buf[self._seg_len:end] = chunk
+        self._seg_len = end
+
     def process_chunk(self, chunk: np.ndarray) -> tuple:
         """
         Process audio chunk and return (state, speech_segment or None).
 
+        The returned segment is a view into a reused buffer; it stays valid
+        until the next recording starts, so copy it to keep it longer.
+
         Returns:
             (VADState, np.ndarray or None): Current state and completed speech segment if any
         """
@@ -67,7 +98,8 @@ class VAD:
         if self.state == VADState.SILENCE:
             if is_speech:
                 self.state = VADState.RECORDING
-                self._speech_buffer = [chunk.copy()]
+                self._seg_len = 0
+                self._append_speech(chunk)
                 self._speech_frames = 1
                 self._silence_frames = 0
             else:
@@ -84,7 +116,7 @@ class VAD:
             return (self.state, None)
 
         elif self.state == VADState.RECORDING:
-            self._speech_buffer.append(chunk.copy())
+            self._append_speech(chunk)
             self._speech_frames += 1
 
             if is_speech:
@@ -104,12 +136,10 @@ class VAD:
                 # Check minimum length
                 if self._speech_frames >= self._min_speech_frames:
                     self.state = VADState.PROCESSING
-                    segment = np.concatenate(self._speech_buffer)
-                    self._speech_buffer = []
-                    return (self.state, segment)
+                    return (self.state, self._seg_buf[:self._seg_len])
                 else:
                     # Too short, discard
-                    self._speech_buffer = []
+                    self._seg_len = 0
                     self.state = VADState.SILENCE
 
             return (self.state, None)
@@ -123,7 +153,7 @@ class VAD:
     def reset(self):
         """Reset VAD to silence state."""
         self.state = VADState.SILENCE
-        self._speech_buffer = []
+        self._seg_len = 0
         self._silence_frames = 0
         self._speech_frames = 0
 
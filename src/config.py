@@ -13,6 +13,10 @@ SAMPLE_RATE = 16000
 CHANNELS = 1
 CHUNK_SIZE = 256  # Reduced to ~16ms for lower latency response
 DTYPE = 'int16'
+# Max audio buffered between the stream callback and its consumer; on
+# overrun the oldest chunks are dropped so a stalled consumer resumes on
+# recent audio instead of working through a backlog
+AUDIO_QUEUE_MAX_MS = 8000
 
 # VAD settings
 # --- Default (Quiet/Normal Environment) ---
@@ -48,6 +52,12 @@ STATS_SEGMENTS = 3  # number of segments for stats features
 
 # DTW settings
 DTW_RADIUS = 8  # Increased for better speed variation tolerance (was 3)
+# Sakoe-Chiba band (frames) for the numba DTW kernels; None = exact DTW
+DTW_BAND_RADIUS = None
+# DTW methods whose packed templates are stored as int8 (per-template, per-feature scale)
+# for the numba DTW path, e.g. ('mfcc_dtw', 'rasta_plp', 'lpc').
+# raw_dtw: longest templates (~1 frame/ms); int8 distances stay within 2% of float32
+INT8_TEMPLATE_METHODS = ('raw_dtw',)
 
 # Recognition thresholds (tuned for higher sensitivity in-game)
 THRESHOLD_MFCC_DTW = 320.0  # Slightly looser to avoid false negatives on quiet speech
@@ -57,6 +67,9 @@ THRESHOLD_LPC = 110.0       # FastLPCMatcher - Balanced (tested: 80 too loose, 1
 THRESHOLD_RASTA_PLP = 280.0 # RASTA-PLP Matcher
 THRESHOLD_RAW_DTW = 0.020  # Raw audio DTW (downsampled 16x, normalized distance)
 
+# Run MultiMethodMatcher methods concurrently on a thread pool (multi-core hosts)
+PARALLEL_METHODS = True
+
 # Command list
 COMMANDS = ['START', 'PAUSE', 'JUMP', 'FLIP']
 
@@ -3,12 +3,12 @@ EventBus - 執行緒安全的事件匯流排
 用於 ECG、語音、遊戲模組間的通訊
 """
 
-import queue
 import threading
 import time
+from collections import deque
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Dict, List, Callable, Any, Optional
+from typing import Deque, Dict, Tuple, Callable, Any, Optional
 
 
 class EventType(Enum):
@@ -37,10 +37,14 @@ class EventType(Enum):
 
 @dataclass
 class Event:
-    """事件資料結構"""
+    """事件資料結構
+
+    timestamp: 建立時的 time.perf_counter_ns()（單調時鐘，單位 ns，int），
+    只適合計算時間差（如分發延遲），不是 time.time() 的牆上時間（秒）。
+    """
     type: EventType
     data: Dict[str, Any] = field(default_factory=dict)
-    timestamp: float = field(default_factory=time.time)
+    timestamp: int = field(default_factory=time.perf_counter_ns)
 
 
 class EventBus:
@@ -68,31 +72,51 @@ class EventBus:
         if self._initialized:
             return
 
-        self._subscribers: Dict[EventType, List[Callable[[Event], None]]] = {}
-        self._queue: queue.Queue = queue.Queue()
+        # 訂閱表採 copy-on-write：subscribe/unsubscribe 換掉整個 tuple，
+        # 分發時直接讀取，不需加鎖也不用每個事件複製一次 list
+        self._subscribers: Dict[EventType, Tuple[Callable[[Event], None], ...]] = {}
+        self._subscribe_lock = threading.Lock()
+        # 事件佇列：deque + Condition，分發執行緒阻塞等待而非 timeout 輪詢
+        self._queue: Deque[Event] = deque()
+        queue_lock = threading.Lock()
+        self._queue_cond = threading.Condition(queue_lock)
+        # 已發布但尚未分發完成的事件數；歸零時通知 flush()（與佇列共用鎖）
+        self._unfinished = 0
+        self._idle_cond = threading.Condition(queue_lock)
         self._running = False
         self._dispatch_thread: Optional[threading.Thread] = None
         self._initialized = True
 
     def subscribe(self, event_type: EventType, callback: Callable[[Event], None]) -> None:
         """訂閱事件類型"""
-        with self._lock:
-            if event_type not in self._subscribers:
-                self._subscribers[event_type] = []
-            self._subscribers[event_type].append(callback)
+        with self._subscribe_lock:
+            self._subscribers[event_type] = self._subscribers.get(event_type, ()) + (callback,)
 
     def unsubscribe(self, event_type: EventType, callback: Callable[[Event], None]) -> None:
         """取消訂閱"""
-        with self._lock:
-            if event_type in self._subscribers:
-                try:
-                    self._subscribers[event_type].remove(callback)
-                except ValueError:
-                    pass
+        with self._subscribe_lock:
+            callbacks = list(self._subscribers.get(event_type, ()))
+            try:
+                callbacks.remove(callback)
+            except ValueError:
+                return
+            self._subscribers[event_type] = tuple(callbacks)
 
     def publish(self, event: Event) -> None:
         """發布事件（非阻塞）"""
-        self._queue.put(event)
+        with self._queue_cond:
+            self._queue.append(event)
+            self._unfinished += 1
+            self._queue_cond.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待目前已發布的事件全部分發完成（回呼都已返回）
+
+        Returns:
+            True 表示已清空；timeout 秒內未完成（例如匯流排未啟動）則為 False
+        """
+        with self._idle_cond:
+            return self._idle_cond.wait_for(lambda: self._unfinished == 0, timeout)
 
     def start(self) -> None:
         """啟動事件分發執行緒"""
@@ -113,8 +137,8 @@ class EventBus:
             return
 
         self._running = False
-        # 發送關閉事件以喚醒分發執行緒
-        self._queue.put(Event(EventType.SYSTEM_SHUTDOWN))
+        # 發送關閉事件以喚醒分發執行緒（之前已發布的事件會先分發完）
+        self.publish(Event(EventType.SYSTEM_SHUTDOWN))
 
         if self._dispatch_thread:
             self._dispatch_thread.join(timeout=2.0)
@@ -122,28 +146,30 @@ class EventBus:
 
     def _dispatch_loop(self) -> None:
         """事件分發主迴圈"""
-        while self._running:
-            try:
-                event = self._queue.get(timeout=0.1)
-
-                if event.type == EventType.SYSTEM_SHUTDOWN:
-                    # 通知所有關閉訂閱者
-                    self._dispatch(event)
-                    break
-
-                self._dispatch(event)
+        queue = self._queue
+        cond = self._queue_cond
+        while True:
+            with cond:
+                while not queue:
+                    cond.wait()
+                event = queue.popleft()
+
+            # 通知所有訂閱者（包含關閉事件）
+            self._dispatch(event)
+            self._task_done(1)
+            if event.type == EventType.SYSTEM_SHUTDOWN:
+                break
 
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"[EventBus] Dispatch error: {e}")
+    def _task_done(self, n: int) -> None:
+        """n 個事件已分發（或被丟棄）；全部完成時喚醒 flush()"""
+        with self._idle_cond:
+            self._unfinished -= n
+            if self._unfinished == 0:
+                self._idle_cond.notify_all()
 
     def _dispatch(self, event: Event) -> None:
         """分發事件給訂閱者"""
-        with self._lock:
-            callbacks = self._subscribers.get(event.type, []).copy()
-
-        for callback in callbacks:
+        for callback in self._subscribers.get(event.type, ()):
             try:
                 callback(event)
             except Exception as e:
@@ -151,15 +177,15 @@ class EventBus:
 
     def clear(self) -> None:
         """清除所有訂閱（用於測試）"""
-        with self._lock:
+        with self._subscribe_lock:
             self._subscribers.clear()
 
-        # 清空佇列
-        while not self._queue.empty():
-            try:
-                self._queue.get_nowait()
-            except queue.Empty:
-                break
+        # 清空佇列（被丟棄的事件不再等待分發）
+        with self._queue_cond:
+            dropped = len(self._queue)
+            self._queue.clear()
+        if dropped:
+            self._task_done(dropped)
 
     @classmethod
     def reset_instance(cls) -> None:
@@ -178,4 +204,4 @@ class EventBus:
     @property
     def queue_size(self) -> int:
         """取得佇列大小"""
-        return self._queue.qsize()
+        return len(self._queue)
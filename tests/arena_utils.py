@@ -0,0 +1,526 @@
+"""Shared helpers for the arena tests (augmentation, template preloading, result counters)."""
+
+import glob
+import hashlib
+import logging
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fractions import Fraction
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import librosa
+import numpy as np
+from scipy.signal import resample_poly
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+from src import config
+from src.audio.io import load_audio_file
+from src.audio.recognizers import MultiMethodMatcher
+
+logger = logging.getLogger(__name__)
+
+# Constants (no magic numbers)
+FLOAT_COMPARE_EPSILON = 1e-6
+AUDIO_MIN_AMPLITUDE = -1.0
+AUDIO_MAX_AMPLITUDE = 1.0
+AUDIO_INT16_SCALE = 32767.0
+# Phase-vocoder frame for Speed/Pitch: ~40 ms rounded up to a power of two
+# (librosa's default 2048 smears short command clips at 16 kHz)
+AUG_N_FFT = 1 << int(np.ceil(np.log2(0.04 * config.SAMPLE_RATE)))
+AUG_HOP_LENGTH = AUG_N_FFT // 4
+# Speed / Pitch values this close to identity skip the phase vocoder (a
+# rate-1 time_stretch still re-synthesizes, i.e. costs an STFT + iSTFT and smears)
+AUG_SKIP_EPS = 1e-3  # |rate - 1|
+AUG_PITCH_SKIP_STEPS = 0.01  # |n_steps| in semitones
+HIGH_SNR_THRESHOLD = 100  # dB - effectively clean audio
+PRELOAD_MAX_WORKERS = 16  # template decode threads (libsndfile / soxr release the GIL)
+PROGRESS_EVERY = 10  # progress line every N files (every file and every case with --verbose)
+# On-disk cache of the deterministic (phase-vocoder) augmentations, shared by
+# successive runs / modes; disable with --no-aug-cache
+AUG_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "record", "aug_cache")
+CACHED_AUG_TYPES = ('Speed', 'Pitch')
+
+# Outcome slots of the result counters (last axis)
+OUTCOME_CORRECT = 0
+OUTCOME_WRONG_COMMAND = 1  # Predicted wrong command
+OUTCOME_NO_MATCH = 2  # Predicted NONE (rejection)
+OUTCOME_NOISE = 3  # Predicted NOISE
+N_OUTCOMES = 4
+
+
+# Noise suite seed: the module generator and every per-clip generator derive from it
+ARENA_SEED = 0
+
+# Noise augmentation scratch: one float32 buffer, grown to the longest clip
+_RNG = np.random.default_rng(ARENA_SEED)
+_NOISE_BUF = np.empty(0, dtype=np.float32)
+
+
+def clip_rng(filepath: str) -> np.random.Generator:
+    """Generator seeded from ARENA_SEED and the clip's file name.
+
+    Noise results then depend neither on the leave-one-out order nor on how
+    the clips are spread over --jobs worker processes.
+    """
+    return np.random.default_rng([ARENA_SEED, zlib.crc32(os.path.basename(filepath).encode('utf-8'))])
+
+
+def unit_noise_like(audio: np.ndarray, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Unit-variance float32 noise for apply_augmentation(unit_noise=...).
+
+    Drawing it once per clip and reusing it across the Noise suite replaces
+    one full-length draw per SNR value with a scalar rescale; every SNR then
+    also sees the same noise realisation.
+    """
+    return (_RNG if rng is None else rng).standard_normal(len(audio), dtype=np.float32)
+
+
+def noise_buffer(n: int) -> np.ndarray:
+    """Shared float32 scratch of length n for noise draws (reused, so consume it before the next call)."""
+    global _NOISE_BUF
+    if len(_NOISE_BUF) < n:
+        _NOISE_BUF = np.empty(n, dtype=np.float32)
+    return _NOISE_BUF[:n]
+
+
+def is_close(a: float, b: float, epsilon: float = FLOAT_COMPARE_EPSILON) -> bool:
+    """Safe floating point comparison."""
+    return abs(a - b) < epsilon
+
+
+def is_identity_augmentation(aug_type: str, value: float) -> bool:
+    """True when (aug_type, value) leaves the audio (effectively) unchanged, e.g. the suites' reference points."""
+    if aug_type == 'Speed':
+        return is_close(value, 1.0, AUG_SKIP_EPS)
+    if aug_type == 'Volume':
+        return is_close(value, 1.0)
+    if aug_type == 'Pitch':
+        return is_close(value, 0.0, AUG_PITCH_SKIP_STEPS)
+    if aug_type == 'Noise':
+        return value >= HIGH_SNR_THRESHOLD
+    return False
+
+
+def apply_augmentation(audio: np.ndarray, aug_type: str, value: float,
+                       unit_noise: Optional[np.ndarray] = None) -> np.ndarray:
+    """Apply specific augmentation to audio.
+
+    Args:
+        audio: Input audio as int16 numpy array
+        aug_type: Type of augmentation (Speed, Pitch, Noise, Volume)
+        value: Augmentation parameter value
+        unit_noise: Optional unit-variance noise (see unit_noise_like) scaled
+            for the Noise suite instead of drawing fresh noise
+
+    Returns:
+        Augmented audio as int16 numpy array
+
+    Raises:
+        ValueError: If audio is empty (int16 input from load_audio_file /
+            preload_templates is already known to be finite)
+    """
+    # Validate input
+    if len(audio) == 0:
+        raise ValueError("Empty audio array")
+
+    # No-op values (present in every suite) and unknown types return before
+    # the float conversion
+    if is_identity_augmentation(aug_type, value):
+        return audio
+    if aug_type not in ('Speed', 'Pitch', 'Noise', 'Volume'):
+        logger.warning(f"Unknown augmentation type: {aug_type}")
+        return audio
+
+    # Convert to float32 for processing (scaled in place: one allocation)
+    y_float = audio.astype(np.float32)
+    y_float /= AUDIO_INT16_SCALE
+
+    try:
+        if aug_type == 'Speed':
+            y_aug = librosa.effects.time_stretch(y_float, rate=value, n_fft=AUG_N_FFT, hop_length=AUG_HOP_LENGTH)
+
+        elif aug_type == 'Pitch':
+            y_aug = librosa.effects.pitch_shift(y_float, sr=config.SAMPLE_RATE, n_steps=value,
+                                           n_fft=AUG_N_FFT, hop_length=AUG_HOP_LENGTH)
+
+        elif aug_type == 'Noise':
+            p_signal = float(np.dot(y_float, y_float)) / len(y_float)
+            if p_signal < FLOAT_COMPARE_EPSILON:
+                logger.warning("Signal power too low for noise addition")
+                return audio
+
+            # SNR = 10 * log10(Ps/Pn) -> Pn = Ps / 10^(SNR/10)
+            p_noise = p_signal / (10 ** (value / 10.0))
+            # y_float is our own copy: add the scaled noise in place. The gain is
+            # a float32 scalar (an np.float64 one runs the multiply in float64)
+            noise = noise_buffer(len(y_float))
+            noise_gain = np.float32(np.sqrt(p_noise))
+            if unit_noise is None:
+                _RNG.standard_normal(dtype=np.float32, out=noise)
+                noise *= noise_gain
+            else:
+                np.multiply(unit_noise, noise_gain, out=noise)
+            y_aug = np.add(y_float, noise, out=y_float)
+
+        else:  # Volume
+            y_float *= value
+            y_aug = y_float
+
+        # Clip to valid range and convert back to int16; y_aug is always our
+        # own float32 array here, so clip/scale reuse it
+        np.clip(y_aug, AUDIO_MIN_AMPLITUDE, AUDIO_MAX_AMPLITUDE, out=y_aug)
+        y_aug *= AUDIO_INT16_SCALE
+        return y_aug.astype(np.int16)
+
+    except Exception as e:
+        logger.error(f"Augmentation failed ({aug_type}={value}): {e}")
+        return audio  # Return original on error
+
+
+# Mixed-arena time stretch / pitch shift: WSOLA (numba) replaces librosa's STFT
+# phase vocoder; librosa stays the fallback when numba is not installed
+# The kernels compile (or load from numba's cache) on the first time_stretch()
+# call, so arenas that never stretch don't pay for them; run_mixed_test
+# augments every clip before its timed loop
+WSOLA_FRAME = 1024      # analysis / synthesis frame (samples)
+WSOLA_HOP = 256         # synthesis hop
+WSOLA_TOLERANCE = 128   # +/- samples searched for the best-aligned analysis frame
+WSOLA_SEARCH_STEP = 8   # coarse offset grid, refined to single samples around the best hit
+PITCH_RATIO_MAX_DENOM = 100  # resample_poly up/down limit for the pitch ratio
+# Same flag subset as the DTW kernels: the offset search starts from -inf, so
+# full fastmath's no-NaN/no-Inf assumptions are left out
+_WSOLA_FASTMATH = {'reassoc', 'contract', 'nsz', 'arcp'}
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=_WSOLA_FASTMATH)
+    def _frame_correlation(x, a, b, n):
+        """Dot product of x[a:a + n] and x[b:b + n] (float32, vectorizable)."""
+        acc = np.float32(0.0)
+        for i in range(n):
+            acc += x[a + i] * x[b + i]
+        return acc
+
+    @njit(cache=True, fastmath=_WSOLA_FASTMATH)
+    def _wsola_stretch(y, rate):
+        """
+        WSOLA time-stretch of float32 audio to round(len(y) / rate) samples
+        (rate > 1 = faster), pitch unchanged.
+
+        Each Hann frame is taken near its nominal position k * hop * rate,
+        shifted within +/- WSOLA_TOLERANCE to best correlate with the natural
+        continuation of the previous frame, and overlap-added at k * hop.
+        The offset search is coarse-to-fine (WSOLA_SEARCH_STEP grid, then
+        +/- step around its best hit) instead of trying every offset.
+        """
+        n = WSOLA_FRAME
+        hop = WSOLA_HOP
+        tol = WSOLA_TOLERANCE
+        step = WSOLA_SEARCH_STEP
+        half = n // 2
+        out_len = int(round(len(y) / rate))
+        n_frames = out_len // hop + 1
+
+        # Zero padding keeps every candidate segment in range
+        pad = n + tol + int(hop * rate) + 1
+        x = np.zeros(len(y) + 2 * pad, dtype=np.float32)
+        x[pad:pad + len(y)] = y
+
+        window = np.empty(n, dtype=np.float32)
+        for i in range(n):
+            window[i] = 0.5 - 0.5 * np.cos(2.0 * np.pi * i / n)
+
+        out = np.zeros(n_frames * hop + n, dtype=np.float32)
+        norm = np.zeros(n_frames * hop + n, dtype=np.float32)
+        prev = pad - half
+        for k in range(n_frames):
+            nominal = pad - half + int(round(k * hop * rate))
+            start = nominal
+            if k > 0:
+                # Natural continuation of the previous frame
+                natural = prev + hop
+                best = -np.inf
+                for d in range(-tol, tol + 1, step):
+                    corr = _frame_correlation(x, nominal + d, natural, n)
+                    if corr > best:
+                        best = corr
+                        start = nominal + d
+                coarse = start
+                lo = max(coarse - step + 1, nominal - tol)
+                hi = min(coarse + step - 1, nominal + tol)
+                for s in range(lo, hi + 1):
+                    if s != coarse:
+                        corr = _frame_correlation(x, s, natural, n)
+                        if corr > best:
+                            best = corr
+                            start = s
+            o = k * hop
+            for i in range(n):
+                out[o + i] += window[i] * x[start + i]
+                norm[o + i] += window[i]
+            prev = start
+
+        result = np.empty(out_len, dtype=np.float32)
+        for i in range(out_len):
+            w = norm[half + i]
+            result[i] = out[half + i] / w if w > 1e-6 else 0.0
+        return result
+
+
+def mixed_stft(audio: np.ndarray) -> Optional[np.ndarray]:
+    """STFT of an int16 clip (scaled to float32 [-1, 1]) for reuse across scenarios.
+
+    Only the librosa fallback of time_stretch / pitch_shift analyses the clip
+    with an STFT; passing this to them computes it once per clip instead of
+    once per scenario. With WSOLA it is not needed and None is returned.
+    """
+    if NUMBA_AVAILABLE:
+        return None
+    return librosa.stft(audio.astype(np.float32) / AUDIO_INT16_SCALE)
+
+
+def _stretch_stft(stft: np.ndarray, rate: float, n_samples: int) -> np.ndarray:
+    # librosa.effects.time_stretch() minus its analysis STFT
+    stretched = librosa.phase_vocoder(stft, rate=rate)
+    return librosa.istft(stretched, dtype=np.float32, length=int(round(n_samples / rate)))
+
+
+def time_stretch(y: np.ndarray, rate: float, stft: Optional[np.ndarray] = None) -> np.ndarray:
+    """Change duration by 1 / rate, keeping pitch (float32 in / out).
+
+    stft: optional mixed_stft() of y, reused by the librosa fallback
+    """
+    if NUMBA_AVAILABLE:
+        return _wsola_stretch(np.ascontiguousarray(y, dtype=np.float32), rate)
+    return _stretch_stft(librosa.stft(y) if stft is None else stft, rate, len(y))
+
+
+def pitch_shift(y: np.ndarray, n_steps: float, stft: Optional[np.ndarray] = None) -> np.ndarray:
+    """Shift pitch by n_steps semitones, keeping duration (float32 in / out).
+
+    stft: optional mixed_stft() of y, reused by the librosa fallback
+    """
+    if not NUMBA_AVAILABLE:
+        # librosa.effects.pitch_shift(): stretch by 1 / ratio, then resample back
+        rate = 2.0 ** (-float(n_steps) / 12)
+        y_stretch = _stretch_stft(librosa.stft(y) if stft is None else stft, rate, len(y))
+        y_shift = librosa.resample(y_stretch, orig_sr=float(config.SAMPLE_RATE) / rate,
+                                   target_sr=config.SAMPLE_RATE, res_type='soxr_hq')
+        return librosa.util.fix_length(y_shift, size=len(y))
+    # Resample by 1 / ratio (played back at the same rate: pitch * ratio), then
+    # stretch back to the original length
+    ratio = Fraction(2.0 ** (n_steps / 12.0)).limit_denominator(PITCH_RATIO_MAX_DENOM)
+    y_res = resample_poly(y, ratio.denominator, ratio.numerator).astype(np.float32)
+    return time_stretch(y_res, len(y_res) / len(y))
+
+
+def cached_augmentation(audio: np.ndarray, aug_type: str, value: float,
+                        unit_noise: Optional[np.ndarray] = None,
+                        cache_dir: Optional[str] = AUG_CACHE_DIR) -> np.ndarray:
+    """apply_augmentation() with Speed / Pitch results persisted in `cache_dir`.
+
+    The key covers the clip samples, the augmentation and the phase-vocoder
+    settings, so re-running the arena (e.g. mfcc, then ensemble) loads those
+    clips instead of recomputing them. Noise / Volume are cheap (and Noise is
+    random), so they are never cached; cache_dir=None disables caching.
+    """
+    if cache_dir is None or aug_type not in CACHED_AUG_TYPES or is_identity_augmentation(aug_type, value):
+        return apply_augmentation(audio, aug_type, value, unit_noise)
+
+    key = hashlib.sha1(np.ascontiguousarray(audio).tobytes())
+    key.update(f"{aug_type}:{value!r}:{AUG_N_FFT}:{AUG_HOP_LENGTH}:{librosa.__version__}".encode())
+    path = os.path.join(cache_dir, key.hexdigest() + ".npy")
+    try:
+        return np.load(path)
+    except (OSError, ValueError):
+        pass
+
+    y_aug = apply_augmentation(audio, aug_type, value, unit_noise)
+    if y_aug is not audio:  # the input comes back only when augmentation failed
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write-then-rename so concurrent workers never read a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, y_aug)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache augmentation ({aug_type}={value}): {e}")
+    return y_aug
+
+
+# (keyword, label) pairs in COMMAND_MAPPING order (first match wins)
+_LABEL_KEYWORDS = tuple(config.COMMAND_MAPPING.items())
+
+
+@lru_cache(maxsize=4096)
+def get_label_from_filename(filename: str) -> str:
+    """Extract command label from filename (memoized: each runner asks per file several times)."""
+    fname = os.path.basename(filename)
+    for cn, en in _LABEL_KEYWORDS:
+        if cn in fname:
+            return en
+    return "UNKNOWN"
+
+
+def command_template_files(template_dir: str) -> List[str]:
+    """Sorted command templates in `template_dir` (known label, not a noise recording)."""
+    return sorted(
+        f for f in glob.iglob(os.path.join(template_dir, "*.*"))
+        if get_label_from_filename(f) != "UNKNOWN" and 'noise' not in os.path.basename(f).lower()
+    )
+
+
+def preload_templates(valid_files: List[str]) -> Dict[str, Tuple[np.ndarray, str]]:
+    """Preload all templates once for memory efficiency.
+
+    Args:
+        valid_files: List of file paths to load
+
+    Returns:
+        Dictionary mapping file path to (audio, label) tuple
+    """
+    print("\nPreloading all templates...")
+    templates = {}
+    failed = []
+
+    def load(filepath):
+        try:
+            return load_audio_file(filepath), None
+        except Exception as e:
+            return None, e
+
+    # Decode files on a thread pool; map() keeps the valid_files order
+    workers = max(1, min(PRELOAD_MAX_WORKERS, len(valid_files)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for idx, (filepath, (audio, error)) in enumerate(zip(valid_files, executor.map(load, valid_files))):
+            if error is not None:
+                filename = os.path.basename(filepath)
+                logger.error(f"Failed to load {filename}: {error}")
+                failed.append(filename)
+                continue
+            templates[filepath] = (audio, get_label_from_filename(filepath))
+            if (idx + 1) % PROGRESS_EVERY == 0 or idx + 1 == len(valid_files):
+                print(f"\r  Loaded {idx+1}/{len(valid_files)} templates", end='', flush=True)
+
+    print()  # New line after progress
+
+    if failed:
+        logger.warning(f"Failed to load {len(failed)} templates: {failed}")
+
+    print(f"Successfully preloaded {len(templates)}/{len(valid_files)} templates")
+    return templates
+
+
+def precompute_template_features(all_templates: Dict[str, Tuple[np.ndarray, str]],
+                                 methods: List[str]) -> Dict[str, dict]:
+    """Per-method features of every preloaded template, keyed by file path.
+
+    Template features don't depend on the train split: extracting them once
+    lets every leave-one-out matcher reuse them instead of N-1 times per file.
+    """
+    feature_matcher = MultiMethodMatcher(methods=methods)
+    return {
+        filepath: feature_matcher.template_features(audio)
+        for filepath, (audio, _) in all_templates.items()
+    }
+
+
+# Leave-one-out worker state: the shared, read-only inputs are sent once per
+# process through the pool initializer rather than with every task
+LOO_CONTEXT: Dict[str, Any] = {}
+
+
+def init_loo_worker(all_templates: Dict[str, Tuple[np.ndarray, str]],
+                    template_features: Dict[str, dict], methods: List[str],
+                    extra: Optional[Dict[str, Any]] = None) -> None:
+    """Store the leave-one-out inputs in LOO_CONTEXT for this process.
+
+    One matcher holding every template is built here (LOO_CONTEXT['matcher']);
+    the evaluate function removes the held-out file from it and restores it
+    afterwards. `extra` holds script-specific entries (e.g. use_adaptive).
+    """
+    matcher = MultiMethodMatcher(methods=methods)
+    for train_file, (train_audio, train_label) in all_templates.items():
+        try:
+            matcher.add_template(train_label, train_audio, os.path.basename(train_file),
+                                 features=template_features[train_file])
+        except Exception as e:
+            logger.error(f"Failed to add template {os.path.basename(train_file)}: {e}")
+
+    LOO_CONTEXT.clear()
+    LOO_CONTEXT.update(extra or {}, all_templates=all_templates, matcher=matcher)
+    if multiprocessing.parent_process() is not None:
+        # The process pool already occupies every core
+        config.PARALLEL_METHODS = False
+
+
+def run_leave_one_out(test_files: Sequence[str], evaluate: Callable[[str], Any],
+                      init: Callable[..., None], initargs: tuple, jobs: int) -> Iterator[Tuple[str, Any]]:
+    """Yield (test_file, evaluate(test_file)) for every file, in order.
+
+    jobs == 1 runs in this process; otherwise the files are spread over a
+    spawn process pool whose workers each run init(*initargs) once. `evaluate`
+    and `init` must be module-level functions (they are pickled by reference).
+    The pool is shut down when the generator is exhausted or closed.
+    """
+    pool = None
+    if jobs == 1:
+        init(*initargs)
+        outcomes = map(evaluate, test_files)
+    else:
+        # Keep each worker single-threaded (BLAS / numba) so they don't oversubscribe the cores
+        os.environ.setdefault('OMP_NUM_THREADS', '1')
+        os.environ.setdefault('NUMBA_NUM_THREADS', '1')
+        pool = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=init, initargs=initargs)
+        outcomes = pool.map(evaluate, test_files)
+
+    try:
+        yield from zip(test_files, outcomes)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def suite_indices(test_suites: Dict[str, List[float]]) -> Tuple[Dict[str, int], Dict[str, Dict[float, int]]]:
+    """(suite -> index, suite -> {value -> index}) for addressing result counters."""
+    suite_idx = {suite: s for s, suite in enumerate(test_suites)}
+    val_idx = {suite: {val: v for v, val in enumerate(values)} for suite, values in test_suites.items()}
+    return suite_idx, val_idx
+
+
+def new_result_counters(test_suites: Dict[str, List[float]], n_methods: int) -> np.ndarray:
+    """Zeroed arena counters indexed [suite, method, value, outcome] (see suite_indices)."""
+    max_values = max(len(values) for values in test_suites.values())
+    return np.zeros((len(test_suites), n_methods, max_values, N_OUTCOMES), dtype=np.int32)
+
+
+def outcome_index(expected: str, predicted: str) -> int:
+    """Outcome slot for one prediction."""
+    if predicted == expected:
+        return OUTCOME_CORRECT
+    if predicted == 'NONE':
+        return OUTCOME_NO_MATCH
+    if predicted == 'NOISE':
+        return OUTCOME_NOISE
+    return OUTCOME_WRONG_COMMAND
+
+
+def counter_accuracy(counts: np.ndarray) -> float:
+    """Accuracy from one scenario's outcome counts."""
+    total = int(counts.sum())
+    return int(counts[OUTCOME_CORRECT]) / total if total > 0 else 0.0
+
+
+def accuracy_table(counters: np.ndarray) -> np.ndarray:
+    """counter_accuracy() over every scenario at once: float array of counters.shape[:-1]."""
+    totals = counters.sum(axis=-1)
+    return counters[..., OUTCOME_CORRECT] / np.maximum(totals, 1)
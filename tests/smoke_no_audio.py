@@ -7,6 +7,7 @@ Run with:
 
 import os
 import sys
+from functools import lru_cache
 import numpy as np
 
 # Ensure project root on path
@@ -18,19 +19,29 @@ if PROJECT_ROOT not in sys.path:
 from src.audio.recognizers import MultiMethodMatcher
 
 
-def run():
-    sr = 16000
-    duration_sec = 0.5
-    t = np.linspace(0, duration_sec, int(sr * duration_sec), endpoint=False)
-    # Simple synthetic tone to serve as a "template" and a slightly shifted query
-    template_audio = 0.2 * np.sin(2 * np.pi * 440 * t)
-    query_audio = 0.2 * np.sin(2 * np.pi * 442 * t)
+# Synthetic signals are built once at import and shared read-only
+SR = 16000
+DURATION_SEC = 0.5
+_T = np.linspace(0, DURATION_SEC, int(SR * DURATION_SEC), endpoint=False)
+# Simple synthetic tone to serve as a "template" and a slightly shifted query
+_TEMPLATE = 0.2 * np.sin(2 * np.pi * 440 * _T)
+_QUERY = 0.2 * np.sin(2 * np.pi * 442 * _T)
+_NOISE = np.zeros_like(_TEMPLATE)
+for _arr in (_T, _TEMPLATE, _QUERY, _NOISE):
+    _arr.setflags(write=False)
+
 
+@lru_cache(maxsize=1)
+def _matcher():
+    """Return a MultiMethodMatcher preloaded with the synthetic templates."""
     matcher = MultiMethodMatcher(methods=["mfcc_dtw", "mel", "lpc"])
-    matcher.add_template("START", template_audio, "synthetic_template.wav")
-    matcher.add_noise_template(np.zeros_like(template_audio))
+    matcher.add_template("START", _TEMPLATE, "synthetic_template.wav")
+    matcher.add_noise_template(_NOISE)
+    return matcher
 
-    result = matcher.recognize(query_audio, adaptive=True, mode="best")
+
+def run():
+    result = _matcher().recognize(_QUERY, adaptive=True, mode="best")
     print("Smoke test result:", result)
 
 
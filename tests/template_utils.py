@@ -1,6 +1,7 @@
 """Shared helpers for locating command templates in tests."""
 
 import os
+from functools import lru_cache
 
 ENV_VAR_NAME = "CMD_TEMPLATES_DIR"
 
@@ -11,11 +12,15 @@ def _resolve_dir(path: str):
     return expanded if os.path.isdir(expanded) else None
 
 
+@lru_cache(maxsize=1)
 def locate_cmd_templates():
     """
     Return the path to command templates, preferring tests/cmd_templates and
     falling back to project-level cmd_templates. An environment variable
     CMD_TEMPLATES_DIR can override the default lookup.
+
+    The result is cached for the process; call locate_cmd_templates.cache_clear()
+    after changing CMD_TEMPLATES_DIR.
     """
     env_override = os.environ.get(ENV_VAR_NAME)
     if env_override:
@@ -40,6 +40,19 @@ LABEL_DISPLAY = {
     'NONE': 'NONE',
 }
 
+# Confusion matrices are dense arrays indexed by LABEL_IDX; predictions
+# outside LABELS (e.g. FLIP) share one extra column that is not rendered.
+LABELS = ['START', 'JUMP', 'PAUSE', 'NONE', 'NOISE']
+LABEL_IDX = {label: i for i, label in enumerate(LABELS)}
+OTHER_IDX = len(LABELS)
+NOISE_IDX = LABEL_IDX['NOISE']
+ACTUAL_LABELS = ['START', 'JUMP', 'PAUSE', 'NOISE']
+
+# Markdown confusion table pieces, built once
+_CM_HEADER = ("| Actual \\ Predicted |" + "".join(f" {pred} |" for pred in LABELS) + "\n"
+              + "|" + "-" * 20 + "|" + "------:|" * len(LABELS) + "\n")
+_CM_ROW = "| **{}** |" + " {} |" * len(LABELS) + "\n"
+
 
 def collect_noise_samples(audio_stream, duration_ms=2000, num_samples=5):
     """
@@ -54,30 +67,18 @@ def collect_noise_samples(audio_stream, duration_ms=2000, num_samples=5):
         List of noise audio segments
     """
     samples_needed = int(config.SAMPLE_RATE * duration_ms / 1000)
-    collected = []
 
     print(f"Collecting {num_samples} noise samples over {duration_ms}ms...")
 
-    while len(collected) < samples_needed:
-        chunk = audio_stream.get_chunk(timeout=0.5)
-        if len(chunk) > 0:
-            collected.extend(chunk)
-
-    audio = np.array(collected[:samples_needed], dtype=np.int16)
-
-    # Split into segments
-    segment_len = len(audio) // num_samples
-    noise_samples = []
+    # One preallocated buffer filled chunk by chunk (no Python list of samples)
+    audio = audio_stream.read_into(np.empty(samples_needed, dtype=np.int16))
 
-    for i in range(num_samples):
-        start = i * segment_len
-        end = start + segment_len
-        segment = audio[start:end]
-        # Always use the segment, even if it's quiet
-        if len(segment) > 0:
-            noise_samples.append(segment)
-
-    return noise_samples
+    # Split into equal segments (views into audio; the remainder is dropped).
+    # Always use the segments, even if they're quiet
+    segment_len = samples_needed // num_samples
+    if segment_len == 0:
+        return []
+    return list(audio[:segment_len * num_samples].reshape(num_samples, segment_len))
 
 
 def get_user_label():
@@ -94,6 +95,17 @@ def get_user_label():
             return None
 
 
+def _new_confusion():
+    return np.zeros((OTHER_IDX + 1, OTHER_IDX + 1), dtype=np.int32)
+
+
+def _confusion_table(cm):
+    """Markdown rows for a dense confusion matrix."""
+    return (_CM_HEADER
+            + "".join(_CM_ROW.format(actual, *cm[LABEL_IDX[actual], :OTHER_IDX]) for actual in ACTUAL_LABELS)
+            + "\n")
+
+
 def generate_report(stats, matcher, output_path):
     """Generate markdown report."""
 
@@ -147,26 +159,7 @@ def generate_report(stats, matcher, output_path):
 
             # Confusion matrix
             f.write("#### Confusion Matrix\n\n")
-            labels = ['START', 'JUMP', 'PAUSE', 'NONE', 'NOISE']
-            cm = method_stats['confusion']
-
-            f.write("| Actual \\ Predicted |")
-            for pred in labels:
-                f.write(f" {pred} |")
-            f.write("\n")
-
-            f.write("|" + "-" * 20 + "|")
-            for _ in labels:
-                f.write("------:|")
-            f.write("\n")
-
-            for actual in ['START', 'JUMP', 'PAUSE', 'NOISE']:
-                f.write(f"| **{actual}** |")
-                for pred in labels:
-                    count = cm.get((actual, pred), 0)
-                    f.write(f" {count} |")
-                f.write("\n")
-            f.write("\n")
+            f.write(_confusion_table(method_stats['confusion']))
 
             # Distance statistics
             f.write("#### Distance Statistics\n\n")
@@ -218,26 +211,7 @@ def generate_report(stats, matcher, output_path):
 
         # Confusion matrix for ensemble
         f.write("### Ensemble Confusion Matrix\n\n")
-        labels = ['START', 'JUMP', 'PAUSE', 'NONE', 'NOISE']
-        cm = stats['ensemble']['confusion']
-
-        f.write("| Actual \\ Predicted |")
-        for pred in labels:
-            f.write(f" {pred} |")
-        f.write("\n")
-
-        f.write("|" + "-" * 20 + "|")
-        for _ in labels:
-            f.write("------:|")
-        f.write("\n")
-
-        for actual in ['START', 'JUMP', 'PAUSE', 'NOISE']:
-            f.write(f"| **{actual}** |")
-            for pred in labels:
-                count = cm.get((actual, pred), 0)
-                f.write(f" {count} |")
-            f.write("\n")
-        f.write("\n")
+        f.write(_confusion_table(stats['ensemble']['confusion']))
 
         # Timing statistics
         f.write("## Timing Statistics\n\n")
@@ -255,8 +229,8 @@ def generate_report(stats, matcher, output_path):
 
         # Detailed log
         f.write("## Detailed Test Log\n\n")
-        f.write("| # | Ground Truth | Ensemble | mfcc_dtw | stats | mel | lpc |\n")
-        f.write("|--:|:-------------|:---------|:---------|:------|:----|:----|\n")
+        f.write("| # | Ground Truth | Ensemble |" + "".join(f" {method} |" for method in methods) + "\n")
+        f.write("|--:|:-------------|:---------|" + ":---|" * len(methods) + "\n")
 
         for i, record in enumerate(stats['records'], 1):
             gt = record['ground_truth']
@@ -337,12 +311,15 @@ def test_qa():
         print("\n[ERROR] No templates found!")
         return
 
+    # Snapshot thresholds once; the detection loop only reads this dict
+    thresholds = {m: matcher.matchers[m].threshold for m in matcher.matchers}
+
     # Print current thresholds
     print("\n" + "-" * 80)
     print("Current Thresholds:")
     print("-" * 80)
-    for method, m in matcher.matchers.items():
-        print(f"  {method:12s}: {m.threshold:.2f}")
+    for method, threshold in thresholds.items():
+        print(f"  {method:12s}: {threshold:.2f}")
 
     # Find suitable audio device
     print("\n" + "=" * 80)
@@ -413,7 +390,7 @@ def test_qa():
                 'false_negative': 0,
                 'misclassified': 0,
                 'noise_correctly_rejected': 0,
-                'confusion': defaultdict(int),
+                'confusion': _new_confusion(),
                 'distances': [],
                 'noise_distances': [],
                 'distances_by_label': defaultdict(list),
@@ -425,105 +402,88 @@ def test_qa():
             'false_negative': 0,
             'misclassified': 0,
             'noise_correctly_rejected': 0,
-            'confusion': defaultdict(int),
+            'confusion': _new_confusion(),
         }
     }
 
-    vad_start_time = None
+    vad_start_ns = None
     last_state = VADState.SILENCE
     quit_flag = False
 
     try:
         while not quit_flag:
-            chunk = audio_stream.get_chunk(timeout=0.02)
+            # Block until the callback delivers a chunk; the 1 s timeout only
+            # keeps Ctrl+C responsive on Windows
+            chunk = audio_stream.get_chunk(timeout=1.0)
             if len(chunk) == 0:
                 continue
 
             state, segment = vad.process_chunk(chunk)
 
             if state == VADState.RECORDING and last_state == VADState.SILENCE:
-                vad_start_time = time.time()
+                vad_start_ns = time.perf_counter_ns()
                 print("\r[Recording...]", end='', flush=True)
 
             last_state = state
 
             if state == VADState.PROCESSING and segment is not None:
-                vad_end_time = time.time()
-                vad_latency = (vad_end_time - vad_start_time) * 1000 if vad_start_time else 0
+                vad_end_ns = time.perf_counter_ns()
+                vad_latency = (vad_end_ns - vad_start_ns) * 1e-6 if vad_start_ns else 0
                 stats['vad_latencies'].append(vad_latency)
 
                 stats['total'] += 1
                 segment_duration = len(segment) / config.SAMPLE_RATE
 
-                print(f"\r" + "=" * 80)
-                print(f"[Sample #{stats['total']}] Duration: {segment_duration:.2f}s")
-                print("-" * 80)
+                # Whole detection report is accumulated and written once
+                out = [
+                    "\r" + "=" * 80,
+                    f"[Sample #{stats['total']}] Duration: {segment_duration:.2f}s",
+                    "-" * 80,
+                ]
 
                 # Process with selected method
-                total_start = time.time()
+                total_start_ns = time.perf_counter_ns()
                 raw_results = matcher.recognize(segment, mode='all')
-                total_proc_time = (time.time() - total_start) * 1000
+                total_proc_time = (time.perf_counter_ns() - total_start_ns) * 1e-6
                 stats['processing_times'].append(total_proc_time)
 
-                # Compute decision based on selected method
+                # Decision comes precomputed from recognize(mode='all')
                 if args.method == 'mfcc_dtw':
                     # Use only MFCC+DTW
                     best_command = raw_results['all_results']['mfcc_dtw']['command']
                     best_method = 'mfcc_dtw'
                     best_confidence = 0.0
                 else:
-                    # Compute ensemble decision
-                    best_command = 'NONE'
-                    best_confidence = 0.0
-                    best_method = None
-                    noise_votes = 0
-
-                    for method, res in raw_results['all_results'].items():
-                        cmd = res['command']
-                        dist = res['distance']
-                        threshold = matcher.matchers[method].threshold
-
-                        if cmd == 'NOISE':
-                            noise_votes += 1
-                        elif cmd not in ('NONE', 'NOISE'):
-                            conf = 1 - min(dist / threshold, 1)
-                            if conf > best_confidence:
-                                best_confidence = conf
-                                best_command = cmd
-                                best_method = method
-
-                    # If majority say NOISE, override
-                    if noise_votes > len(raw_results['all_results']) // 2:
-                        best_command = 'NOISE'
-
-                # Collect predictions for all methods (for reporting)
+                    best_command = raw_results['best_command']
+                    best_method = raw_results['best_method']
+                    best_confidence = raw_results['best_confidence']
+
+                # Single pass: predictions and per-method display lines
                 predictions = {}
-                for method, res in raw_results['all_results'].items():
-                    predictions[method] = res['command']
+                out.append("\nPredictions:")
 
-                # Show results
-                print(f"\nPredictions:")
                 for method, res in raw_results['all_results'].items():
                     cmd = res['command']
                     dist = res['distance']
-                    best_tpl = res['best_template']
-                    noise_dist = res.get('noise_distance', float('inf'))
-                    threshold = matcher.matchers[method].threshold
-                    conf_pct = max(0, (1 - dist / threshold) * 100)
+                    predictions[method] = cmd
 
+                    noise_dist = res.get('noise_distance', float('inf'))
                     noise_info = ""
                     if noise_dist < float('inf'):
                         noise_info = f", noise_dist={noise_dist:.3f}"
                         if noise_dist < dist:
                             noise_info += " <CLOSER"
 
-                    print(f"  {method:12s}: {cmd:8s} (dist={dist:.3f}, conf={conf_pct:.1f}%{noise_info}, tpl={best_tpl})")
+                    conf_pct = max(0, (1 - dist / thresholds[method]) * 100)
+                    out.append(f"  {method:12s}: {cmd:8s} (dist={dist:.3f}, conf={conf_pct:.1f}%{noise_info}, tpl={res['best_template']})")
 
-                print(f"\n>>> ENSEMBLE: {best_command}", end="")
                 if best_method:
-                    print(f" (by {best_method}, conf={best_confidence*100:.1f}%, time={total_proc_time:.0f}ms)")
+                    out.append(f"\n>>> ENSEMBLE: {best_command} (by {best_method}, conf={best_confidence*100:.1f}%, time={total_proc_time:.0f}ms)")
                 else:
-                    print(f" (time={total_proc_time:.0f}ms)")
+                    out.append(f"\n>>> ENSEMBLE: {best_command} (time={total_proc_time:.0f}ms)")
+
+                sys.stdout.write('\n'.join(out) + '\n')
+                sys.stdout.flush()
 
                 # Get user label
                 ground_truth = get_user_label()
@@ -552,14 +512,14 @@ def test_qa():
                         if res.get('noise_distance', float('inf')) < float('inf'):
                             stats['per_method'][method]['noise_distances'].append(res['noise_distance'])
                         stats['per_method'][method]['distances_by_label']['NOISE'].append(res['distance'])
-                        stats['per_method'][method]['confusion'][('NOISE', pred)] += 1
+                        stats['per_method'][method]['confusion'][NOISE_IDX, LABEL_IDX.get(pred, OTHER_IDX)] += 1
 
                         if pred in ('NONE', 'NOISE'):
                             stats['per_method'][method]['noise_correctly_rejected'] += 1
                         else:
                             stats['per_method'][method]['false_positive'] += 1
 
-                    stats['ensemble']['confusion'][('NOISE', best_command)] += 1
+                    stats['ensemble']['confusion'][NOISE_IDX, LABEL_IDX.get(best_command, OTHER_IDX)] += 1
                     if best_command in ('NONE', 'NOISE'):
                         stats['ensemble']['noise_correctly_rejected'] += 1
                     else:
@@ -572,7 +532,7 @@ def test_qa():
                         if res.get('noise_distance', float('inf')) < float('inf'):
                             stats['per_method'][method]['noise_distances'].append(res['noise_distance'])
                         stats['per_method'][method]['distances_by_label'][ground_truth].append(res['distance'])
-                        stats['per_method'][method]['confusion'][(ground_truth, pred)] += 1
+                        stats['per_method'][method]['confusion'][LABEL_IDX[ground_truth], LABEL_IDX.get(pred, OTHER_IDX)] += 1
 
                         if pred == ground_truth:
                             stats['per_method'][method]['correct'] += 1
@@ -581,7 +541,7 @@ def test_qa():
                         else:
                             stats['per_method'][method]['misclassified'] += 1
 
-                    stats['ensemble']['confusion'][(ground_truth, best_command)] += 1
+                    stats['ensemble']['confusion'][LABEL_IDX[ground_truth], LABEL_IDX.get(best_command, OTHER_IDX)] += 1
                     if best_command == ground_truth:
                         stats['ensemble']['correct'] += 1
                     elif best_command in ('NONE', 'NOISE'):
@@ -601,9 +561,12 @@ def test_qa():
                 print("=" * 80)
                 print()
 
+                # Resume; audio captured while labelling is stale
+                audio_stream.discard_pending()
+
                 # Reset VAD
                 vad.reset()
-                vad_start_time = None
+                vad_start_ns = None
 
     except KeyboardInterrupt:
         print("\n\nStopping...")
@@ -4,9 +4,11 @@ import sys
 import os
 import time
 import argparse
+import json
+from array import array
 import numpy as np
 from datetime import datetime
-from collections import defaultdict
+from types import SimpleNamespace
 
 # Ensure the project root is in the Python path for module imports
 _current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -33,33 +35,44 @@ LABEL_MAP = {
     'n': 'NOISE',
 }
 
+# Report labels; verified samples are stored as indices into this list.
+# Predictions outside it (e.g. FLIP) share one extra index that is tallied
+# but not shown in the confusion tables.
+LABELS = ['START', 'JUMP', 'PAUSE', 'NONE', 'NOISE']
+LABEL_IDX = {label: i for i, label in enumerate(LABELS)}
+OTHER_IDX = len(LABELS)
+COMMAND_LABELS = LABELS[:3]
+
+# Markdown confusion table pieces, built once
+_CM_HEADER = ("| Actual \\ Predicted |" + "".join(f" {pred} |" for pred in LABELS) + "\n"
+              + "|" + "-" * 20 + "|" + "------:|" * len(LABELS) + "\n")
+_CM_ROW = "| **{}** |" + " {} |" * len(LABELS) + "\n"
+
 
 def collect_noise_samples(audio_stream, duration_ms=2000, num_samples=5):
     """Collect noise samples from background audio."""
     samples_needed = int(config.SAMPLE_RATE * duration_ms / 1000)
-    collected = []
 
     print(f"Collecting {num_samples} noise samples over {duration_ms}ms...")
 
-    while len(collected) < samples_needed:
-        chunk = audio_stream.get_chunk(timeout=0.5)
-        if len(chunk) > 0:
-            collected.extend(chunk)
+    # Chunks are copied straight into one preallocated buffer
+    buf = audio_stream.read_into(np.empty(samples_needed, dtype=np.int16))
+
+    # Split into equal segments (views into buf; the remainder is dropped)
+    segment_len = samples_needed // num_samples
+    if segment_len == 0:
+        return []
+    return list(buf[:segment_len * num_samples].reshape(num_samples, segment_len))
 
-    audio = np.array(collected[:samples_needed], dtype=np.int16)
 
-    # Split into segments
-    segment_len = len(audio) // num_samples
-    noise_samples = []
+def _decide_mfcc_dtw(raw_results):
+    """(command, method, confidence) using only MFCC+DTW."""
+    return raw_results['all_results']['mfcc_dtw']['command'], 'mfcc_dtw', 0.0
 
-    for i in range(num_samples):
-        start = i * segment_len
-        end = start + segment_len
-        segment = audio[start:end]
-        if len(segment) > 0:
-            noise_samples.append(segment)
 
-    return noise_samples
+def _decide_ensemble(raw_results):
+    """(command, method, confidence) from matcher.recognize's weighted decision."""
+    return raw_results['command'], raw_results.get('method', 'ensemble'), raw_results.get('confidence', 0.0)
 
 
 def get_user_label():
@@ -76,171 +89,192 @@ def get_user_label():
             return None
 
 
+def _confusion_matrix(gt_idx, pred_idx):
+    """Tally parallel label-index arrays into a dense (LABELS + other) square matrix."""
+    cm = np.zeros((OTHER_IDX + 1, OTHER_IDX + 1), dtype=np.int64)
+    np.add.at(cm, (np.frombuffer(gt_idx, dtype=np.int8), np.frombuffer(pred_idx, dtype=np.int8)), 1)
+    return cm
+
+
+def _confusion_table(cm):
+    """Markdown rows for a confusion matrix (only for verified commands)."""
+    return (_CM_HEADER
+            + "".join(_CM_ROW.format(actual, *cm[LABEL_IDX[actual], :OTHER_IDX]) for actual in COMMAND_LABELS)
+            + "\n")
+
+
 def generate_report(stats, matcher, output_path):
-    """Generate markdown report."""
+    """Generate markdown report.
 
-    methods = list(matcher.matchers.keys())
+    The report is assembled in memory and written with a single f.write().
+    """
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("# Voice Recognition QA Test Report (QA2 - Commands Only)\n\n")
-        f.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-
-        # Overall summary
-        f.write("## Overall Summary\n\n")
-        f.write(f"- **Total samples:** {stats['total']}\n")
-        f.write(f"- **Auto-rejected noise:** {stats['auto_noise']}\n")
-        f.write(f"- **Command samples (verified):** {stats['verified_commands']}\n")
-        f.write(f"- **Noise templates used:** {matcher.get_noise_template_count()}\n\n")
-
-        # Thresholds
-        f.write("## Current Thresholds\n\n")
-        f.write("| Method | Threshold |\n")
-        f.write("|--------|----------:|\n")
-        for method in methods:
-            threshold = matcher.matchers[method].threshold
-            f.write(f"| {method} | {threshold:.2f} |\n")
-        f.write("\n")
-
-        # Per-method results
-        f.write("## Per-Method Results (on verified commands)\n\n")
-
-        for method in methods:
-            method_stats = stats['per_method'][method]
-            valid_total = stats['verified_commands']
-
-            if valid_total > 0:
-                accuracy = method_stats['correct'] / valid_total * 100
-            else:
-                accuracy = 0
-
-            f.write(f"### {method}\n\n")
-            f.write(f"- **Command Accuracy:** {accuracy:.1f}% ({method_stats['correct']}/{valid_total})\n")
-            f.write(f"- **False Negatives (Command detected as NONE/NOISE):** {method_stats['false_negative']}\n")
-            f.write(f"- **Misclassifications:** {method_stats['misclassified']}\n\n")
-
-            # Confusion matrix (only for verified commands)
-            f.write("#### Confusion Matrix\n\n")
-            labels = ['START', 'JUMP', 'PAUSE', 'NONE', 'NOISE']
-            cm = method_stats['confusion']
-
-            f.write("| Actual \\ Predicted |")
-            for pred in labels:
-                f.write(f" {pred} |")
-            f.write("\n")
-
-            f.write("|" + "-" * 20 + "|")
-            for _ in labels:
-                f.write("------:|")
-            f.write("\n")
-
-            for actual in ['START', 'JUMP', 'PAUSE']:
-                f.write(f"| **{actual}** |")
-                for pred in labels:
-                    count = cm.get((actual, pred), 0)
-                    f.write(f" {count} |")
-                f.write("\n")
-            f.write("\n")
-
-            # Distance statistics
-            f.write("#### Distance Statistics\n\n")
-            dists = method_stats['distances']
-            noise_dists = method_stats.get('noise_distances', [])
-
-            if dists:
-                f.write(f"**Command Distances:**\n")
-                f.write(f"- Min: {min(dists):.3f}\n")
-                f.write(f"- Max: {max(dists):.3f}\n")
-                f.write(f"- Avg: {sum(dists)/len(dists):.3f}\n\n")
-
-            if noise_dists:
-                f.write(f"**Noise Template Distances:**\n")
-                f.write(f"- Min: {min(noise_dists):.3f}\n")
-                f.write(f"- Max: {max(noise_dists):.3f}\n")
-                f.write(f"- Avg: {sum(noise_dists)/len(noise_dists):.3f}\n\n")
-
-            # Per-label distance stats
-            f.write("##### Distance by Ground Truth Label\n\n")
-            f.write("| Label | Count | Min | Max | Avg |\n")
-            f.write("|-------|------:|----:|----:|----:|\n")
-            for label in ['START', 'JUMP', 'PAUSE']:
-                label_dists = method_stats['distances_by_label'].get(label, [])
-                if label_dists:
-                    f.write(f"| {label} | {len(label_dists)} | {min(label_dists):.3f} | {max(label_dists):.3f} | {sum(label_dists)/len(label_dists):.3f} |\n")
-                else:
-                    f.write(f"| {label} | 0 | - | - | - |\n")
-            f.write("\n")
+    methods = list(matcher.matchers.keys())
+    gt_idx = np.frombuffer(stats['gt_idx'], dtype=np.int8)
+    parts = []
+    w = parts.append
+
+    w("# Voice Recognition QA Test Report (QA2 - Commands Only)\n\n")
+    w(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+    # Overall summary
+    w("## Overall Summary\n\n")
+    w(f"- **Total samples:** {stats['total']}\n")
+    w(f"- **Auto-rejected noise:** {stats['auto_noise']}\n")
+    w(f"- **Command samples (verified):** {stats['verified_commands']}\n")
+    w(f"- **Noise templates used:** {matcher.get_noise_template_count()}\n\n")
+
+    # Thresholds
+    w("## Current Thresholds\n\n")
+    w("| Method | Threshold |\n")
+    w("|--------|----------:|\n")
+    for method in methods:
+        w(f"| {method} | {matcher.matchers[method].threshold:.2f} |\n")
+    w("\n")
+
+    # Per-method results
+    w("## Per-Method Results (on verified commands)\n\n")
+
+    valid_total = stats['verified_commands']
+    for method in methods:
+        method_stats = stats['per_method'][method]
 
-        # Ensemble results
-        f.write("## Ensemble Decision Results\n\n")
-        valid_total = stats['verified_commands']
         if valid_total > 0:
-            ensemble_acc = stats['ensemble']['correct'] / valid_total * 100
+            accuracy = method_stats['correct'] / valid_total * 100
         else:
-            ensemble_acc = 0
-
-        f.write(f"- **Command Accuracy:** {ensemble_acc:.1f}% ({stats['ensemble']['correct']}/{valid_total})\n")
-        f.write(f"- **False Negatives:** {stats['ensemble']['false_negative']}\n")
-        f.write(f"- **Misclassifications:** {stats['ensemble']['misclassified']}\n\n")
-
-        # Confusion matrix for ensemble
-        f.write("### Ensemble Confusion Matrix\n\n")
-        labels = ['START', 'JUMP', 'PAUSE', 'NONE', 'NOISE']
-        cm = stats['ensemble']['confusion']
-
-        f.write("| Actual \\ Predicted |")
-        for pred in labels:
-            f.write(f" {pred} |")
-        f.write("\n")
-
-        f.write("|" + "-" * 20 + "|")
-        for _ in labels:
-            f.write("------:|")
-        f.write("\n")
-
-        for actual in ['START', 'JUMP', 'PAUSE']:
-            f.write(f"| **{actual}** |")
-            for pred in labels:
-                count = cm.get((actual, pred), 0)
-                f.write(f" {count} |")
-            f.write("\n")
-        f.write("\n")
-
-        # Timing statistics
-        f.write("## Timing Statistics\n\n")
-        if stats['processing_times']:
-            avg_time = sum(stats['processing_times']) / len(stats['processing_times'])
-            f.write(f"- **Processing Time (Avg):** {avg_time:.1f}ms\n")
-            f.write(f"- **Processing Time (Min):** {min(stats['processing_times']):.1f}ms\n")
-            f.write(f"- **Processing Time (Max):** {max(stats['processing_times']):.1f}ms\n\n")
-
-        if stats['vad_latencies']:
-            avg_lat = sum(stats['vad_latencies']) / len(stats['vad_latencies'])
-            f.write(f"- **VAD Latency (Avg):** {avg_lat:.0f}ms\n")
-            f.write(f"- **VAD Latency (Min):** {min(stats['vad_latencies']):.0f}ms\n")
-            f.write(f"- **VAD Latency (Max):** {max(stats['vad_latencies']):.0f}ms\n\n")
-
-        # Detailed log
-        f.write("## Detailed Test Log\n\n")
-        f.write("| # | Type | Ground Truth | Ensemble | mfcc_dtw | stats | mel | lpc |\n")
-        f.write("|--:|:-----|:-------------|:---------|:---------|:------|:----|:----|\n")
-
-        for i, record in enumerate(stats['records'], 1):
-            rec_type = record['type']
-            gt = record['ground_truth']
-            ensemble = record['ensemble']
-
-            ensemble_mark = "O" if ensemble == gt else "X"
-
-            row = f"| {i} | {rec_type} | {gt} | {ensemble} {ensemble_mark} |"
-            for method in methods:
-                pred = record['predictions'][method]
-                mark = "O" if pred == gt else "X"
-                row += f" {pred} {mark} |"
-            f.write(row + "\n")
+            accuracy = 0
+
+        w(f"### {method}\n\n")
+        w(f"- **Command Accuracy:** {accuracy:.1f}% ({method_stats['correct']}/{valid_total})\n")
+        w(f"- **False Negatives (Command detected as NONE/NOISE):** {method_stats['false_negative']}\n")
+        w(f"- **Misclassifications:** {method_stats['misclassified']}\n\n")
+
+        # Confusion matrix (only for verified commands)
+        w("#### Confusion Matrix\n\n")
+        w(_confusion_table(_confusion_matrix(stats['gt_idx'], method_stats['pred_idx'])))
+
+        # Distance statistics
+        w("#### Distance Statistics\n\n")
+        dists = np.frombuffer(method_stats['distances'], dtype=np.float32)
+        noise_dists = np.frombuffer(method_stats['noise_distances'], dtype=np.float32)
+
+        if dists.size:
+            w(f"**Command Distances:**\n")
+            w(f"- Min: {dists.min():.3f}\n")
+            w(f"- Max: {dists.max():.3f}\n")
+            w(f"- Avg: {dists.mean(dtype=np.float64):.3f}\n\n")
+
+        if noise_dists.size:
+            w(f"**Noise Template Distances:**\n")
+            w(f"- Min: {noise_dists.min():.3f}\n")
+            w(f"- Max: {noise_dists.max():.3f}\n")
+            w(f"- Avg: {noise_dists.mean(dtype=np.float64):.3f}\n\n")
+
+        # Per-label distance stats
+        w("##### Distance by Ground Truth Label\n\n")
+        w("| Label | Count | Min | Max | Avg |\n")
+        w("|-------|------:|----:|----:|----:|\n")
+        for label in COMMAND_LABELS:
+            # distances line up with gt_idx (one entry per verified command)
+            label_dists = dists[gt_idx == LABEL_IDX[label]]
+            if label_dists.size:
+                w(f"| {label} | {label_dists.size} | {label_dists.min():.3f} | {label_dists.max():.3f} | {label_dists.mean(dtype=np.float64):.3f} |\n")
+            else:
+                w(f"| {label} | 0 | - | - | - |\n")
+        w("\n")
+
+    # Ensemble results
+    w("## Ensemble Decision Results\n\n")
+    if valid_total > 0:
+        ensemble_acc = stats['ensemble']['correct'] / valid_total * 100
+    else:
+        ensemble_acc = 0
+
+    w(f"- **Command Accuracy:** {ensemble_acc:.1f}% ({stats['ensemble']['correct']}/{valid_total})\n")
+    w(f"- **False Negatives:** {stats['ensemble']['false_negative']}\n")
+    w(f"- **Misclassifications:** {stats['ensemble']['misclassified']}\n\n")
+
+    # Confusion matrix for ensemble
+    w("### Ensemble Confusion Matrix\n\n")
+    w(_confusion_table(_confusion_matrix(stats['gt_idx'], stats['ensemble']['pred_idx'])))
+
+    # Timing statistics
+    w("## Timing Statistics\n\n")
+    # Timings are stored as int64 nanoseconds; convert to ms once here
+    times = np.frombuffer(stats['processing_times'], dtype=np.int64) / 1e6
+    if times.size:
+        w(f"- **Processing Time (Avg):** {times.mean():.1f}ms\n")
+        w(f"- **Processing Time (Min):** {times.min():.1f}ms\n")
+        w(f"- **Processing Time (Max):** {times.max():.1f}ms\n\n")
+
+    latencies = np.frombuffer(stats['vad_latencies'], dtype=np.int64) / 1e6
+    if latencies.size:
+        w(f"- **VAD Latency (Avg):** {latencies.mean():.0f}ms\n")
+        w(f"- **VAD Latency (Min):** {latencies.min():.0f}ms\n")
+        w(f"- **VAD Latency (Max):** {latencies.max():.0f}ms\n\n")
+
+    # Detailed log
+    w("## Detailed Test Log\n\n")
+    w("| # | Type | Ground Truth | Ensemble |" + "".join(f" {method} |" for method in methods) + "\n")
+    w("|--:|:-----|:-------------|:---------|" + ":---|" * len(methods) + "\n")
+    row = "| {} | {} | {} | {} {} |" + " {} |" * len(methods) + "\n"
+
+    for i, record in enumerate(stats['records'], 1):
+        gt = record['ground_truth']
+        ensemble = record['ensemble']
+        predictions = record['predictions']
+
+        # Methods skipped by early noise rejection have no prediction
+        cells = [
+            f"{predictions[method]} {'O' if predictions[method] == gt else 'X'}" if method in predictions else "-"
+            for method in methods
+        ]
+        w(row.format(i, record['type'], gt, ensemble, "O" if ensemble == gt else "X", *cells))
+
+    w("\n---\n")
+    w("*O = Correct, X = Incorrect*\n")
+    w("*AUTO = Automatically rejected as noise, not verified by user*\n")
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write("".join(parts))
 
-        f.write("\n---\n")
-        f.write("*O = Correct, X = Incorrect*\n")
-        f.write("*AUTO = Automatically rejected as noise, not verified by user*\n")
+
+def _json_default(obj):
+    # array('b'/'f'/'q') columns keep their typecode so they load back as arrays
+    if isinstance(obj, array):
+        return {'__array__': obj.typecode, 'data': obj.tolist()}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_object_hook(obj):
+    if '__array__' in obj:
+        return array(obj['__array__'], obj['data'])
+    return obj
+
+
+def save_stats(stats, matcher, output_path):
+    """Dump the raw session stats (plus thresholds) as JSON next to the report."""
+    payload = {
+        'thresholds': {m: matcher.matchers[m].threshold for m in matcher.matchers},
+        'noise_templates': matcher.get_noise_template_count(),
+        'stats': stats,
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, default=_json_default)
+
+
+def render_report_from_stats(stats_path, output_path):
+    """Regenerate the markdown report from a save_stats() JSON, without rerunning the test."""
+    with open(stats_path, 'r', encoding='utf-8') as f:
+        payload = json.load(f, object_hook=_json_object_hook)
+
+    # generate_report only needs thresholds and the noise template count
+    noise_count = payload['noise_templates']
+    matcher = SimpleNamespace(
+        matchers={m: SimpleNamespace(threshold=t) for m, t in payload['thresholds'].items()},
+        get_noise_template_count=lambda: noise_count,
+    )
+    generate_report(payload['stats'], matcher, output_path)
 
 
 def test_qa2():
@@ -274,8 +308,25 @@ def test_qa2():
         default='adaptive_ensemble',
         help="Recognition method: 'mfcc_dtw', 'ensemble' (fixed), or 'adaptive_ensemble' (SNR-based)"
     )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print per-method predictions (distance, confidence, template) for every sample"
+    )
+    parser.add_argument(
+        "--from-stats",
+        type=str,
+        metavar="JSON",
+        help="Re-render the markdown report from a saved stats JSON and exit (no audio)"
+    )
     args = parser.parse_args()
 
+    if args.from_stats:
+        output_path = os.path.splitext(args.from_stats)[0] + '.md'
+        render_report_from_stats(args.from_stats, output_path)
+        print(f"Report regenerated: {output_path}")
+        return
+
     # Load templates
     base_dir = locate_cmd_templates()
 
@@ -305,6 +356,11 @@ def test_qa2():
         print("\n[ERROR] No templates found!")
         return
 
+    # Compile the DTW kernels now so the first sample is not timed with it
+    t0 = time.perf_counter()
+    matcher.warmup()
+    print(f"\nWarmup done in {(time.perf_counter() - t0) * 1000:.0f}ms")
+
     # Print current thresholds
     print("\n" + "-" * 80)
     print("Current Thresholds:")
@@ -348,8 +404,8 @@ def test_qa2():
         noise_samples = collect_noise_samples(audio_stream, duration_ms=2000, num_samples=args.noise_samples)
         print(f"Collected {len(noise_samples)} noise samples")
 
+        matcher.add_noise_templates_batch(noise_samples)
         for i, noise_audio in enumerate(noise_samples):
-            matcher.add_noise_template(noise_audio)
             print(f"  Added noise template #{i+1} (len={len(noise_audio)})")
 
         print(f"Total noise templates: {matcher.get_noise_template_count()}")
@@ -368,123 +424,120 @@ def test_qa2():
     print()
 
     # Initialize statistics
+    # Verified commands are kept as parallel arrays (one entry per sample):
+    # gt_idx / pred_idx hold LABEL_IDX values, distances are float32.
+    # Timings are int64 nanosecond arrays (perf_counter_ns deltas).
     methods = list(matcher.matchers.keys())
     stats = {
         'total': 0,
         'auto_noise': 0,
         'verified_commands': 0,
-        'processing_times': [],
-        'vad_latencies': [],
+        'processing_times': array('q'),
+        'vad_latencies': array('q'),
         'records': [],
+        'gt_idx': array('b'),
         'per_method': {
             m: {
                 'correct': 0,
                 'false_negative': 0,
                 'misclassified': 0,
-                'confusion': defaultdict(int),
-                'distances': [],
-                'noise_distances': [],
-                'distances_by_label': defaultdict(list),
+                'pred_idx': array('b'),
+                'distances': array('f'),
+                'noise_distances': array('f'),
             } for m in methods
         },
         'ensemble': {
             'correct': 0,
             'false_negative': 0,
             'misclassified': 0,
-            'confusion': defaultdict(int),
+            'pred_idx': array('b'),
         }
     }
 
-    vad_start_time = None
+    # Loop-invariant lookups, bound once
+    per_method = stats['per_method']
+    ensemble = stats['ensemble']
+    thresholds = {m: matcher.matchers[m].threshold for m in methods}
+    use_adaptive = (args.method == 'adaptive_ensemble')
+    # --method is fixed for the session, so pick the decision function once
+    decide = _decide_mfcc_dtw if args.method == 'mfcc_dtw' else _decide_ensemble
+    sample_rate_inv = 1.0 / config.SAMPLE_RATE
+    inf = float('inf')
+
+    vad_start_ns = None
     last_state = VADState.SILENCE
     quit_flag = False
-    paused = False  # Pause VAD processing while waiting for user input
 
     try:
         while not quit_flag:
-            # Skip chunk processing if paused
-            if paused:
-                time.sleep(0.1)
-                continue
-
-            chunk = audio_stream.get_chunk(timeout=0.02)
+            # Block until the callback delivers a chunk; the 1 s timeout only
+            # keeps Ctrl+C responsive on Windows
+            chunk = audio_stream.get_chunk(timeout=1.0)
             if len(chunk) == 0:
                 continue
 
             state, segment = vad.process_chunk(chunk)
 
             if state == VADState.RECORDING and last_state == VADState.SILENCE:
-                vad_start_time = time.time()
+                vad_start_ns = time.perf_counter_ns()
                 print("\r[Recording...]", end='', flush=True)
 
             last_state = state
 
             if state == VADState.PROCESSING and segment is not None:
-                vad_end_time = time.time()
-                vad_latency = (vad_end_time - vad_start_time) * 1000 if vad_start_time else 0
-                stats['vad_latencies'].append(vad_latency)
+                vad_end_ns = time.perf_counter_ns()
+                stats['vad_latencies'].append(vad_end_ns - vad_start_ns if vad_start_ns else 0)
 
                 stats['total'] += 1
-                segment_duration = len(segment) / config.SAMPLE_RATE
-
-                print(f"\r" + "=" * 80)
-                print(f"[Sample #{stats['total']}] Duration: {segment_duration:.2f}s")
-                print("-" * 80)
+                segment_duration = len(segment) * sample_rate_inv
 
                 # Process with selected method
-                total_start = time.time()
-                
-                # Determine adaptive mode
-                use_adaptive = (args.method == 'adaptive_ensemble')
-                
-                raw_results = matcher.recognize(segment, mode='all', adaptive=use_adaptive)
-                total_proc_time = (time.time() - total_start) * 1000
-                stats['processing_times'].append(total_proc_time)
+                total_start_ns = time.perf_counter_ns()
+                # Segments mfcc_dtw matches to a noise template are auto-recorded
+                # as NOISE, so the remaining methods are skipped for them
+                raw_results = matcher.recognize(segment, mode='all', adaptive=use_adaptive,
+                                                early_reject=True)
+                total_proc_ns = time.perf_counter_ns() - total_start_ns
+                stats['processing_times'].append(total_proc_ns)
+                total_proc_time = total_proc_ns / 1e6
 
                 # Compute decision based on selected method
-                if args.method == 'mfcc_dtw':
-                    # Use only MFCC+DTW
-                    best_command = raw_results['all_results']['mfcc_dtw']['command']
-                    best_method = 'mfcc_dtw'
-                    best_confidence = 0.0
-                else:
-                    # Compute ensemble decision (Weighted)
-                    # Note: For 'ensemble' and 'adaptive_ensemble', the weighted decision is already in raw_results['command']
-                    # The logic below was manually re-implementing simple voting, which is now obsolete.
-                    # We should use the result from matcher.recognize directly.
-                    
-                    best_command = raw_results['command']
-                    best_confidence = raw_results.get('confidence', 0.0)
-                    best_method = raw_results.get('method', 'ensemble')
+                best_command, best_method, best_confidence = decide(raw_results)
 
                 # Collect predictions for all methods (for reporting)
                 predictions = {}
                 for method, res in raw_results['all_results'].items():
                     predictions[method] = res['command']
 
-                # Show results
-                print(f"\nPredictions:")
-                for method, res in raw_results['all_results'].items():
-                    cmd = res['command']
-                    dist = res['distance']
-                    best_tpl = res['best_template']
-                    noise_dist = res.get('noise_distance', float('inf'))
-                    threshold = matcher.matchers[method].threshold
-                    conf_pct = max(0, (1 - dist / threshold) * 100)
-
-                    noise_info = ""
-                    if noise_dist < float('inf'):
-                        noise_info = f", noise_dist={noise_dist:.3f}"
-                        if noise_dist < dist:
-                            noise_info += " <CLOSER"
-
-                    print(f"  {method:12s}: {cmd:8s} (dist={dist:.3f}, conf={conf_pct:.1f}%{noise_info}, tpl={best_tpl})")
-
-                print(f"\n>>> ENSEMBLE: {best_command}", end="")
+                # Show results: the whole block goes out in one write
+                lines = [
+                    "\r" + "=" * 80,
+                    f"[Sample #{stats['total']}] Duration: {segment_duration:.2f}s",
+                    "-" * 80,
+                ]
+                if args.verbose:
+                    lines.append("\nPredictions:")
+                    for method, res in raw_results['all_results'].items():
+                        cmd = res['command']
+                        dist = res['distance']
+                        best_tpl = res['best_template']
+                        noise_dist = res.get('noise_distance', inf)
+                        conf_pct = max(0, (1 - dist / thresholds[method]) * 100)
+
+                        noise_info = ""
+                        if noise_dist < inf:
+                            noise_info = f", noise_dist={noise_dist:.3f}"
+                            if noise_dist < dist:
+                                noise_info += " <CLOSER"
+
+                        lines.append(f"  {method:12s}: {cmd:8s} (dist={dist:.3f}, conf={conf_pct:.1f}%{noise_info}, tpl={best_tpl})")
+
                 if best_method:
-                    print(f" (by {best_method}, conf={best_confidence*100:.1f}%, time={total_proc_time:.0f}ms)")
+                    lines.append(f"\n>>> ENSEMBLE: {best_command} (by {best_method}, conf={best_confidence*100:.1f}%, time={total_proc_time:.0f}ms)")
                 else:
-                    print(f" (time={total_proc_time:.0f}ms)")
+                    lines.append(f"\n>>> ENSEMBLE: {best_command} (time={total_proc_time:.0f}ms)")
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
 
                 # Decision: ask user only if command detected
                 if best_command in ('NOISE', 'NONE'):
@@ -506,7 +559,6 @@ def test_qa2():
                     print()
                 else:
                     # Detected a command - pause and ask user
-                    paused = True
                     ground_truth = get_user_label()
 
                     if ground_truth is None:
@@ -528,45 +580,47 @@ def test_qa2():
                     # Update statistics for verified commands
                     if ground_truth != 'NOISE':
                         stats['verified_commands'] += 1
+                        stats['gt_idx'].append(LABEL_IDX[ground_truth])
 
+                        all_results = raw_results['all_results']
                         for method, pred in predictions.items():
-                            res = raw_results['all_results'][method]
-                            stats['per_method'][method]['distances'].append(res['distance'])
+                            res = all_results[method]
+                            method_stats = per_method[method]
+                            method_stats['distances'].append(res['distance'])
                             if res.get('noise_distance', float('inf')) < float('inf'):
-                                stats['per_method'][method]['noise_distances'].append(res['noise_distance'])
-                            stats['per_method'][method]['distances_by_label'][ground_truth].append(res['distance'])
-                            stats['per_method'][method]['confusion'][(ground_truth, pred)] += 1
+                                method_stats['noise_distances'].append(res['noise_distance'])
+                            method_stats['pred_idx'].append(LABEL_IDX.get(pred, OTHER_IDX))
 
                             if pred == ground_truth:
-                                stats['per_method'][method]['correct'] += 1
+                                method_stats['correct'] += 1
                             elif pred in ('NONE', 'NOISE'):
-                                stats['per_method'][method]['false_negative'] += 1
+                                method_stats['false_negative'] += 1
                             else:
-                                stats['per_method'][method]['misclassified'] += 1
+                                method_stats['misclassified'] += 1
 
-                        stats['ensemble']['confusion'][(ground_truth, best_command)] += 1
+                        ensemble['pred_idx'].append(LABEL_IDX.get(best_command, OTHER_IDX))
                         if best_command == ground_truth:
-                            stats['ensemble']['correct'] += 1
+                            ensemble['correct'] += 1
                         elif best_command in ('NONE', 'NOISE'):
-                            stats['ensemble']['false_negative'] += 1
+                            ensemble['false_negative'] += 1
                         else:
-                            stats['ensemble']['misclassified'] += 1
+                            ensemble['misclassified'] += 1
 
                     # Show running accuracy
                     if stats['verified_commands'] > 0:
-                        ens_acc = stats['ensemble']['correct'] / stats['verified_commands'] * 100
-                        print(f"\n[Running] Command accuracy: {ens_acc:.1f}% ({stats['ensemble']['correct']}/{stats['verified_commands']})")
+                        ens_acc = ensemble['correct'] / stats['verified_commands'] * 100
+                        print(f"\n[Running] Command accuracy: {ens_acc:.1f}% ({ensemble['correct']}/{stats['verified_commands']})")
 
                     print(f"[Info] Total: {stats['total']}, Auto-noise: {stats['auto_noise']}, Verified: {stats['verified_commands']}")
                     print("=" * 80)
                     print()
 
-                    # Resume
-                    paused = False
+                    # Resume; audio captured while labelling is stale
+                    audio_stream.discard_pending()
 
                 # Reset VAD
                 vad.reset()
-                vad_start_time = None
+                vad_start_ns = None
 
     except KeyboardInterrupt:
         print("\n\nStopping...")
@@ -582,6 +636,9 @@ def test_qa2():
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_path = os.path.join(record_dir, f'test_qa2_{timestamp}.md')
 
+        # Raw stats first, so the report can be re-rendered offline (--from-stats)
+        save_stats(stats, matcher, os.path.splitext(output_path)[0] + '.json')
+
         print(f"\nGenerating report to: {output_path}")
         generate_report(stats, matcher, output_path)
         print("Report generated successfully!")
@@ -13,8 +13,6 @@ import sys
 import os
 import time
 import numpy as np
-import glob
-import librosa
 import json
 import logging
 import argparse
@@ -34,9 +32,14 @@ if _project_root not in sys.path:
 from tests.template_utils import locate_cmd_templates
 
 try:
-    from src.audio.io import load_audio_file
     from src.audio.recognizers import MultiMethodMatcher
     from src import config
+    from tests.arena_utils import (
+        HIGH_SNR_THRESHOLD, OUTCOME_CORRECT, OUTCOME_WRONG_COMMAND, OUTCOME_NO_MATCH, OUTCOME_NOISE,
+        PROGRESS_EVERY, AUG_CACHE_DIR, cached_augmentation, clip_rng, unit_noise_like,
+        command_template_files, preload_templates, suite_indices, new_result_counters, outcome_index,
+        accuracy_table, LOO_CONTEXT, init_loo_worker, run_leave_one_out, precompute_template_features,
+    )
     print("Imports successful.")
 except ImportError as e:
     print(f"Import Error: {e}")
@@ -49,12 +52,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Constants (no magic numbers)
-FLOAT_COMPARE_EPSILON = 1e-6
-AUDIO_MIN_AMPLITUDE = -1.0
-AUDIO_MAX_AMPLITUDE = 1.0
-AUDIO_INT16_SCALE = 32767.0
-HIGH_SNR_THRESHOLD = 100  # dB - effectively clean audio
 NOISE_DROP_THRESHOLD = 0.4  # 40% accuracy drop is concerning
 
 # Test suites
@@ -64,86 +61,7 @@ TEST_SUITES = {
     'Noise': [100, 25, 20, 15, 10],  # SNR (dB) - 100 means effectively clean
     'Volume': [0.3, 0.6, 1.0, 1.5, 3.0]
 }
-
-
-def is_close(a: float, b: float, epsilon: float = FLOAT_COMPARE_EPSILON) -> bool:
-    """Safe floating point comparison."""
-    return abs(a - b) < epsilon
-
-
-def apply_augmentation(audio: np.ndarray, aug_type: str, value: float) -> np.ndarray:
-    """Apply specific augmentation to audio.
-
-    Args:
-        audio: Input audio as int16 numpy array
-        aug_type: Type of augmentation (Speed, Pitch, Noise, Volume)
-        value: Augmentation parameter value
-
-    Returns:
-        Augmented audio as int16 numpy array
-
-    Raises:
-        ValueError: If audio contains invalid values
-    """
-    # Validate input
-    if len(audio) == 0:
-        raise ValueError("Empty audio array")
-
-    # Convert to float32 for processing
-    y_float = audio.astype(np.float32) / AUDIO_INT16_SCALE
-
-    # Check for invalid values
-    if np.any(np.isnan(y_float)) or np.any(np.isinf(y_float)):
-        raise ValueError("Audio contains NaN or Inf values")
-
-    try:
-        if aug_type == 'Speed':
-            if is_close(value, 1.0):
-                return audio
-            y_aug = librosa.effects.time_stretch(y_float, rate=value)
-
-        elif aug_type == 'Pitch':
-            if is_close(value, 0.0):
-                return audio
-            y_aug = librosa.effects.pitch_shift(y_float, sr=config.SAMPLE_RATE, n_steps=value)
-
-        elif aug_type == 'Noise':
-            if value >= HIGH_SNR_THRESHOLD:
-                return audio
-            p_signal = np.mean(y_float ** 2)
-            if p_signal < FLOAT_COMPARE_EPSILON:
-                logger.warning("Signal power too low for noise addition")
-                return audio
-
-            p_noise = p_signal / (10 ** (value / 10.0))
-            noise = np.random.normal(0, np.sqrt(p_noise), len(y_float))
-            y_aug = y_float + noise
-
-        elif aug_type == 'Volume':
-            if is_close(value, 1.0):
-                return audio
-            y_aug = y_float * value
-
-        else:
-            logger.warning(f"Unknown augmentation type: {aug_type}")
-            return audio
-
-        # Clip to valid range and convert back to int16
-        y_aug = np.clip(y_aug, AUDIO_MIN_AMPLITUDE, AUDIO_MAX_AMPLITUDE)
-        return (y_aug * AUDIO_INT16_SCALE).astype(np.int16)
-
-    except Exception as e:
-        logger.error(f"Augmentation failed ({aug_type}={value}): {e}")
-        return audio  # Return original on error
-
-
-def get_label_from_filename(filename: str) -> str:
-    """Extract command label from filename."""
-    fname = os.path.basename(filename)
-    for cn, en in config.COMMAND_MAPPING.items():
-        if cn in fname:
-            return en
-    return "UNKNOWN"
+SUITE_IDX, VAL_IDX = suite_indices(TEST_SUITES)
 
 
 def get_config_snapshot():
@@ -178,7 +96,7 @@ def get_config_snapshot():
     }
 
 
-def save_arena_results(stats, overall_scores, total_scenarios, timestamp_str, time_stats, run_mode):
+def save_arena_results(counters, report_methods, overall_scores, total_scenarios, timestamp_str, time_stats, run_mode):
     """Save arena results to JSON file with enhanced statistics."""
     base_dir = os.path.dirname(os.path.abspath(__file__))
     record_dir = os.path.join(base_dir, "record")
@@ -201,34 +119,39 @@ def save_arena_results(stats, overall_scores, total_scenarios, timestamp_str, ti
             'methods': {}
         }
 
+        # Timing is per (suite, value) and shared by every method: summarize it once
+        timings = {}
+        for val in test_values:
+            times = np.asarray(time_stats[suite_name][val], dtype=float)
+            timings[val] = {}
+            if times.size:
+                timings[val] = {
+                    'mean_ms': float(times.mean()),
+                    'std_ms': float(times.std()),
+                    'min_ms': float(times.min()),
+                    'max_ms': float(times.max())
+                }
+
         for method in ['mfcc_dtw', 'mel', 'lpc', 'ensemble']:
             # Skip if method not in stats
-            if method not in stats[suite_name]:
+            if method not in report_methods:
                 continue
-                
-            results['suites'][suite_name]['methods'][method] = {}
+
+            # One conversion of this method's counters to Python ints
+            suite_counts = counters[SUITE_IDX[suite_name], report_methods.index(method)].tolist()
+            with_timing = method == 'ensemble' or run_mode == 'mfcc'
+            method_results = results['suites'][suite_name]['methods'][method] = {}
             for val in test_values:
-                res = stats[suite_name][method][val]
-
-                # Calculate timing statistics
-                times = time_stats[suite_name][val]
-                timing_stats = {}
-                if times:
-                    timing_stats = {
-                        'mean_ms': float(np.mean(times)),
-                        'std_ms': float(np.std(times)),
-                        'min_ms': float(np.min(times)),
-                        'max_ms': float(np.max(times))
-                    }
-
-                results['suites'][suite_name]['methods'][method][str(val)] = {
-                    'accuracy': res.accuracy(),
-                    'correct': res.correct,
-                    'total': res.total,
-                    'wrong_command': res.wrong_command,
-                    'no_match': res.no_match,
-                    'noise': res.noise,
-                    'timing': timing_stats if (method == 'ensemble' or run_mode == 'mfcc') else {}
+                counts = suite_counts[VAL_IDX[suite_name][val]]
+                total = sum(counts)
+                method_results[str(val)] = {
+                    'accuracy': counts[OUTCOME_CORRECT] / total if total > 0 else 0.0,
+                    'correct': counts[OUTCOME_CORRECT],
+                    'total': total,
+                    'wrong_command': counts[OUTCOME_WRONG_COMMAND],
+                    'no_match': counts[OUTCOME_NO_MATCH],
+                    'noise': counts[OUTCOME_NOISE],
+                    'timing': timings[val] if with_timing else {}
                 }
 
     # Overall scores with statistics
@@ -244,73 +167,70 @@ def save_arena_results(stats, overall_scores, total_scenarios, timestamp_str, ti
     filename = f"arena_{run_mode}_{timestamp_str.replace(':', '').replace(' ', '_').replace('-', '')}.json"
     filepath = os.path.join(record_dir, filename)
 
+    # Serialize in one shot and write once (json.dump issues a write per token)
     with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+        f.write(json.dumps(results, indent=2, ensure_ascii=False))
 
     return filepath
 
 
-class ArenaResult:
-    """Statistics container for arena test results."""
-
-    def __init__(self):
-        self.total = 0
-        self.correct = 0
-        self.wrong_command = 0  # Predicted wrong command
-        self.no_match = 0  # Predicted NONE (rejection)
-        self.noise = 0  # Predicted NOISE
-
-    def update(self, expected: str, predicted: str):
-        """Update statistics with new prediction."""
-        self.total += 1
-        if predicted == expected:
-            self.correct += 1
-        elif predicted == 'NONE':
-            self.no_match += 1
-        elif predicted == 'NOISE':
-            self.noise += 1
-        else:
-            self.wrong_command += 1
-
-    def accuracy(self) -> float:
-        """Calculate accuracy percentage."""
-        return self.correct / self.total if self.total > 0 else 0.0
-
-
-def preload_templates(valid_files: List[str]) -> Dict[str, Tuple[np.ndarray, str]]:
-    """Preload all templates once for memory efficiency.
-
-    Args:
-        valid_files: List of file paths to load
+def evaluate_held_out(test_file: str) -> Optional[List[Tuple[str, float, str, Dict[str, str], float]]]:
+    """Train on every template except `test_file`, then recognize each augmentation of it.
 
     Returns:
-        Dictionary mapping file path to (audio, label) tuple
+        [(suite, value, ensemble command, {method: command}, time_ms), ...],
+        or None if no other template is loaded
     """
-    print("\nPreloading all templates...")
-    templates = {}
-    failed = []
-
-    for idx, filepath in enumerate(valid_files):
-        try:
-            audio = load_audio_file(filepath)
-            label = get_label_from_filename(filepath)
-            templates[filepath] = (audio, label)
-            print(f"\r  Loaded {idx+1}/{len(valid_files)} templates", end='', flush=True)
-        except Exception as e:
-            filename = os.path.basename(filepath)
-            logger.error(f"Failed to load {filename}: {e}")
-            failed.append(filename)
+    original_audio = LOO_CONTEXT['all_templates'][test_file][0]
 
-    print()  # New line after progress
+    # Hold the test file out of the shared matcher for this split
+    matcher = LOO_CONTEXT['matcher']
+    held_out = matcher.remove_template(os.path.basename(test_file))
+    try:
+        if matcher.template_count() == 0:
+            return None
+        return _recognize_augmentations(matcher, test_file, original_audio)
+    finally:
+        matcher.restore_templates(held_out)
+
+
+def _recognize_augmentations(matcher: MultiMethodMatcher, test_file: str,
+                             original_audio: np.ndarray) -> List[Tuple[str, float, str, Dict[str, str], float]]:
+    """Augment `original_audio` for every suite value and recognize the clips with `matcher`."""
+    use_adaptive = LOO_CONTEXT['use_adaptive']
+
+    # Augment
+    cases = []
+    clips = []
+    unit_noise = unit_noise_like(original_audio, clip_rng(test_file))
+    aug_cache_dir = LOO_CONTEXT['aug_cache_dir']
+    for suite_name, test_values in TEST_SUITES.items():
+        for val in test_values:
+            try:
+                clips.append(cached_augmentation(original_audio, suite_name, val, unit_noise, aug_cache_dir))
+                cases.append((suite_name, val))
+            except Exception as e:
+                logger.error(f"Test failed ({suite_name}={val}): {e}")
 
-    if failed:
-        logger.warning(f"Failed to load {len(failed)} templates: {failed}")
+    # Recognize all augmentations in one batch (equal-length clips share an
+    # STFT); the reported time per clip is the batch average
+    try:
+        t0 = time.perf_counter_ns()
+        batch = matcher.recognize_batch(clips, mode='all', adaptive=use_adaptive)
+        dt_ms = (time.perf_counter_ns() - t0) * 1e-6 / max(len(clips), 1)
+    except Exception as e:
+        logger.error(f"Recognition failed for {os.path.basename(test_file)}: {e}")
+        return []
 
-    print(f"Successfully preloaded {len(templates)}/{len(valid_files)} templates")
-    return templates
+    outcome = []
+    for (suite_name, val), results in zip(cases, batch):
+        predictions = {m: r['command'] for m, r in results['all_results'].items()}
+        outcome.append((suite_name, val, results['command'], predictions, dt_ms))
+    return outcome
 
 
-def run_arena(mode: str = 'all'):
+def run_arena(mode: str = 'all', jobs: Optional[int] = None, aug_cache: bool = True,
+              verbose: bool = False):
     """Main arena test function with improvements."""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
@@ -346,12 +266,7 @@ def run_arena(mode: str = 'all'):
     template_dir = locate_cmd_templates()
 
     # 1. Gather all template files
-    all_files = sorted(glob.glob(os.path.join(template_dir, "*.*")))
-    valid_files = []
-
-    for f in all_files:
-        if get_label_from_filename(f) != "UNKNOWN" and 'noise' not in os.path.basename(f).lower():
-            valid_files.append(f)
+    valid_files = command_template_files(template_dir)
 
     print(f"Found {len(valid_files)} valid command templates.")
 
@@ -366,103 +281,78 @@ def run_arena(mode: str = 'all'):
         logger.error("Failed to load any templates!")
         return
 
-    # Initialize statistics
-    stats = {}
+    template_features = precompute_template_features(all_templates, active_methods)
+
+    # Initialize statistics: counters[suite, method, value, outcome]
+    counters = new_result_counters(TEST_SUITES, len(report_methods))
+    method_idx = {m: i for i, m in enumerate(report_methods)}
     time_stats = {}
 
     for suite in TEST_SUITES:
-        stats[suite] = {}
         time_stats[suite] = {}
-        for m in report_methods:
-            stats[suite][m] = {val: ArenaResult() for val in TEST_SUITES[suite]}
         for val in TEST_SUITES[suite]:
             time_stats[suite][val] = []
 
-    # 3. Leave-One-Out Loop
-    print("\nStarting Leave-One-Out testing...")
-    total_tests = len(valid_files)
-
-    for idx, test_file in enumerate(valid_files):
+    # 3. Leave-One-Out Loop (one held-out template per task, spread over processes)
+    test_files = [f for f in valid_files if f in all_templates]
+    for f in valid_files:
+        if f not in all_templates:
+            logger.warning(f"Skipping {os.path.basename(f)} (failed to preload)")
+    total_tests = len(test_files)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, total_tests))
+    print(f"\nStarting Leave-One-Out testing ({jobs} worker{'s' if jobs > 1 else ''})...")
+
+    extra = {'use_adaptive': use_adaptive, 'aug_cache_dir': AUG_CACHE_DIR if aug_cache else None}
+    outcomes = run_leave_one_out(test_files, evaluate_held_out, init_loo_worker,
+                                 (all_templates, template_features, active_methods, extra), jobs)
+    for idx, (test_file, outcome) in enumerate(outcomes):
         test_filename = os.path.basename(test_file)
-
-        # Check if template was successfully loaded
-        if test_file not in all_templates:
-            logger.warning(f"Skipping {test_filename} (failed to preload)")
-            continue
-
-        original_audio, expected_label = all_templates[test_file]
+        expected_label = all_templates[test_file][1]
 
         # Progress indicator
-        progress_pct = (idx + 1) / total_tests * 100
-        print(f"\n[{idx+1}/{total_tests} - {progress_pct:.1f}%] Testing: {test_filename} ({expected_label})")
-
-        # Create matcher with all templates except test file
-        matcher = MultiMethodMatcher(methods=active_methods)
+        if verbose or (idx + 1) % PROGRESS_EVERY == 0 or idx + 1 == total_tests:
+            progress_pct = (idx + 1) / total_tests * 100
+            print(f"\n[{idx+1}/{total_tests} - {progress_pct:.1f}%] Testing: {test_filename} ({expected_label})")
 
-        train_count = 0
-        for train_file, (train_audio, train_label) in all_templates.items():
-            if train_file == test_file:
-                continue
-            try:
-                matcher.add_template(train_label, train_audio, os.path.basename(train_file))
-                train_count += 1
-            except Exception as e:
-                logger.error(f"Failed to add template {os.path.basename(train_file)}: {e}")
-
-        if train_count == 0:
+        if outcome is None:
             logger.warning(f"No training templates available for {test_filename}! Skipping.")
             continue
 
-        # 4. Run Test Suites
-        for suite_name, test_values in TEST_SUITES.items():
-            for val in test_values:
-                try:
-                    # Augment
-                    input_audio = apply_augmentation(original_audio, suite_name, val)
-
-                    # Recognize
-                    t0 = time.time()
-                    results = matcher.recognize(input_audio, mode='all', adaptive=use_adaptive)
-                    dt_ms = (time.time() - t0) * 1000
-                    time_stats[suite_name][val].append(dt_ms)
-
-                    if mode == 'mfcc':
-                        # Explicit MFCC extraction
-                        pred_cmd = results['all_results']['mfcc_dtw']['command']
-                        stats[suite_name]['mfcc_dtw'][val].update(expected_label, pred_cmd)
-                        match_mark = "OK" if pred_cmd == expected_label else "FAIL"
-                        print(f"    [{suite_name} {val:g}] {pred_cmd:8s} {match_mark} ({dt_ms:.0f}ms)")
-                    elif mode == 'rasta_plp':
-                        # Explicit RASTA extraction
-                        pred_cmd = results['all_results']['rasta_plp']['command']
-                        stats[suite_name]['rasta_plp'][val].update(expected_label, pred_cmd)
-                        match_mark = "OK" if pred_cmd == expected_label else "FAIL"
-                        print(f"    [{suite_name} {val:g}] {pred_cmd:8s} {match_mark} ({dt_ms:.0f}ms)")
-                    else:
-                        # Record Ensemble
-                        ensemble_pred = results['command']
-                        stats[suite_name]['ensemble'][val].update(expected_label, ensemble_pred)
-
-                        # Record Individuals
-                        for method in ['mfcc_dtw', 'mel', 'lpc']:
-                            if method in results['all_results']:
-                                pred = results['all_results'][method]['command']
-                                stats[suite_name][method][val].update(expected_label, pred)
-
-                        match_mark = "OK" if ensemble_pred == expected_label else "FAIL"
-                        print(f"    [{suite_name} {val:g}] {ensemble_pred:8s} {match_mark} ({dt_ms:.0f}ms)")
-
-                except Exception as e:
-                    logger.error(f"Test failed ({suite_name}={val}): {e}")
-                    continue
+        # 4. Collect Test Suite results
+        for suite_name, val, ensemble_pred, predictions, dt_ms in outcome:
+            time_stats[suite_name][val].append(dt_ms)
+            s, v = SUITE_IDX[suite_name], VAL_IDX[suite_name][val]
+
+            if mode in ('mfcc', 'rasta_plp'):
+                # Single-method modes report only that method
+                method = active_methods[0]
+                pred_cmd = predictions[method]
+                counters[s, method_idx[method], v, outcome_index(expected_label, pred_cmd)] += 1
+            else:
+                # Record Ensemble
+                pred_cmd = ensemble_pred
+                counters[s, method_idx['ensemble'], v, outcome_index(expected_label, pred_cmd)] += 1
+
+                # Record Individuals
+                for method in ['mfcc_dtw', 'mel', 'lpc']:
+                    if method in predictions:
+                        counters[s, method_idx[method], v, outcome_index(expected_label, predictions[method])] += 1
+
+            if verbose:
+                match_mark = "OK" if pred_cmd == expected_label else "FAIL"
+                print(f"    [{suite_name} {val:g}] {pred_cmd:8s} {match_mark} ({dt_ms:.0f}ms)")
 
     # 5. Report with enhanced statistics
     print("\n" + "=" * 80)
     print("ARENA RESULTS SUMMARY")
     print("=" * 80)
 
-    overall_scores = {m: 0.0 for m in report_methods}
-    total_scenarios = 0
+    # accuracy[suite, method, value]; unused value slots of shorter suites stay 0.
+    # Summing values, then suites, keeps the original accumulation order
+    accuracy = accuracy_table(counters)
+    overall = accuracy.sum(axis=2).sum(axis=0)
+    overall_scores = {m: float(overall[i]) for i, m in enumerate(report_methods)}
+    total_scenarios = sum(len(test_values) for test_values in TEST_SUITES.values())
 
     for suite_name, test_values in TEST_SUITES.items():
         print(f"\n>> {suite_name.upper()} ROBUSTNESS")
@@ -483,18 +373,13 @@ def run_arena(mode: str = 'all'):
         print(header)
         print("-" * len(header))
 
-        for method in report_methods:
+        suite_accuracy = accuracy[SUITE_IDX[suite_name]]
+        for m, method in enumerate(report_methods):
             row = f"{method:<12} |";
-            suite_acc_sum = 0.0
-            for val in test_values:
-                res = stats[suite_name][method][val]
-                acc = res.accuracy()
-                suite_acc_sum += acc
+            for acc in suite_accuracy[m, :len(test_values)]:
                 row += f" {acc*100:6.0f}% |";
             print(row)
 
-            overall_scores[method] += suite_acc_sum
-
         # Enhanced Time Stats
         print(f"{'Avg Time':<12} |", end="")
         for val in test_values:
@@ -507,8 +392,6 @@ def run_arena(mode: str = 'all'):
                 print(f" {'N/A':>8} |", end="")
         print()
 
-        total_scenarios += len(test_values)
-
     print("\n" + "=" * 80)
     print("PROPOSED IMPROVEMENTS")
     print("=" * 80)
@@ -516,7 +399,7 @@ def run_arena(mode: str = 'all'):
     print(f"Total Scenarios: {total_scenarios}")
 
     if total_scenarios > 0:
-        best_method = max(overall_scores, key=overall_scores.get)
+        best_method = report_methods[int(overall.argmax())]
         best_avg = overall_scores[best_method] / total_scenarios
         print(f"Best Overall Method: {best_method} (Avg Acc: {best_avg*100:.1f}%)")
     else:
@@ -524,17 +407,17 @@ def run_arena(mode: str = 'all'):
         return
 
     # Analyze noise robustness (only if we have noise stats)
-    if 'Noise' in stats and mode != 'mfcc' and mode != 'rasta_plp':
+    if 'Noise' in SUITE_IDX and mode != 'mfcc' and mode != 'rasta_plp':
         proposals = []
         noise_drops = {}
 
-        for method in report_methods:
-            try:
-                clean = stats['Noise'][method][HIGH_SNR_THRESHOLD].accuracy()
-                noisy = stats['Noise'][method][10].accuracy()
-                noise_drops[method] = clean - noisy
-            except KeyError:
-                logger.warning(f"Missing noise statistics for {method}")
+        try:
+            noise_accuracy = accuracy[SUITE_IDX['Noise']]
+            drops = (noise_accuracy[:, VAL_IDX['Noise'][HIGH_SNR_THRESHOLD]]
+                     - noise_accuracy[:, VAL_IDX['Noise'][10]])
+            noise_drops = dict(zip(report_methods, drops.tolist()))
+        except KeyError:
+            logger.warning("Missing noise statistics")
 
         if noise_drops:
             worst_noise_method = max(noise_drops, key=noise_drops.get)
@@ -552,7 +435,7 @@ def run_arena(mode: str = 'all'):
     print("\n" + "=" * 70)
     print("SAVING RESULTS")
     print("=" * 70)
-    filepath = save_arena_results(stats, overall_scores, total_scenarios, timestamp, time_stats, mode)
+    filepath = save_arena_results(counters, report_methods, overall_scores, total_scenarios, timestamp, time_stats, mode)
     print(f"Results saved to: {filepath}")
     print("Use 'python temp/view_history.py' to view and compare historical results")
 
@@ -561,6 +444,12 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Run Arena Test')
     parser.add_argument('--mode', type=str, default='all', choices=['mfcc', 'ensemble', 'all', 'adaptive_ensemble', 'rasta_plp'],
                         help='Test mode: mfcc (fast), ensemble (robust), adaptive_ensemble (smart), rasta_plp (experimental), or all (full stats)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes for the leave-one-out loop (default: all cores, 1 = in-process)')
+    parser.add_argument('--no-aug-cache', action='store_true',
+                        help='Recompute Speed/Pitch augmentations instead of reusing tests/record/aug_cache')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Print progress for every held-out file and the prediction for every case')
     args = parser.parse_args()
     
-    run_arena(mode=args.mode)
+    run_arena(mode=args.mode, jobs=args.jobs, aug_cache=not args.no_aug_cache, verbose=args.verbose)
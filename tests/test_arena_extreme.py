@@ -7,8 +7,6 @@ import sys
 import os
 import time
 import numpy as np
-import glob
-import librosa
 import json
 import logging
 import argparse
@@ -28,9 +26,11 @@ if _project_root not in sys.path:
 from tests.template_utils import locate_cmd_templates
 
 try:
-    from src.audio.io import load_audio_file
-    from src.audio.recognizers import MultiMethodMatcher
-    from src import config
+    from tests.arena_utils import (
+        apply_augmentation, clip_rng, unit_noise_like, command_template_files, preload_templates,
+        suite_indices, new_result_counters, outcome_index, accuracy_table,
+        LOO_CONTEXT, init_loo_worker, run_leave_one_out, precompute_template_features,
+    )
     print("Imports successful.")
 except ImportError as e:
     print(f"Import Error: {e}")
@@ -43,13 +43,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Constants
-FLOAT_COMPARE_EPSILON = 1e-6
-AUDIO_MIN_AMPLITUDE = -1.0
-AUDIO_MAX_AMPLITUDE = 1.0
-AUDIO_INT16_SCALE = 32767.0
-HIGH_SNR_THRESHOLD = 100
-
 # EXTREME Test suites
 TEST_SUITES = {
     'Speed': [0.5, 0.7, 0.9, 1.0, 1.1, 1.3, 1.5, 1.7],  # Wider range
@@ -58,142 +51,62 @@ TEST_SUITES = {
     'Volume': [0.1, 0.3, 1.0, 3.0, 5.0, 10.0]          # Extreme volume
 }
 
-
-def is_close(a: float, b: float, epsilon: float = FLOAT_COMPARE_EPSILON) -> bool:
-    """Safe floating point comparison."""
-    return abs(a - b) < epsilon
+SUITE_IDX, VAL_IDX = suite_indices(TEST_SUITES)
 
 
-def apply_augmentation(audio: np.ndarray, aug_type: str, value: float) -> np.ndarray:
-    """Apply specific augmentation to audio."""
-    # Validate input
-    if len(audio) == 0:
-        raise ValueError("Empty audio array")
+def evaluate_held_out(test_file: str) -> List[Tuple[str, float, str]]:
+    """Train on every template except `test_file`; [(suite, value, command), ...] for its augmentations."""
+    original_audio = LOO_CONTEXT['all_templates'][test_file][0]
 
-    # Convert to float32 for processing
-    y_float = audio.astype(np.float32) / AUDIO_INT16_SCALE
+    # Run suites: augment, then recognize (Adaptive) all clips in one batch
+    cases = [(suite_name, val) for suite_name, test_values in TEST_SUITES.items() for val in test_values]
+    unit_noise = unit_noise_like(original_audio, clip_rng(test_file))
+    clips = [apply_augmentation(original_audio, suite_name, val, unit_noise) for suite_name, val in cases]
 
+    # Hold the test file out of the shared matcher while recognizing
+    matcher = LOO_CONTEXT['matcher']
+    held_out = matcher.remove_template(os.path.basename(test_file))
     try:
-        if aug_type == 'Speed':
-            if is_close(value, 1.0):
-                return audio
-            y_aug = librosa.effects.time_stretch(y_float, rate=value)
-
-        elif aug_type == 'Pitch':
-            if is_close(value, 0.0):
-                return audio
-            y_aug = librosa.effects.pitch_shift(y_float, sr=config.SAMPLE_RATE, n_steps=value)
-
-        elif aug_type == 'Noise':
-            if value >= HIGH_SNR_THRESHOLD:
-                return audio
-            p_signal = np.mean(y_float ** 2)
-            if p_signal < 1e-9:
-                return audio
-
-            # SNR = 10 * log10(Ps/Pn) -> Pn = Ps / 10^(SNR/10)
-            p_noise = p_signal / (10 ** (value / 10.0))
-            noise = np.random.normal(0, np.sqrt(p_noise), len(y_float))
-            y_aug = y_float + noise
-
-        elif aug_type == 'Volume':
-            if is_close(value, 1.0):
-                return audio
-            y_aug = y_float * value
-
-        else:
-            return audio
-
-        # Clip to valid range and convert back to int16
-        y_aug = np.clip(y_aug, AUDIO_MIN_AMPLITUDE, AUDIO_MAX_AMPLITUDE)
-        return (y_aug * AUDIO_INT16_SCALE).astype(np.int16)
-
-    except Exception as e:
-        logger.error(f"Augmentation failed ({aug_type}={value}): {e}")
-        return audio
-
-
-def get_label_from_filename(filename: str) -> str:
-    """Extract command label from filename."""
-    fname = os.path.basename(filename)
-    for cn, en in config.COMMAND_MAPPING.items():
-        if cn in fname:
-            return en
-    return "UNKNOWN"
-
-
-class ArenaResult:
-    def __init__(self):
-        self.total = 0
-        self.correct = 0
-    def update(self, expected: str, predicted: str):
-        self.total += 1
-        if predicted == expected:
-            self.correct += 1
-    def accuracy(self) -> float:
-        return self.correct / self.total if self.total > 0 else 0.0
-
-
-def preload_templates(valid_files: List[str]) -> Dict[str, Tuple[np.ndarray, str]]:
-    print("\nPreloading all templates...")
-    templates = {}
-    for idx, filepath in enumerate(valid_files):
-        try:
-            audio = load_audio_file(filepath)
-            label = get_label_from_filename(filepath)
-            templates[filepath] = (audio, label)
-        except Exception:
-            pass
-    print(f"Successfully preloaded {len(templates)}/{len(valid_files)} templates")
-    return templates
-
-
-def run_arena(mode: str = 'adaptive_ensemble'):
+        batch = matcher.recognize_batch(clips, mode='best', adaptive=True)
+    finally:
+        matcher.restore_templates(held_out)
+    return [(suite_name, val, res['command']) for (suite_name, val), res in zip(cases, batch)]
+
+
+def run_arena(mode: str = 'adaptive_ensemble', jobs: Optional[int] = None):
     template_dir = locate_cmd_templates()
-    all_files = sorted(glob.glob(os.path.join(template_dir, "*.*")))
-    valid_files = [f for f in all_files if get_label_from_filename(f) != "UNKNOWN" and 'noise' not in os.path.basename(f).lower()]
+    valid_files = command_template_files(template_dir)
 
     if not valid_files:
         print("Error: No templates found.")
         return
 
     all_templates = preload_templates(valid_files)
-    
-    # Setup stats
-    stats = {}
-    for suite in TEST_SUITES:
-        stats[suite] = {val: ArenaResult() for val in TEST_SUITES[suite]}
 
-    print("\nStarting Extreme Testing...")
+    methods = ['mfcc_dtw', 'mel', 'lpc']
+    template_features = precompute_template_features(all_templates, methods)
     
-    for idx, test_file in enumerate(valid_files):
-        if test_file not in all_templates: continue
-        
-        original_audio, expected_label = all_templates[test_file]
-        print(f"Testing {idx+1}/{len(valid_files)}: {os.path.basename(test_file)} ({expected_label})")
-        
-        # Build matcher
-        matcher = MultiMethodMatcher(methods=['mfcc_dtw', 'mel', 'lpc'])
-        for train_file, (train_audio, train_label) in all_templates.items():
-            if train_file != test_file:
-                matcher.add_template(train_label, train_audio, os.path.basename(train_file))
-
-        # Run suites
-        for suite_name, test_values in TEST_SUITES.items():
-            for val in test_values:
-                # Augment
-                aug_audio = apply_augmentation(original_audio, suite_name, val)
-                
-                # Recognize (Adaptive)
-                res = matcher.recognize(aug_audio, mode='best', adaptive=True)
-                pred = res['command']
-                
-                stats[suite_name][val].update(expected_label, pred)
+    # Setup stats: counters[suite, 0, value, outcome]
+    counters = new_result_counters(TEST_SUITES, 1)
+
+    test_files = [f for f in valid_files if f in all_templates]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(test_files)))
+    print(f"\nStarting Extreme Testing ({jobs} worker{'s' if jobs > 1 else ''})...")
+
+    outcomes = run_leave_one_out(test_files, evaluate_held_out, init_loo_worker,
+                                 (all_templates, template_features, methods), jobs)
+    for idx, (test_file, outcome) in enumerate(outcomes):
+        expected_label = all_templates[test_file][1]
+        print(f"Testing {idx+1}/{len(test_files)}: {os.path.basename(test_file)} ({expected_label})")
+        for suite_name, val, pred in outcome:
+            counters[SUITE_IDX[suite_name], 0, VAL_IDX[suite_name][val], outcome_index(expected_label, pred)] += 1
 
     # Report
     print("\n" + "="*60)
     print("EXTREME ARENA RESULTS (Adaptive Ensemble)")
     print("="*60)
+
+    accuracy = accuracy_table(counters)
     
     for suite_name, test_values in TEST_SUITES.items():
         print(f"\n>> {suite_name.upper()}")
@@ -202,10 +115,14 @@ def run_arena(mode: str = 'adaptive_ensemble'):
         print("-" * len(header))
         
         row = "Acc   | "
-        for val in test_values:
-            acc = stats[suite_name][val].accuracy() * 100
+        for acc in accuracy[SUITE_IDX[suite_name], 0, :len(test_values)] * 100:
             row += f"{acc:4.0f}% | "
         print(row)
 
 if __name__ == '__main__':
-    run_arena()
+    parser = argparse.ArgumentParser(description='Run Extreme Arena Test')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes for the leave-one-out loop (default: all cores, 1 = in-process)')
+    args = parser.parse_args()
+
+    run_arena(jobs=args.jobs)
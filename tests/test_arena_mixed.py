@@ -7,11 +7,10 @@ import sys
 import os
 import time
 import numpy as np
-import glob
-import librosa
 import json
 import logging
-from typing import Dict, List, Tuple
+import argparse
+from typing import Dict, List, Optional, Tuple
 
 # Ensure src is in path
 
@@ -25,9 +24,10 @@ if _project_root not in sys.path:
 from tests.template_utils import locate_cmd_templates
 
 try:
-    from src.audio.io import load_audio_file
-    from src.audio.recognizers import MultiMethodMatcher
-    from src import config
+    from tests.arena_utils import (AUDIO_INT16_SCALE, ARENA_SEED, command_template_files, preload_templates,
+                                   mixed_stft, noise_buffer, pitch_shift, time_stretch,
+                                   LOO_CONTEXT, init_loo_worker, run_leave_one_out,
+                                   precompute_template_features)
     print("Imports successful.")
 except ImportError as e:
     print(f"Import Error: {e}")
@@ -37,7 +37,11 @@ except ImportError as e:
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
-AUDIO_INT16_SCALE = 32767.0
+# SNR (dB) at or above which a scenario adds no noise
+CLEAN_SNR_DB = 90
+
+# Seeded float32 noise source (np.random.normal returns float64 and upcasts the clip)
+_RNG = np.random.default_rng(ARENA_SEED)
 
 # =============================================================================
 # Scenarios Definition
@@ -82,37 +86,52 @@ SCENARIOS = {
 # Augmentation Logic
 # =============================================================================
 
-def apply_mixed_augmentation(audio: np.ndarray, params: dict) -> np.ndarray:
-    """Apply multiple augmentations in sequence: Pitch -> Speed -> Volume -> Noise"""
+def apply_mixed_augmentation(audio: np.ndarray, params: dict, stft: Optional[np.ndarray] = None) -> np.ndarray:
+    """Apply multiple augmentations in sequence: Pitch -> Speed -> Volume -> Noise
+
+    stft: optional mixed_stft(audio), shared by all scenarios of one clip
+    """
     if len(audio) == 0: return audio
+
+    # Identity scenario (e.g. the baseline): skip the float32 round trip, which
+    # would only copy the clip twice (and clip -32768 to -32767)
+    if (params['pitch'] == 0.0 and params['speed'] == 1.0 and params['vol'] == 1.0
+            and params['snr'] >= CLEAN_SNR_DB):
+        return audio
     
-    # Normalize to float
-    y = audio.astype(np.float32) / AUDIO_INT16_SCALE
+    # Normalize to float32; every step below keeps float32 (WSOLA / librosa included)
+    # and y is always our own array, so gain / noise / clip / scale run in place
+    y = audio.astype(np.float32)
+    y /= AUDIO_INT16_SCALE
     
     try:
         # 1. Pitch Shift (Computationally expensive)
         if params['pitch'] != 0.0:
-            y = librosa.effects.pitch_shift(y, sr=config.SAMPLE_RATE, n_steps=params['pitch'])
+            y = pitch_shift(y, params['pitch'], stft)
             
         # 2. Time Stretch (Changes length)
         if params['speed'] != 1.0:
-            y = librosa.effects.time_stretch(y, rate=params['speed'])
+            # stft describes the original clip, not a pitch-shifted one
+            y = time_stretch(y, params['speed'], stft if params['pitch'] == 0.0 else None)
             
         # 3. Volume (Simple gain)
         if params['vol'] != 1.0:
-            y = y * params['vol']
+            y *= params['vol']
             
         # 4. Add Noise (SNR calculation)
-        if params['snr'] < 90:
-            p_signal = np.mean(y ** 2)
+        if params['snr'] < CLEAN_SNR_DB:
+            p_signal = float(np.dot(y, y)) / len(y)
             if p_signal > 1e-9:
                 p_noise = p_signal / (10 ** (params['snr'] / 10.0))
-                noise = np.random.normal(0, np.sqrt(p_noise), len(y))
-                y = y + noise
-                
+                noise = noise_buffer(len(y))
+                _RNG.standard_normal(dtype=np.float32, out=noise)
+                noise *= np.float32(np.sqrt(p_noise))  # float32 gain keeps the multiply in float32
+                np.add(y, noise, out=y)
+
         # Clip and convert back
-        y = np.clip(y, -1.0, 1.0)
-        return (y * AUDIO_INT16_SCALE).astype(np.int16)
+        np.clip(y, -1.0, 1.0, out=y)
+        y *= AUDIO_INT16_SCALE
+        return y.astype(np.int16)
         
     except Exception as e:
         print(f"Augmentation error: {e}")
@@ -122,14 +141,26 @@ def apply_mixed_augmentation(audio: np.ndarray, params: dict) -> np.ndarray:
 # Test Runners
 # =============================================================================
 
-def get_label_from_filename(filename: str) -> str:
-    fname = os.path.basename(filename)
-    for cn, en in config.COMMAND_MAPPING.items():
-        if cn in fname:
-            return en
-    return "UNKNOWN"
+def evaluate_held_out(test_file: str) -> List[Tuple[str, str, int]]:
+    """Train on every template except `test_file`; [(scenario, command, time_ns), ...] for its scenarios."""
+    augmented_cache = LOO_CONTEXT['augmented_cache']
+    matcher = LOO_CONTEXT['matcher']
+    held_out = matcher.remove_template(os.path.basename(test_file))
+    outcome = []
+    try:
+        for s_name in SCENARIOS:
+            aug_audio = augmented_cache[(test_file, s_name)]
+
+            # Recognize
+            t0 = time.perf_counter_ns()
+            result = matcher.recognize(aug_audio, adaptive=True)
+            outcome.append((s_name, result['command'], time.perf_counter_ns() - t0))
+    finally:
+        matcher.restore_templates(held_out)
+    return outcome
+
 
-def run_mixed_test():
+def run_mixed_test(jobs: Optional[int] = None):
     print("=" * 70)
     print(f"MIXED CONDITIONS TEST")
     print(f"Method: Adaptive Ensemble")
@@ -137,8 +168,7 @@ def run_mixed_test():
 
     # 1. Load Templates
     template_dir = locate_cmd_templates()
-    all_files = sorted(glob.glob(os.path.join(template_dir, "*.*")))
-    valid_files = [f for f in all_files if get_label_from_filename(f) != "UNKNOWN" and 'noise' not in os.path.basename(f).lower()]
+    valid_files = command_template_files(template_dir)
     
     if not valid_files:
         print("No templates found.")
@@ -147,45 +177,47 @@ def run_mixed_test():
     print(f"Loaded {len(valid_files)} templates.")
     
     # Preload
-    templates_data = {}
-    for f in valid_files:
-        templates_data[f] = (load_audio_file(f), get_label_from_filename(f))
+    templates_data = preload_templates(valid_files)
+    valid_files = list(templates_data)  # files that failed to load are skipped
+
+    methods = ['mfcc_dtw', 'mel', 'lpc']
+    template_features = precompute_template_features(templates_data, methods)
+
+    # The augmented clip depends only on (file, scenario), not on the held-out
+    # split: augment everything up front, in the same file -> scenario order
+    # so the seeded noise draws match a per-split pass
+    augmented_cache = {}
+    for filepath, (audio, _) in templates_data.items():
+        stft = mixed_stft(audio)  # one analysis per clip (librosa fallback only)
+        for s_name, params in SCENARIOS.items():
+            augmented_cache[(filepath, s_name)] = apply_mixed_augmentation(audio, params, stft)
 
-    # Stats containers
-    scenario_stats = {name: {'correct': 0, 'total': 0, 'times': []} for name in SCENARIOS}
+    # Stats containers; times[:total] holds each recognition's time in ns (one per file)
+    scenario_stats = {name: {'correct': 0, 'total': 0, 'times': np.empty(len(valid_files), dtype=np.int64)}
+                      for name in SCENARIOS}
     
-    # 2. Run Test Loop
-    for idx, test_file in enumerate(valid_files):
-        original_audio, expected_label = templates_data[test_file]
+    # 2. Run Test Loop (one held-out template per task, spread over processes)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(valid_files)))
+    print(f"\nRunning leave-one-out over {len(valid_files)} templates ({jobs} worker{'s' if jobs > 1 else ''})...")
+
+    outcomes = run_leave_one_out(valid_files, evaluate_held_out, init_loo_worker,
+                                 (templates_data, template_features, methods,
+                                  {'augmented_cache': augmented_cache}), jobs)
+    for idx, (test_file, outcome) in enumerate(outcomes):
+        expected_label = templates_data[test_file][1]
         print(f"\nProcessing {idx+1}/{len(valid_files)}: {os.path.basename(test_file)} ({expected_label})")
-        
-        # Build Matcher (LOO)
-        matcher = MultiMethodMatcher(methods=['mfcc_dtw', 'mel', 'lpc'])
-        for train_file, (train_audio, train_label) in templates_data.items():
-            if train_file != test_file:
-                matcher.add_template(train_label, train_audio, os.path.basename(train_file))
-        
-        # Run Scenarios
-        for s_name, params in SCENARIOS.items():
-            # Augment
-            aug_audio = apply_mixed_augmentation(original_audio, params)
-            
-            # Recognize
-            t0 = time.time()
-            result = matcher.recognize(aug_audio, adaptive=True)
-            dt_ms = (time.time() - t0) * 1000
-            
+
+        for s_name, pred, dt_ns in outcome:
             # Record
-            pred = result['command']
             is_correct = (pred == expected_label)
-            
+
             stats = scenario_stats[s_name]
+            stats['times'][stats['total']] = dt_ns
             stats['total'] += 1
             if is_correct: stats['correct'] += 1
-            stats['times'].append(dt_ms)
-            
+
             mark = "OK" if is_correct else f"FAIL -> {pred}"
-            # print(f"  [{s_name:15}] {mark} ({dt_ms:.0f}ms)")
+            # print(f"  [{s_name:15}] {mark} ({dt_ns * 1e-6:.0f}ms)")
 
     # 3. Report
     print("\n" + "=" * 80)
@@ -194,7 +226,7 @@ def run_mixed_test():
     
     for s_name, stats in scenario_stats.items():
         acc = (stats['correct'] / stats['total']) * 100 if stats['total'] > 0 else 0
-        avg_t = np.mean(stats['times']) if stats['times'] else 0
+        avg_t = stats['times'][:stats['total']].mean() * 1e-6 if stats['total'] > 0 else 0
         desc = SCENARIOS[s_name]['description']
         
         print(f"{s_name:<20} | {acc:6.1f}%    | {avg_t:4.0f}ms     | {desc}")
@@ -202,4 +234,9 @@ def run_mixed_test():
     print("-" * 80)
 
 if __name__ == '__main__':
-    run_mixed_test()
+    parser = argparse.ArgumentParser(description='Run Mixed Conditions Arena Test')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes for the leave-one-out loop (default: all cores, 1 = in-process)')
+    args = parser.parse_args()
+
+    run_mixed_test(jobs=args.jobs)
@@ -2,11 +2,11 @@
 
 import sys
 import os
-import glob
 import logging
 import argparse
 import numpy as np
 from datetime import datetime
+from typing import List, Optional, Tuple
 
 _current_dir = os.path.dirname(os.path.abspath(__file__))
 _project_root = os.path.dirname(_current_dir)
@@ -15,52 +15,70 @@ if _project_root not in sys.path:
 
 from tests.template_utils import locate_cmd_templates
 from src.audio.io import load_audio_file
-from src.audio.recognizers import MultiMethodMatcher
-from src import config
-from tests.test_arena import apply_augmentation, get_label_from_filename, preload_templates, ArenaResult, TEST_SUITES
+from tests.arena_utils import (apply_augmentation, clip_rng, unit_noise_like, command_template_files,
+                               preload_templates, new_result_counters, outcome_index, counter_accuracy,
+                               LOO_CONTEXT, init_loo_worker, run_leave_one_out,
+                               precompute_template_features)
+from tests.test_arena import TEST_SUITES, SUITE_IDX, VAL_IDX
 
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
-def run_voting_arena():
+
+def evaluate_held_out(test_file: str) -> List[Tuple[str, float, str]]:
+    """Train on every template except `test_file`; [(suite, value, command), ...] for its augmentations."""
+    original_audio = LOO_CONTEXT['all_templates'][test_file][0]
+    # Per-clip noise, so results don't depend on the worker a clip lands on
+    unit_noise = unit_noise_like(original_audio, clip_rng(test_file))
+
+    matcher = LOO_CONTEXT['matcher']
+    held_out = matcher.remove_template(os.path.basename(test_file))
+    outcome = []
+    try:
+        for suite_name, test_values in TEST_SUITES.items():
+            for val in test_values:
+                try:
+                    aug_audio = apply_augmentation(original_audio, suite_name, val, unit_noise)
+
+                    # USE NEW VOTING METHOD
+                    result = matcher.recognize_voting(aug_audio, adaptive=True)
+                    outcome.append((suite_name, val, result['command']))
+                except Exception as e:
+                    logger.error(f"Error: {e}")
+    finally:
+        matcher.restore_templates(held_out)
+    return outcome
+
+
+def run_voting_arena(jobs: Optional[int] = None):
     print("=" * 70)
     print("Bio-Voice Commander - Voting Ensemble Test")
     print("   Mode: WEIGHTED VOTING (Hard Vote)")
     print("=" * 70)
 
     template_dir = locate_cmd_templates()
-    all_files = sorted(glob.glob(os.path.join(template_dir, "*.*")))
-    valid_files = [f for f in all_files if get_label_from_filename(f) != "UNKNOWN" and 'noise' not in os.path.basename(f).lower()]
+    valid_files = command_template_files(template_dir)
     
     all_templates = preload_templates(valid_files)
-    
-    stats = {}
-    for suite in TEST_SUITES:
-        stats[suite] = {val: ArenaResult() for val in TEST_SUITES[suite]}
 
-    print("\nStarting Leave-One-Out testing...")
+    methods = ['mfcc_dtw', 'mel', 'lpc']
+    template_features = precompute_template_features(all_templates, methods)
     
-    for idx, test_file in enumerate(valid_files):
-        original_audio, expected_label = all_templates[test_file]
-        print(f"Testing {idx+1}/{len(valid_files)}: {os.path.basename(test_file)}")
-        
-        matcher = MultiMethodMatcher(methods=['mfcc_dtw', 'mel', 'lpc'])
-        for train_file, (train_audio, train_label) in all_templates.items():
-            if train_file != test_file:
-                matcher.add_template(train_label, train_audio, os.path.basename(train_file))
+    # counters[suite, 0, value, outcome] (single voting "method")
+    counters = new_result_counters(TEST_SUITES, 1)
 
-        for suite_name, test_values in TEST_SUITES.items():
-            for val in test_values:
-                try:
-                    aug_audio = apply_augmentation(original_audio, suite_name, val)
-                    
-                    # USE NEW VOTING METHOD
-                    result = matcher.recognize_voting(aug_audio, adaptive=True)
-                    
-                    pred = result['command']
-                    stats[suite_name][val].update(expected_label, pred)
-                except Exception as e:
-                    logger.error(f"Error: {e}")
+    test_files = [f for f in valid_files if f in all_templates]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(test_files)))
+    print(f"\nStarting Leave-One-Out testing ({jobs} worker{'s' if jobs > 1 else ''})...")
+
+    outcomes = run_leave_one_out(test_files, evaluate_held_out, init_loo_worker,
+                                 (all_templates, template_features, methods), jobs)
+    for idx, (test_file, outcome) in enumerate(outcomes):
+        expected_label = all_templates[test_file][1]
+        print(f"Testing {idx+1}/{len(test_files)}: {os.path.basename(test_file)}")
+        for suite_name, val, pred in outcome:
+            counters[SUITE_IDX[suite_name], 0, VAL_IDX[suite_name][val],
+                     outcome_index(expected_label, pred)] += 1
 
     # Report
     print("\n" + "=" * 60)
@@ -75,9 +93,14 @@ def run_voting_arena():
         
         row = "Acc | "
         for val in test_values:
-            acc = stats[suite_name][val].accuracy() * 100
+            acc = counter_accuracy(counters[SUITE_IDX[suite_name], 0, VAL_IDX[suite_name][val]]) * 100
             row += f"{acc:4.0f}% | "
         print(row)
 
 if __name__ == '__main__':
-    run_voting_arena()
+    parser = argparse.ArgumentParser(description='Run Voting Ensemble Arena Test')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes for the leave-one-out loop (default: all cores, 1 = in-process)')
+    args = parser.parse_args()
+
+    run_voting_arena(jobs=args.jobs)
@@ -6,30 +6,46 @@ EventBus 單元測試
 import sys
 import time
 import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+import pytest
+
 # 加入 src 路徑
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from event_bus import EventBus, EventType, Event
 
+# flush() 的上限（秒）；正常情況下事件在數毫秒內分發完
+FLUSH_TIMEOUT = 2.0
 
-def test_singleton():
-    """測試 Singleton 模式"""
+
+@contextmanager
+def fresh_bus():
+    """全新的 EventBus（測試結束時停止並重置 Singleton）"""
     EventBus.reset_instance()
+    bus = EventBus()
+    try:
+        yield bus
+    finally:
+        bus.stop()
+        EventBus.reset_instance()
 
-    bus1 = EventBus()
-    bus2 = EventBus()
-    assert bus1 is bus2, "EventBus 應為 Singleton"
-    print("[PASS] Singleton 測試通過")
 
-    EventBus.reset_instance()
+@pytest.fixture
+def bus():
+    with fresh_bus() as b:
+        yield b
+
+
+def test_singleton(bus):
+    """測試 Singleton 模式"""
+    assert EventBus() is bus, "EventBus 應為 Singleton"
+    print("[PASS] Singleton 測試通過")
 
 
-def test_pubsub():
+def test_pubsub(bus):
     """測試基本的發布/訂閱"""
-    EventBus.reset_instance()
-    bus = EventBus()
     received = []
 
     def callback(event: Event):
@@ -40,20 +56,15 @@ def test_pubsub():
 
     # 發布事件
     bus.publish(Event(EventType.VOICE_COMMAND, {'action': 'JUMP'}))
-    time.sleep(0.1)  # 等待分發
+    assert bus.flush(FLUSH_TIMEOUT)  # 等待分發
 
     assert len(received) == 1, f"應收到 1 個事件，實際收到 {len(received)}"
     assert received[0].data['action'] == 'JUMP'
     print("[PASS] 基本 pub/sub 測試通過")
 
-    bus.stop()
-    EventBus.reset_instance()
-
 
-def test_multiple_subscribers():
+def test_multiple_subscribers(bus):
     """測試多個訂閱者"""
-    EventBus.reset_instance()
-    bus = EventBus()
     results = {'a': [], 'b': []}
 
     def callback_a(event: Event):
@@ -67,20 +78,15 @@ def test_multiple_subscribers():
     bus.start()
 
     bus.publish(Event(EventType.ECG_PEAK, {'value': 100}))
-    time.sleep(0.1)
+    assert bus.flush(FLUSH_TIMEOUT)
 
     assert len(results['a']) == 1, "訂閱者 A 應收到事件"
     assert len(results['b']) == 1, "訂閱者 B 應收到事件"
     print("[PASS] 多訂閱者測試通過")
 
-    bus.stop()
-    EventBus.reset_instance()
-
 
-def test_event_filtering():
+def test_event_filtering(bus):
     """測試事件過濾（只收到訂閱的類型）"""
-    EventBus.reset_instance()
-    bus = EventBus()
     received = []
 
     def callback(event: Event):
@@ -93,19 +99,14 @@ def test_event_filtering():
     bus.publish(Event(EventType.VOICE_COMMAND, {'action': 'JUMP'}))
     bus.publish(Event(EventType.ECG_PEAK, {'value': 100}))  # 不應收到
     bus.publish(Event(EventType.VOICE_COMMAND, {'action': 'START'}))
-    time.sleep(0.1)
+    assert bus.flush(FLUSH_TIMEOUT)
 
     assert len(received) == 2, f"應只收到 2 個 VOICE_COMMAND，實際 {len(received)}"
     print("[PASS] 事件過濾測試通過")
 
-    bus.stop()
-    EventBus.reset_instance()
 
-
-def test_thread_safety():
+def test_thread_safety(bus):
     """測試執行緒安全"""
-    EventBus.reset_instance()
-    bus = EventBus()
     received = []
     lock = threading.Lock()
 
@@ -127,23 +128,18 @@ def test_thread_safety():
     for t in threads:
         t.join()
 
-    time.sleep(0.3)  # 等待所有事件處理完成
+    assert bus.flush(FLUSH_TIMEOUT)  # 等待所有事件處理完成
 
     assert len(received) == 60, f"應收到 60 個事件，實際 {len(received)}"
     print("[PASS] 執行緒安全測試通過")
 
-    bus.stop()
-    EventBus.reset_instance()
-
 
-def test_latency():
+def test_latency(bus):
     """測試事件延遲"""
-    EventBus.reset_instance()
-    bus = EventBus()
     latencies = []
 
     def callback(event: Event):
-        latency = time.time() - event.timestamp
+        latency = (time.perf_counter_ns() - event.timestamp) * 1e-9
         latencies.append(latency)
 
     bus.subscribe(EventType.VOICE_COMMAND, callback)
@@ -154,7 +150,7 @@ def test_latency():
         bus.publish(Event(EventType.VOICE_COMMAND, {}))
         time.sleep(0.001)
 
-    time.sleep(0.15)
+    assert bus.flush(FLUSH_TIMEOUT)
 
     avg_latency = sum(latencies) / len(latencies) * 1000  # ms
     max_latency = max(latencies) * 1000  # ms
@@ -162,19 +158,14 @@ def test_latency():
     print(f"[INFO] 平均延遲: {avg_latency:.3f} ms")
     print(f"[INFO] 最大延遲: {max_latency:.3f} ms")
 
-    assert avg_latency < 10, f"平均延遲應 <10ms，實際 {avg_latency:.3f}ms"
+    assert avg_latency < 1, f"平均延遲應 <1ms，實際 {avg_latency:.3f}ms"
     print("[PASS] 延遲測試通過")
 
-    bus.stop()
-    EventBus.reset_instance()
-
     return avg_latency, max_latency
 
 
-def test_unsubscribe():
+def test_unsubscribe(bus):
     """測試取消訂閱"""
-    EventBus.reset_instance()
-    bus = EventBus()
     received = []
 
     def callback(event: Event):
@@ -184,19 +175,26 @@ def test_unsubscribe():
     bus.start()
 
     bus.publish(Event(EventType.VOICE_COMMAND, {}))
-    time.sleep(0.1)
+    assert bus.flush(FLUSH_TIMEOUT)
     assert len(received) == 1
 
     # 取消訂閱
     bus.unsubscribe(EventType.VOICE_COMMAND, callback)
     bus.publish(Event(EventType.VOICE_COMMAND, {}))
-    time.sleep(0.1)
+    assert bus.flush(FLUSH_TIMEOUT)
 
     assert len(received) == 1, "取消訂閱後不應再收到事件"
     print("[PASS] 取消訂閱測試通過")
 
-    bus.stop()
-    EventBus.reset_instance()
+
+def test_flush_without_dispatcher(bus):
+    """未啟動時 flush() 逾時回傳 False；clear() 丟棄的事件不再等待"""
+    bus.publish(Event(EventType.VOICE_COMMAND, {}))
+    assert not bus.flush(0.05), "未啟動的匯流排不會分發事件"
+
+    bus.clear()
+    assert bus.flush(0), "清空佇列後不應有待分發事件"
+    print("[PASS] flush 測試通過")
 
 
 def run_all_tests():
@@ -205,13 +203,13 @@ def run_all_tests():
     print("EventBus 單元測試")
     print("=" * 50)
 
-    test_singleton()
-    test_pubsub()
-    test_multiple_subscribers()
-    test_event_filtering()
-    test_unsubscribe()
-    test_thread_safety()
-    avg_lat, max_lat = test_latency()
+    for test in (test_singleton, test_pubsub, test_multiple_subscribers,
+                 test_event_filtering, test_unsubscribe, test_thread_safety,
+                 test_flush_without_dispatcher):
+        with fresh_bus() as bus:
+            test(bus)
+    with fresh_bus() as bus:
+        avg_lat, max_lat = test_latency(bus)
 
     print("=" * 50)
     print("所有測試通過!")
@@ -0,0 +1,52 @@
+"""
+L1Cache 單元測試
+驗證不同指令的模板不會命中彼此的快取項目
+"""
+
+import glob
+import itertools
+import os
+import sys
+
+import pytest
+
+# Ensure the project root is in the Python path for module imports
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from src.audio.io import load_audio_file
+from tests.arena_utils import get_label_from_filename
+from tests.test_live import L1Cache
+
+
+@pytest.fixture(scope="module")
+def template_keys(template_dir):
+    """(label, fingerprint) for every command template."""
+    cache = L1Cache()
+    keys = []
+    for path in sorted(glob.glob(os.path.join(template_dir, "*.wav"))):
+        label = get_label_from_filename(path)
+        if label != "UNKNOWN":
+            keys.append((label, cache.fingerprint(load_audio_file(path))))
+    if len(set(label for label, _ in keys)) < 2:
+        pytest.skip("need templates of at least two commands")
+    return keys
+
+
+def test_different_commands_do_not_hit(template_keys):
+    """不同指令的模板互相查詢時不應命中"""
+    for (label_a, key_a), (label_b, key_b) in itertools.permutations(template_keys, 2):
+        if label_a == label_b:
+            continue
+        cache = L1Cache()
+        cache.insert(key_a, label_a)
+        assert cache.lookup(key_b) is None, f"{label_b} hit the cached {label_a} entry"
+
+
+def test_same_segment_hits(template_keys):
+    """同一段音訊應命中"""
+    label, key = template_keys[0]
+    cache = L1Cache()
+    cache.insert(key, label)
+    assert cache.lookup(key) == label
@@ -1,10 +1,33 @@
-"""Live microphone test with detailed metrics for parameter tuning."""
+"""Live microphone test with detailed metrics for parameter tuning.
+
+Usage:
+    python tests/test_live.py [options]
+
+Options:
+    --device-index N      Input audio device index to use. Skips automatic detection.
+    --top-n N             Show top N closest templates for each method (default: 3)
+    --no-noise-templates  Disable noise template collection
+    --noise-samples N     Number of noise samples to collect (default: 5)
+    --method NAME         Recognition method: mfcc_dtw, raw_dtw, rasta_plp, ensemble,
+                          or adaptive_ensemble (default: adaptive_ensemble)
+    --include-augmented   Include augmented templates from cmd_templates/augmented/
+    --augmented-only      Use ONLY augmented templates (excludes original templates)
+    --first-delta         Use only 1st order delta (13 dim) for MFCC features
+    --no-matcher-cache    Always rebuild templates instead of loading the pickled matcher cache
+    --l1-cache            Enable the fuzzy L1 result cache in front of the recognizer
+    --cascade             Evaluate methods heaviest-weight first and stop once the
+                          remaining methods cannot change the ensemble decision
+    -h, --help            Show this message and exit
+"""
 
 import sys
 import os
 import time
-import argparse
+from collections import deque
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import librosa
 import scipy.io.wavfile as wav
 from datetime import datetime
 
@@ -16,7 +39,7 @@ if _project_root not in sys.path:
 
 from src.audio.io import AudioStream, find_suitable_device, load_audio_file
 from src.audio.vad import VAD, VADState
-from src.audio.recognizers import MultiMethodMatcher
+from src.audio.recognizers import MultiMethodMatcher, matcher_cache_path
 from src import config
 from pathlib import Path
 
@@ -34,30 +57,201 @@ def collect_noise_samples(audio_stream, duration_ms=2000, num_samples=5):
         List of noise audio segments
     """
     samples_needed = int(config.SAMPLE_RATE * duration_ms / 1000)
-    collected = []
 
     print(f"Collecting {num_samples} noise samples over {duration_ms}ms...")
 
-    while len(collected) < samples_needed:
-        chunk = audio_stream.get_chunk(timeout=0.5)
-        if len(chunk) > 0:
-            collected.extend(chunk)
+    # One preallocated buffer filled chunk by chunk (no Python list of samples)
+    audio = audio_stream.read_into(np.empty(samples_needed, dtype=np.int16))
 
-    audio = np.array(collected[:samples_needed], dtype=np.int16)
+    # Split into equal segments (views into audio; the remainder is dropped)
+    segment_len = samples_needed // num_samples
+    if segment_len == 0:
+        return []
+    noise_samples = list(audio[:segment_len * num_samples].reshape(num_samples, segment_len))
 
-    # Split into segments
-    segment_len = len(audio) // num_samples
-    noise_samples = []
+    return noise_samples
 
-    for i in range(num_samples):
-        start = i * segment_len
-        end = start + segment_len
-        segment = audio[start:end]
-        # Always use the segment, even if it's quiet
-        if len(segment) > 0:
-            noise_samples.append(segment)
 
-    return noise_samples
+class L1Cache:
+    """
+    Fuzzy memoization cache in front of matcher.recognize() (opt-in: --l1-cache).
+
+    Key 是 segment 的 log-mel 頻譜，時間軸重取樣為固定 n_frames 幀後攤平
+    (保留幀順序，mean-removed、L2-normalized)，與快取中的 key 做 cosine
+    similarity，超過門檻即直接重用上一次的結果，省下整條 MFCC/DTW pipeline。
+
+    門檻依 cmd_templates (含 augmented，133 段) 實測：不同指令間的最高
+    similarity 為 0.892，同一錄音的增強版本皆 > 0.93。只對時間平均的
+    log-mel 向量則不同指令可達 0.99，無法區分指令。
+
+    Args:
+        size: FIFO 容量
+        n_mels: fingerprint 頻帶數
+        n_frames: fingerprint 幀數
+        threshold: cosine similarity 命中門檻
+    """
+
+    def __init__(self, size=8, n_mels=16, n_frames=16, threshold=0.93):
+        self.size = size
+        self.n_mels = n_mels
+        self.n_frames = n_frames
+        self.threshold = threshold
+        self._keys = np.zeros((size, n_mels * n_frames), dtype=np.float32)
+        self._values = [None] * size
+        self._count = 0
+        self._next = 0
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, audio):
+        """Log-mel resampled to n_frames frames (order kept), flattened and L2-normalized."""
+        y = audio.astype(np.float32) / 32768.0
+        mel = librosa.feature.melspectrogram(
+            y=y, sr=config.SAMPLE_RATE, n_fft=config.N_FFT,
+            hop_length=config.HOP_LENGTH, n_mels=self.n_mels
+        )
+        log_mel = np.log(mel + 1e-10)
+        # Linear interpolation onto n_frames evenly spaced frame positions
+        pos = np.linspace(0, log_mel.shape[1] - 1, self.n_frames)
+        lo = np.floor(pos).astype(int)
+        hi = np.minimum(lo + 1, log_mel.shape[1] - 1)
+        frac = pos - lo
+        key = (log_mel[:, lo] * (1 - frac) + log_mel[:, hi] * frac).ravel().astype(np.float32)
+        key -= key.mean()
+        norm = np.linalg.norm(key)
+        return key / norm if norm > 0 else key
+
+    def lookup(self, key):
+        """Return the cached result whose key is closest to `key`, or None."""
+        if self._count == 0:
+            return None
+        sims = self._keys[:self._count] @ key
+        idx = int(np.argmax(sims))
+        if sims[idx] > self.threshold:
+            self.hits += 1
+            return self._values[idx]
+        self.misses += 1
+        return None
+
+    def insert(self, key, value):
+        """Insert (key, value), evicting the oldest entry when full."""
+        self._keys[self._next] = key
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def recognize(self, matcher, segment, **kwargs):
+        """Cached wrapper around matcher.recognize(segment, **kwargs)."""
+        key = self.fingerprint(segment)
+        results = self.lookup(key)
+        if results is None:
+            results = matcher.recognize(segment, **kwargs)
+            self.insert(key, results)
+        return results
+
+
+class RunningStat:
+    """
+    常數記憶體的統計量：次數 / 總和 / 最小 / 最大即時累加，
+    另保留最近 `history` 筆數值，長時間 session 不會無限成長。
+    """
+
+    __slots__ = ('count', 'total', 'min', 'max', 'recent')
+
+    def __init__(self, history=1024):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.recent = deque(maxlen=history)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.recent.append(value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+def _decide_ensemble(results, method_results):
+    """(command, distance, best_template) from matcher.recognize's weighted decision."""
+    # Distance from the winning method's result
+    winning_method = results.get('method', 'mfcc_dtw')
+    return (results['command'], method_results.get(winning_method, {}).get('distance', 0),
+            results.get('best_template', ''))
+
+
+def _single_method_decider(method):
+    """Decision function reading only `method`'s entry of all_results."""
+    def decide(results, method_results):
+        method_result = method_results[method]
+        return method_result['command'], method_result['distance'], method_result['best_template']
+    return decide
+
+
+_METHOD_CHOICES = ('mfcc_dtw', 'raw_dtw', 'rasta_plp', 'ensemble', 'adaptive_ensemble')
+_INT_OPTIONS = ('device_index', 'top_n', 'noise_samples')
+
+
+def parse_args(argv=None):
+    """
+    Minimal sys.argv parser for the options listed in the module docstring.
+
+    Replaces argparse to keep startup light; accepts both "--opt value" and
+    "--opt=value".
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    args = SimpleNamespace(
+        device_index=None,
+        top_n=3,
+        no_noise_templates=False,
+        noise_samples=5,
+        method='adaptive_ensemble',
+        include_augmented=False,
+        augmented_only=False,
+        first_delta=False,
+        no_matcher_cache=False,
+        l1_cache=False,
+        cascade=False,
+    )
+
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-h', '--help'):
+            print(__doc__)
+            sys.exit(0)
+
+        name, has_value, value = arg.partition('=')
+        key = name[2:].replace('-', '_')
+        if not name.startswith('--') or not hasattr(args, key):
+            sys.exit(f"error: unrecognized argument: {arg}")
+
+        if isinstance(getattr(args, key), bool):
+            setattr(args, key, True)
+        else:
+            if not has_value:
+                i += 1
+                if i >= len(argv):
+                    sys.exit(f"error: argument {name}: expected one argument")
+                value = argv[i]
+            if key in _INT_OPTIONS:
+                try:
+                    value = int(value)
+                except ValueError:
+                    sys.exit(f"error: argument {name}: invalid int value: '{value}'")
+            elif key == 'method' and value not in _METHOD_CHOICES:
+                sys.exit(f"error: argument --method: invalid choice: '{value}' (choose from {', '.join(_METHOD_CHOICES)})")
+            setattr(args, key, value)
+        i += 1
+
+    return args
 
 
 def test_live_recognition():
@@ -67,55 +261,7 @@ def test_live_recognition():
     print("=" * 80)
 
     # Parse command line arguments
-    parser = argparse.ArgumentParser(description="Live microphone test for Bio-Voice Commander.")
-    parser.add_argument(
-        "--device-index",
-        type=int,
-        help="Specify the input audio device index to use. Skips automatic detection."
-    )
-    parser.add_argument(
-        "--top-n",
-        type=int,
-        default=3,
-        help="Show top N closest templates for each method (default: 3)"
-    )
-    parser.add_argument(
-        "--no-noise-templates",
-        action="store_true",
-        help="Disable noise template collection"
-    )
-    parser.add_argument(
-        "--noise-samples",
-        type=int,
-        default=5,
-        help="Number of noise samples to collect (default: 5)"
-    )
-    parser.add_argument(
-        "--method",
-        type=str,
-        choices=['mfcc_dtw', 'raw_dtw', 'rasta_plp', 'ensemble', 'adaptive_ensemble'],
-        default='adaptive_ensemble',
-        help="Recognition method: 'mfcc_dtw', 'raw_dtw', 'rasta_plp', 'ensemble', or 'adaptive_ensemble'"
-    )
-    parser.add_argument(
-        "--include-augmented",
-        action="store_true",
-        default=False,
-        help="Include augmented templates from cmd_templates/augmented/"
-    )
-    parser.add_argument(
-        "--augmented-only",
-        action="store_true",
-        default=False,
-        help="Use ONLY augmented templates (excludes original templates)"
-    )
-    parser.add_argument(
-        "--first-delta",
-        action="store_true",
-        default=False,
-        help="Use only 1st order delta (13 dim) for MFCC features"
-    )
-    args = parser.parse_args()
+    args = parse_args()
 
     # Load templates
     base_dir = os.path.join(_project_root, "cmd_templates")
@@ -134,85 +280,6 @@ def test_live_recognition():
 
     matcher = MultiMethodMatcher(methods=methods, mfcc_first_delta_only=args.first_delta)
 
-    print("\nLoading templates...")
-
-    # Helper function to load templates from a specific directory
-    def load_templates_from_path(path, description=""):
-        """Load templates from a specific path."""
-        if not os.path.exists(path):
-            print(f"[WARN] Directory not found: {path}")
-            return 0
-
-        count = 0
-        for audio_file in sorted(Path(path).glob("*.wav")):
-            # Skip noise files
-            if "noise" in audio_file.stem.lower() or "噪音" in audio_file.stem:
-                continue
-
-            try:
-                audio_data = load_audio_file(str(audio_file))
-                # Determine command from filename
-                matched = False
-                for cn_cmd, en_cmd in config.COMMAND_MAPPING.items():
-                    if audio_file.stem.startswith(cn_cmd) or cn_cmd in audio_file.stem:
-                        matcher.add_template(en_cmd, audio_data, audio_file.name)
-                        if description:
-                            print(f"  {description}: {audio_file.name} -> {en_cmd}")
-                        else:
-                            print(f"  Loaded: {audio_file.name} -> {en_cmd}")
-                        count += 1
-                        matched = True
-                        break
-                if not matched and description:
-                    print(f"  [SKIP] {audio_file.name} (no command match)")
-            except Exception as e:
-                print(f"  [ERROR] Failed to load {audio_file.name}: {e}")
-        return count
-
-    # Load based on augmented flags
-    if args.augmented_only:
-        # Load ONLY augmented templates
-        print(f"Loading ONLY augmented templates from: {augmented_dir}")
-        count = load_templates_from_path(augmented_dir, "Augmented")
-        print(f"Total: {count} augmented templates loaded\n")
-    elif args.include_augmented:
-        # Load both original and augmented
-        print(f"Loading original templates from: {base_dir}")
-        orig_count = load_templates_from_path(base_dir, "Original")
-
-        print(f"\nLoading augmented templates from: {augmented_dir}")
-        aug_count = load_templates_from_path(augmented_dir, "Augmented")
-        print(f"Total: {orig_count} original + {aug_count} augmented = {orig_count + aug_count} templates\n")
-    else:
-        # Load only original templates (default behavior)
-        print(f"Loading original templates from: {base_dir}")
-        print("(Augmented templates excluded. Use --include-augmented to include them)\n")
-        count = load_templates_from_path(base_dir, "Original")
-        print(f"Total: {count} original templates loaded\n")
-
-    # Show loaded templates
-    print("\nLoaded templates:")
-    for method, m in matcher.matchers.items():
-        if m.templates:
-            print(f"  {method}:")
-            for cmd, templates in m.templates.items():
-                tpl_names = m.template_names.get(cmd, [])
-                print(f"    - {cmd}: {len(templates)} samples ({', '.join(tpl_names)})")
-
-    total_templates = sum(len(t) for m in matcher.matchers.values()
-                          for t in m.templates.values())
-    if total_templates == 0:
-        print("\n[ERROR] No templates found!")
-        print("Please ensure audio files with Chinese command names are in the directory.")
-        return
-
-    # Print current thresholds
-    print("\n" + "-" * 80)
-    print("Current Thresholds (from config.py):")
-    print("-" * 80)
-    for method, m in matcher.matchers.items():
-        print(f"  {method:12s}: {m.threshold:.2f}")
-
     # Find suitable audio device or use specified
     print("\n" + "=" * 80)
     print("Finding suitable audio device...")
@@ -244,16 +311,148 @@ def test_live_recognition():
     )
     audio_stream.start()
 
-    # Calibration phase - collect background RMS AND noise samples
+    # Helpers for the parallel startup path
+    command_keywords = tuple(config.COMMAND_MAPPING.items())
+
+    def load_templates_from_path(path, description=""):
+        """Load templates from a specific path."""
+        if not os.path.exists(path):
+            print(f"[WARN] Directory not found: {path}")
+            return 0
+
+        files = [f for f in sorted(Path(path).glob("*.wav"))
+                 if "noise" not in f.stem.lower() and "噪音" not in f.stem]  # Skip noise files
+        # Command from filename (first COMMAND_MAPPING key it contains), resolved
+        # before decoding so unmatched files are never loaded
+        commands = [next((en_cmd for cn_cmd, en_cmd in command_keywords if cn_cmd in f.stem), None)
+                    for f in files]
+
+        def load(audio_file, command):
+            if command is None:
+                return None, None
+            try:
+                return load_audio_file(str(audio_file)), None
+            except Exception as e:
+                return None, e
+
+        # Decode / resample on a thread pool (map() keeps file order); the
+        # templates are still added one at a time on this thread
+        count = 0
+        workers = max(1, min(8, os.cpu_count() or 1, len(files)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            loaded = executor.map(load, files, commands)
+            for audio_file, en_cmd, (audio_data, error) in zip(files, commands, loaded):
+                if en_cmd is None:
+                    if description:
+                        print(f"  [SKIP] {audio_file.name} (no command match)")
+                    continue
+                if error is not None:
+                    print(f"  [ERROR] Failed to load {audio_file.name}: {error}")
+                    continue
+                try:
+                    matcher.add_template(en_cmd, audio_data, audio_file.name)
+                    if description:
+                        print(f"  {description}: {audio_file.name} -> {en_cmd}")
+                    else:
+                        print(f"  Loaded: {audio_file.name} -> {en_cmd}")
+                    count += 1
+                except Exception as e:
+                    print(f"  [ERROR] Failed to load {audio_file.name}: {e}")
+        return count
+
+    def load_all_templates():
+        """Load templates according to the augmented flags (or from the matcher cache)."""
+        nonlocal matcher
+        if args.augmented_only:
+            dirs = [augmented_dir]
+        elif args.include_augmented:
+            dirs = [base_dir, augmented_dir]
+        else:
+            dirs = [base_dir]
+
+        cache_path = None
+        if not args.no_matcher_cache:
+            files = [p for d in dirs if os.path.isdir(d) for p in sorted(Path(d).glob("*.wav"))]
+            cache_path = matcher_cache_path(files, methods, args.first_delta)
+            cached = MultiMethodMatcher.load(cache_path)
+            if cached is not None:
+                matcher = cached
+                print(f"Loaded templates from cache: {cache_path}\n")
+                return
+
+        if args.augmented_only:
+            # Load ONLY augmented templates
+            print(f"Loading ONLY augmented templates from: {augmented_dir}")
+            count = load_templates_from_path(augmented_dir, "Augmented")
+            print(f"Total: {count} augmented templates loaded\n")
+        elif args.include_augmented:
+            # Load both original and augmented
+            print(f"Loading original templates from: {base_dir}")
+            orig_count = load_templates_from_path(base_dir, "Original")
+
+            print(f"\nLoading augmented templates from: {augmented_dir}")
+            aug_count = load_templates_from_path(augmented_dir, "Augmented")
+            print(f"Total: {orig_count} original + {aug_count} augmented = {orig_count + aug_count} templates\n")
+        else:
+            # Load only original templates (default behavior)
+            print(f"Loading original templates from: {base_dir}")
+            print("(Augmented templates excluded. Use --include-augmented to include them)\n")
+            count = load_templates_from_path(base_dir, "Original")
+            print(f"Total: {count} original templates loaded\n")
+
+        # Cache before live noise templates are added
+        if cache_path is not None and any(m.templates for m in matcher.matchers.values()):
+            matcher.save(cache_path)
+
+    def calibrate():
+        """Measure background RMS while the user stays quiet."""
+        time.sleep(0.3)
+        return audio_stream.measure_background(1500)
+
+    # Calibration phase - runs alongside template loading since they touch
+    # disjoint resources (audio device vs disk/CPU)
     print("\n" + "-" * 80)
     print("Calibration Phase - Please stay QUIET for 3 seconds")
     print("-" * 80)
-    time.sleep(0.3)
+    print("\nLoading templates...")
+
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fut_tpl = ex.submit(load_all_templates)
+        fut_bg = ex.submit(calibrate)
+        fut_tpl.result()
+        bg_rms = fut_bg.result()
 
-    # Measure background RMS
-    bg_rms = audio_stream.measure_background(1500)
     print(f"Background RMS: {bg_rms:.1f}")
 
+    # Show loaded templates
+    print("\nLoaded templates:")
+    for method, m in matcher.matchers.items():
+        if m.templates:
+            print(f"  {method}:")
+            for cmd, templates in m.templates.items():
+                tpl_names = m.template_names.get(cmd, [])
+                print(f"    - {cmd}: {len(templates)} samples ({', '.join(tpl_names)})")
+
+    total_templates = sum(len(t) for m in matcher.matchers.values()
+                          for t in m.templates.values())
+    if total_templates == 0:
+        print("\n[ERROR] No templates found!")
+        print("Please ensure audio files with Chinese command names are in the directory.")
+        audio_stream.stop()
+        return
+
+    # Compile / load the numba kernels here on the main thread: recognition
+    # later runs on a worker thread, and numba's TBB threading layer can hang
+    # at interpreter exit if it is first started from a non-main thread.
+    matcher.warmup()
+
+    # Print current thresholds
+    print("\n" + "-" * 80)
+    print("Current Thresholds (from config.py):")
+    print("-" * 80)
+    for method, m in matcher.matchers.items():
+        print(f"  {method:12s}: {m.threshold:.2f}")
+
     # Collect noise samples for rejection
     if not args.no_noise_templates:
         noise_samples = collect_noise_samples(audio_stream, duration_ms=2000, num_samples=args.noise_samples)
@@ -271,142 +470,169 @@ def test_live_recognition():
     # Initialize VAD
     vad = VAD(background_rms=bg_rms)
 
+    # Fuzzy L1 cache (opt-in): repeated utterances reuse the previous decision
+    l1_cache = L1Cache() if args.l1_cache else None
+
+    # 'cascade' (opt-in) skips methods that can no longer change the ensemble decision
+    recognize_mode = 'cascade' if args.cascade else 'all'
+
+    def recognize(segment, adaptive):
+        if l1_cache is None:
+            return matcher.recognize(segment, mode=recognize_mode, adaptive=adaptive)
+        return l1_cache.recognize(matcher, segment, mode=recognize_mode, adaptive=adaptive)
+
     print("\n" + "=" * 80)
     method_display = args.method.upper()
     if args.method == 'raw_dtw':
         method_display = "RAW_DTW (Time Domain Only)"
+    if args.cascade:
+        method_display += " (cascade)"
     print(f"Listening for commands... (High-speed mode - {method_display})")
     print("Say: 開始, 暫停, 跳")
     print("Press Ctrl+C to stop")
     print("=" * 80)
     print()
 
+    # Recognition runs on a single worker (keeps reports in detection order)
+    # so the main loop keeps draining audio chunks meanwhile; recorded
+    # segments are written to disk by a separate writer so file I/O never
+    # delays a recognition
+    worker = ThreadPoolExecutor(max_workers=1)
+    writer = ThreadPoolExecutor(max_workers=1)
+
     try:
         # Statistics
         stats = {
             'total_detections': 0,
             'successful_matches': 0,
             'noise_detections': 0,
-            'processing_times': [],
-            'vad_latencies': []
+            # Bounded history + running aggregates keep long sessions O(1)
+            'processing_times': RunningStat(),
+            'vad_latencies': RunningStat()
         }
 
+        # Recordings go to tests/record (created once, not per detection)
+        record_dir = os.path.join(os.path.dirname(__file__), 'record')
+        os.makedirs(record_dir, exist_ok=True)
+
+        def save_segment(segment, detection_no):
+            """Save one segment to a wav file (runs on the writer thread)."""
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"live_test_{timestamp}_{detection_no}.wav"
+            filepath = os.path.join(record_dir, filename)
+            try:
+                wav.write(filepath, config.SAMPLE_RATE, segment.astype(np.int16, copy=False))
+            except Exception as e:
+                print(f"\n[ERROR] Failed to save audio: {e}")
+
+        # --method is fixed for the session, so pick the decision function once:
+        # single-method modes read their own entry of all_results, the
+        # ensembles use the weighted decision
+        use_ensemble = args.method in ('ensemble', 'adaptive_ensemble')
+        use_adaptive = args.method == 'adaptive_ensemble'
+        decide = _decide_ensemble if use_ensemble else _single_method_decider(args.method)
+
+        def handle_segment(segment, detection_no):
+            """Recognize and report one segment (runs on the worker thread)."""
+            total_start = time.perf_counter()
+            results = recognize(segment, adaptive=use_adaptive)
+            method_results = results.get('all_results', {})
+            command, distance, best_template = decide(results, method_results)
+            total_proc_time = (time.perf_counter() - total_start) * 1000
+            stats['processing_times'].add(total_proc_time)
+
+            # Update stats
+            if command == 'NOISE':
+                stats['noise_detections'] += 1
+            elif command != 'NONE':
+                stats['successful_matches'] += 1
+
+            # Print result with template and distance info
+            if command == 'NOISE':
+                display = f"[噪音] #{detection_no} | 噪音偵測 | dist:{distance:.1f} | {total_proc_time:.0f}ms"
+            elif command == 'NONE':
+                display = f"[無匹配] #{detection_no} | 無法識別 | 最近:{best_template} dist:{distance:.1f} | {total_proc_time:.0f}ms"
+            else:
+                display = f"[{command}] #{detection_no} | 模板:{best_template} | dist:{distance:.1f} | {total_proc_time:.0f}ms"
+
+            # Pad to clear previous line; whole report goes out in one write
+            out = f"\r{display:<100}"
+
+            # Detailed method breakdown on new line if using ensemble
+            if use_ensemble and method_results:
+                method_info = []
+                for method_name, method_result in method_results.items():
+                    m_cmd = method_result.get('command', 'NONE')
+                    m_dist = method_result.get('distance', 0)
+                    m_tpl = method_result.get('best_template', '')
+                    method_info.append(f"  {method_name}:{m_cmd}({m_tpl}, {m_dist:.1f})")
+                out += "\n" + " | ".join(method_info) + "\n"
+
+            sys.stdout.write(out)
+            sys.stdout.flush()
+
+        def report_failure(future):
+            if future.exception() is not None:
+                print(f"\n[ERROR] Recognition failed: {future.exception()}")
+
         vad_start_time = None
         last_state = VADState.SILENCE
+        # The recording indicator is drawn once per utterance: VAD false
+        # starts (too short, back to SILENCE) must not redraw it each time
+        indicator_shown = False
+
+        # Loop-invariant lookups bound once (runs for every audio chunk)
+        get_chunk = audio_stream.get_chunk
+        process_chunk = vad.process_chunk
+        perf_counter = time.perf_counter
+        add_vad_latency = stats['vad_latencies'].add
+        RECORDING, SILENCE, PROCESSING = VADState.RECORDING, VADState.SILENCE, VADState.PROCESSING
 
         while True:
-            # Use smaller timeout for better responsiveness
-            chunk = audio_stream.get_chunk(timeout=0.01)
+            # Block until the callback delivers a chunk; the 1 s timeout only
+            # keeps Ctrl+C responsive on Windows
+            chunk = get_chunk(timeout=1.0)
             if len(chunk) == 0:
                 continue
 
-            state, segment = vad.process_chunk(chunk)
+            state, segment = process_chunk(chunk)
 
             # Track when speech starts
-            if state == VADState.RECORDING and last_state == VADState.SILENCE:
-                vad_start_time = time.time()
+            if state == RECORDING and last_state == SILENCE:
+                vad_start_time = perf_counter()
                 # Show recording indicator on same line
-                print("\r[錄音中...]     ", end='', flush=True)
+                if not indicator_shown:
+                    sys.stdout.write("\r[錄音中...]     ")
+                    sys.stdout.flush()
+                    indicator_shown = True
 
             last_state = state
 
-            if state == VADState.PROCESSING and segment is not None:
-                vad_end_time = time.time()
+            if state == PROCESSING and segment is not None:
+                vad_end_time = perf_counter()
                 vad_latency = (vad_end_time - vad_start_time) * 1000 if vad_start_time else 0
-                stats['vad_latencies'].append(vad_latency)
+                add_vad_latency(vad_latency)
                 stats['total_detections'] += 1
 
-                # Save the segment to a wav file
-                record_dir = os.path.join(os.path.dirname(__file__), 'record')
-                os.makedirs(record_dir, exist_ok=True)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"live_test_{timestamp}_{stats['total_detections']}.wav"
-                filepath = os.path.join(record_dir, filename)
-                try:
-                    wav.write(filepath, config.SAMPLE_RATE, segment.astype(np.int16))
-                except Exception as e:
-                    print(f"\n[ERROR] Failed to save audio: {e}")
-
-                # Process with selected method
-                total_start = time.time()
-                if args.method == 'mfcc_dtw':
-                    # Use only MFCC+DTW method
-                    results = matcher.recognize(segment, mode='all', adaptive=False)
-                    command = results['all_results']['mfcc_dtw']['command']
-                    distance = results['all_results']['mfcc_dtw']['distance']
-                    best_template = results['all_results']['mfcc_dtw']['best_template']
-                    method_results = results['all_results']
-                elif args.method == 'raw_dtw':
-                    # Use only Raw Audio DTW method (time domain)
-                    results = matcher.recognize(segment, mode='all', adaptive=False)
-                    command = results['all_results']['raw_dtw']['command']
-                    distance = results['all_results']['raw_dtw']['distance']
-                    best_template = results['all_results']['raw_dtw']['best_template']
-                    method_results = results['all_results']
-                elif args.method == 'rasta_plp':
-                    # Use only RASTA-PLP method
-                    results = matcher.recognize(segment, mode='all', adaptive=False)
-                    command = results['all_results']['rasta_plp']['command']
-                    distance = results['all_results']['rasta_plp']['distance']
-                    best_template = results['all_results']['rasta_plp']['best_template']
-                    method_results = results['all_results']
-                elif args.method == 'ensemble':
-                    # Use standard ensemble (fixed weights)
-                    results = matcher.recognize(segment, mode='all', adaptive=False)
-                    command = results['command']
-                    best_template = results.get('best_template', '')
-                    method_results = results.get('all_results', {})
-                    # Get distance from the winning method's result
-                    winning_method = results.get('method', 'mfcc_dtw')
-                    distance = method_results.get(winning_method, {}).get('distance', 0)
-                else:
-                    # Use adaptive ensemble (SNR-based)
-                    results = matcher.recognize(segment, mode='all', adaptive=True)
-                    command = results['command']
-                    best_template = results.get('best_template', '')
-                    method_results = results.get('all_results', {})
-                    # Get distance from the winning method's result
-                    winning_method = results.get('method', 'mfcc_dtw')
-                    distance = method_results.get(winning_method, {}).get('distance', 0)
-                total_proc_time = (time.time() - total_start) * 1000
-                stats['processing_times'].append(total_proc_time)
-
-                # Update stats
-                if command == 'NOISE':
-                    stats['noise_detections'] += 1
-                elif command != 'NONE':
-                    stats['successful_matches'] += 1
-
-                # Print result with template and distance info
-                if command == 'NOISE':
-                    display = f"[噪音] #{stats['total_detections']} | 噪音偵測 | dist:{distance:.1f} | {total_proc_time:.0f}ms"
-                elif command == 'NONE':
-                    display = f"[無匹配] #{stats['total_detections']} | 無法識別 | 最近:{best_template} dist:{distance:.1f} | {total_proc_time:.0f}ms"
-                else:
-                    display = f"[{command}] #{stats['total_detections']} | 模板:{best_template} | dist:{distance:.1f} | {total_proc_time:.0f}ms"
-
-                # Print with padding to clear previous line
-                print(f"\r{display:<100}", end='', flush=True)
-
-                # Print detailed method breakdown on new line if using ensemble
-                if args.method in ['ensemble', 'adaptive_ensemble'] and method_results:
-                    print()  # New line
-                    method_info = []
-                    for method_name, method_result in method_results.items():
-                        m_cmd = method_result.get('command', 'NONE')
-                        m_dist = method_result.get('distance', 0)
-                        m_tpl = method_result.get('best_template', '')
-                        method_info.append(f"  {method_name}:{m_cmd}({m_tpl}, {m_dist:.1f})")
-                    print(" | ".join(method_info))
-
-                # Reset VAD
+                # Hand off a copy (the VAD buffer is reused); the numba DTW
+                # kernels release the GIL while the worker matches. Both
+                # threads only read the copy.
+                segment = segment.copy()
+                writer.submit(save_segment, segment, stats['total_detections'])
+                future = worker.submit(handle_segment, segment, stats['total_detections'])
+                future.add_done_callback(report_failure)
+
+                # Reset VAD; the worker's report overwrites the indicator
                 vad.reset()
                 vad_start_time = None
+                indicator_shown = False
 
     except KeyboardInterrupt:
         print("\n\nStopping...")
     finally:
         audio_stream.stop()
+        worker.shutdown(wait=True)
+        writer.shutdown(wait=True)
 
     # Print simple statistics
     print("\n" + "=" * 80)
@@ -424,17 +650,23 @@ def test_live_recognition():
         print(f"\n指令識別率: {match_rate:.1f}%")
         print(f"噪音拒絕率: {noise_rate:.1f}%")
 
-    if stats['processing_times']:
-        avg_time = sum(stats['processing_times']) / len(stats['processing_times'])
-        print(f"\n平均處理時間: {avg_time:.1f}ms")
-        print(f"最快: {min(stats['processing_times']):.1f}ms")
-        print(f"最慢: {max(stats['processing_times']):.1f}ms")
-
-    if stats['vad_latencies']:
-        avg_lat = sum(stats['vad_latencies']) / len(stats['vad_latencies'])
-        print(f"\n平均VAD延遲: {avg_lat:.0f}ms")
-        print(f"最小: {min(stats['vad_latencies']):.0f}ms")
-        print(f"最大: {max(stats['vad_latencies']):.0f}ms")
+    processing_times = stats['processing_times']
+    if processing_times.count:
+        print(f"\n平均處理時間: {processing_times.mean:.1f}ms")
+        print(f"最快: {processing_times.min:.1f}ms")
+        print(f"最慢: {processing_times.max:.1f}ms")
+
+    if l1_cache is not None and (l1_cache.hits or l1_cache.misses):
+        print(f"\nL1 快取命中: {l1_cache.hits}/{l1_cache.hits + l1_cache.misses}")
+
+    vad_latencies = stats['vad_latencies']
+    if vad_latencies.count:
+        print(f"\n平均VAD延遲: {vad_latencies.mean:.0f}ms")
+        print(f"最小: {vad_latencies.min:.0f}ms")
+        print(f"最大: {vad_latencies.max:.0f}ms")
+
+    if audio_stream.overruns:
+        print(f"\n音訊佇列溢位丟棄: {audio_stream.overruns} chunks")
 
     print("=" * 80)
 
@@ -0,0 +1,91 @@
+"""
+Recognizer 單元測試
+驗證 pairwise 與 batched DTW 距離一致（含 Sakoe-Chiba band），
+以及 cascade 模式與完整 ensemble 的決策一致
+"""
+
+import glob
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Ensure the project root is in the Python path for module imports
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from src import config
+from src.audio.io import load_audio_file
+from src.audio.recognizers import NUMBA_AVAILABLE, MultiMethodMatcher, TemplateMatcher, dtw_distance_normalized
+from tests.arena_utils import get_label_from_filename
+
+
+def _sequences(query_frames=40):
+    """Query plus templates of different lengths (the band widens with the length ratio)."""
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal((query_frames, 13)).astype(np.float32)
+    templates = [rng.standard_normal((n, 13)).astype(np.float32) for n in (25, 40, 55, 3)]
+    return query, templates
+
+
+@pytest.mark.parametrize("query_frames", [40, 1])
+@pytest.mark.parametrize("band_radius", [None, 0, 3])
+def test_pairwise_matches_batched_dtw(monkeypatch, band_radius, query_frames):
+    """dtw_distance_normalized 與 TemplateMatcher 批次距離在相同 band 下應相同（含單幀 query）"""
+    monkeypatch.setattr(config, 'DTW_BAND_RADIUS', band_radius)
+    query, templates = _sequences(query_frames)
+
+    matcher = TemplateMatcher(method='mfcc_dtw')
+    batched = matcher._distances(query, templates, 'templates')
+    pairwise = [dtw_distance_normalized(query, tpl, radius=config.DTW_RADIUS) for tpl in templates]
+
+    assert batched == pytest.approx(pairwise, rel=1e-6)
+    assert all(np.isfinite(d) and d > 0 for d in batched)
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="band only applies to the numba kernels")
+def test_band_single_frame_query(monkeypatch):
+    """單幀 query 只有一條路徑（整列），band 不應改變距離"""
+    query, templates = _sequences(query_frames=1)
+    monkeypatch.setattr(config, 'DTW_BAND_RADIUS', None)
+    exact = [dtw_distance_normalized(query, tpl) for tpl in templates]
+    monkeypatch.setattr(config, 'DTW_BAND_RADIUS', 2)
+    banded = [dtw_distance_normalized(query, tpl) for tpl in templates]
+
+    assert banded == pytest.approx(exact, rel=1e-6)
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="band only applies to the numba kernels")
+def test_band_changes_distance(monkeypatch):
+    """band 生效時距離應不小於精確 DTW（確保上面的比較不是恆等）"""
+    query, templates = _sequences()
+    monkeypatch.setattr(config, 'DTW_BAND_RADIUS', None)
+    exact = [dtw_distance_normalized(query, tpl) for tpl in templates]
+    monkeypatch.setattr(config, 'DTW_BAND_RADIUS', 0)
+    banded = [dtw_distance_normalized(query, tpl) for tpl in templates]
+
+    assert all(b >= e - 1e-9 for b, e in zip(banded, exact))
+    assert any(b > e + 1e-9 for b, e in zip(banded, exact))
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_cascade_matches_full_ensemble(template_dir, adaptive):
+    """cascade 提前停止時的指令應與評估全部方法 ('all') 相同"""
+    base = sorted(glob.glob(os.path.join(template_dir, "*.wav")))
+    queries = sorted(glob.glob(os.path.join(template_dir, "augmented", "*.wav")))
+    if not base or not queries:
+        pytest.skip("needs cmd_templates with augmented/ clips")
+
+    matcher = MultiMethodMatcher(methods=['mfcc_dtw', 'mel', 'lpc', 'rasta_plp'])
+    for path in base:
+        matcher.add_template(get_label_from_filename(path), load_audio_file(path), os.path.basename(path))
+
+    for path in queries:
+        audio = load_audio_file(path)
+        full = matcher.recognize(audio, mode='all', adaptive=adaptive)
+        cascade = matcher.recognize(audio, mode='cascade', adaptive=adaptive)
+        assert cascade['command'] == full['command'], os.path.basename(path)
+        # The heaviest-weighted method always runs
+        assert 'mfcc_dtw' in cascade['all_results']
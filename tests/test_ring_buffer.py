@@ -0,0 +1,49 @@
+"""
+RingBuffer 單元測試
+驗證環形緩衝的覆寫、繞回與 pre-roll 讀取
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Ensure the project root is in the Python path for module imports
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from src import config
+from src.audio.io import RingBuffer
+
+
+def _samples(start, n):
+    return np.arange(start, start + n, dtype=np.int16)
+
+
+def test_keeps_newest_samples_across_wraparound():
+    """多次 append 繞回後仍依時間順序保留最新的樣本"""
+    ring = RingBuffer(max_duration_ms=1)  # 16 samples at 16 kHz
+    capacity = int(config.SAMPLE_RATE / 1000)
+    pushed = []
+    for i in range(10):
+        chunk = _samples(i * 7, 7)
+        ring.append(chunk)
+        pushed.extend(chunk.tolist())
+        assert ring.get_all().tolist() == pushed[-capacity:]
+
+
+def test_oversized_chunk_and_pre_roll():
+    """單次寫入超過容量只保留尾端；get_last_ms 取最新 n 毫秒"""
+    ring = RingBuffer(max_duration_ms=2)
+    capacity = int(config.SAMPLE_RATE * 2 / 1000)
+    ring.append(_samples(0, capacity + 5))
+    assert ring.get_all().tolist() == list(range(5, capacity + 5))
+
+    n = int(config.SAMPLE_RATE / 1000)
+    assert ring.get_last_ms(1).tolist() == list(range(capacity + 5 - n, capacity + 5))
+
+    ring.clear()
+    assert len(ring.get_all()) == 0
+    ring.append(_samples(100, 3))
+    assert ring.get_last_ms(1).tolist() == [100, 101, 102]